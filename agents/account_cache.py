@@ -0,0 +1,187 @@
+import os
+import sys
+import time
+import logging
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import OANDA_API_KEY, OANDA_ACCOUNT_ID
+from utils.lazy import lazy_import
+from utils.oanda_client import get_client
+
+accounts = lazy_import("oandapyV20.endpoints.accounts")
+transactions = lazy_import("oandapyV20.endpoints.transactions")
+
+POLL_INTERVAL = 5.0  # seconds between AccountChanges polls when the stream is quiet
+STALE_AFTER = 30.0  # reads older than this should fall back to REST
+STREAM_RETRY = 10.0  # seconds before reconnecting a dropped transaction stream
+
+
+class AccountCache:
+    """
+    In-memory copy of the account summary, open positions and open trades.
+
+    Seeded once from AccountDetails, then kept current with AccountChanges
+    polls from the last seen transaction ID. The transaction stream only
+    wakes the poller, so a fill shows up within one round trip, while the
+    periodic poll still catches anything a dropped stream missed. All reads
+    come from memory and never touch the network.
+    """
+    def __init__(self, client=None, account_id=OANDA_ACCOUNT_ID, poll_interval=POLL_INTERVAL,
+                 stale_after=STALE_AFTER):
+        self.client = client or get_client(OANDA_API_KEY)
+        self.account_id = account_id
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._stream = None
+        self.summary = {}
+        self._positions = {}
+        self._trades = {}
+        self.last_transaction_id = None
+        self.synced_at = 0.0
+        self.syncs = 0
+
+    # === Updates ===
+    def seed(self):
+        """Loads the full account snapshot."""
+        res = self.client.request(accounts.AccountDetails(self.account_id))
+        account = res["account"]
+        with self._lock:
+            self.summary = {k: v for k, v in account.items() if k not in ("positions", "trades", "orders")}
+            self._positions = {p["instrument"]: p for p in account.get("positions", [])}
+            self._trades = {t["id"]: t for t in account.get("trades", [])}
+            self.last_transaction_id = res.get("lastTransactionID", account.get("lastTransactionID"))
+            self.synced_at = time.monotonic()
+        logging.info(f"Account cache seeded at transaction {self.last_transaction_id} "
+                     f"({len(self._trades)} open trades)")
+
+    def sync(self):
+        """Applies every account change since the last seen transaction."""
+        with self._sync_lock:
+            if self.last_transaction_id is None:
+                return self.seed()
+            r = accounts.AccountChanges(self.account_id, params={"sinceTransactionID": self.last_transaction_id})
+            res = self.client.request(r)
+            self._apply(res.get("changes", {}), res.get("state", {}), res["lastTransactionID"])
+
+    def _apply(self, changes, state, last_id):
+        with self._lock:
+            for trade in changes.get("tradesOpened", []) + changes.get("tradesReduced", []):
+                self._trades[trade["id"]] = trade
+            for trade in changes.get("tradesClosed", []):
+                self._trades.pop(trade["id"], None)
+            for position in changes.get("positions", []):
+                self._positions[position["instrument"]] = position
+            for tx in changes.get("transactions", []):
+                if "accountBalance" in tx:
+                    self.summary["balance"] = tx["accountBalance"]
+
+            for key in ("NAV", "unrealizedPL", "marginUsed", "marginAvailable", "positionValue",
+                        "marginCloseoutPercent", "withdrawalLimit"):
+                if key in state:
+                    self.summary[key] = state[key]
+            for trade in state.get("trades", []):
+                if trade["id"] in self._trades:
+                    self._trades[trade["id"]]["unrealizedPL"] = trade["unrealizedPL"]
+            for position in state.get("positions", []):
+                if position["instrument"] in self._positions:
+                    self._positions[position["instrument"]]["unrealizedPL"] = position.get("netUnrealizedPL")
+
+            self.summary["openTradeCount"] = len(self._trades)
+            self.last_transaction_id = last_id
+            self.synced_at = time.monotonic()
+            self.syncs += 1
+
+    # === Background refresh ===
+    def start(self, stream=True):
+        """Seeds (if needed) and keeps the cache current from background threads."""
+        if self.last_transaction_id is None:
+            self.seed()
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._poll_loop, name="account-poll", daemon=True)]
+        if stream:
+            self._threads.append(threading.Thread(target=self._stream_loop, name="account-stream", daemon=True))
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.terminate("account cache stopped")
+            except Exception:
+                pass
+        for t in self._threads:
+            t.join(timeout=2)
+
+    def _poll_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.sync()
+            except Exception as e:
+                logging.warning(f"Account cache sync failed: {e}")
+
+    def _stream_loop(self):
+        while not self._stop.is_set():
+            try:
+                self._stream = transactions.TransactionsStream(self.account_id)
+                for tx in self.client.request(self._stream):
+                    if self._stop.is_set():
+                        break
+                    if tx.get("type") != "HEARTBEAT":
+                        self._wake.set()
+            except Exception as e:
+                if not self._stop.is_set():
+                    logging.warning(f"Transaction stream dropped: {e}")
+            finally:
+                self._stream = None
+            self._stop.wait(STREAM_RETRY)
+
+    # === Reads (no network) ===
+    def fresh(self):
+        return self.synced_at > 0 and time.monotonic() - self.synced_at <= self.stale_after
+
+    def balance(self):
+        with self._lock:
+            return float(self.summary["balance"])
+
+    def margin_available(self):
+        with self._lock:
+            return float(self.summary.get("marginAvailable", 0.0))
+
+    def exposure(self, instrument=None):
+        """Net units per instrument, or for one instrument (long positive, short negative)."""
+        with self._lock:
+            net = {
+                name: int(float(p.get("long", {}).get("units", 0))) + int(float(p.get("short", {}).get("units", 0)))
+                for name, p in self._positions.items()
+            }
+        if instrument is not None:
+            return net.get(instrument, 0)
+        return {name: units for name, units in net.items() if units}
+
+    def open_trades(self, instrument=None):
+        with self._lock:
+            return [dict(t) for t in self._trades.values() if instrument is None or t["instrument"] == instrument]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "summary": dict(self.summary),
+                "positions": {k: dict(v) for k, v in self._positions.items()},
+                "trades": [dict(t) for t in self._trades.values()],
+                "last_transaction_id": self.last_transaction_id,
+                "age_s": round(time.monotonic() - self.synced_at, 3) if self.synced_at else None,
+            }
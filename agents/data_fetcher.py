@@ -3,24 +3,23 @@ import logging
 import time
 from datetime import datetime
 import pandas as pd
-import talib
-import oandapyV20
-import oandapyV20.endpoints.pricing as pricing
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import OANDA_API_KEY, OANDA_ACCOUNT_ID, INSTRUMENTS, FETCH_INTERVAL
-# Configure logging
+from utils.lazy import lazy_import
+from utils.oanda_client import get_client, is_retryable
+from utils.retry import RetryPolicy
+from utils.log_setup import setup_logging
+
+talib = lazy_import("talib")
+pricing = lazy_import("oandapyV20.endpoints.pricing")
+
+# Logging is configured by the entry point
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "sapera_2_0.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(LOG_FILE), logging.StreamHandler()],
-)
 
 DATA_DIR = "data"
-os.makedirs(DATA_DIR, exist_ok=True)
+FETCH_DEADLINE = 5.0  # seconds a price fetch may spend retrying; the next cycle tries again
 
 
 class DataFetcher:
@@ -30,12 +29,15 @@ class DataFetcher:
     def __init__(self, api_key, account_id):
         self.api_key = api_key
         self.account_id = account_id
-        self.client = oandapyV20.API(access_token=self.api_key)
+        self.client = get_client(self.api_key)
+        self.retry = RetryPolicy("pricing.fetch", attempts=3, base=0.25, cap=2.0, deadline=FETCH_DEADLINE,
+                                 retryable=is_retryable)
         logging.info("DataFetcher initialized.")
 
 
     def _initialize_session_file(self):
         """Generate a single session-specific file for appending data."""
+        os.makedirs(DATA_DIR, exist_ok=True)
         session_start_time = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = os.path.join(DATA_DIR, f"live_data_session_{session_start_time}.csv")
         logging.info(f"Session file initialized: {filename}")
@@ -46,7 +48,7 @@ class DataFetcher:
         try:
             logging.info(f"Fetching live data for instruments: {instruments}")
             request = pricing.PricingInfo(accountID=self.account_id, params={"instruments": instruments})
-            response = self.client.request(request)
+            response = self.retry.run(lambda: self.client.request(request))
 
             prices = response.get("prices", [])
             if not prices:
@@ -138,6 +140,7 @@ class DataFetcher:
 
 
 if __name__ == "__main__":
+    setup_logging(LOG_FILE)
     instruments_list = ",".join(INSTRUMENTS)  # Fetch instruments from config
     fetcher = DataFetcher()
     fetcher.run(instruments=instruments_list, interval=FETCH_INTERVAL)
@@ -0,0 +1,272 @@
+"""
+Parallel hyperparameter search for LSTMModel on CPU.
+
+Trials run in a pool of worker processes. Each worker is pinned to its own
+slice of cores and TensorFlow's intra-op pool is sized to that slice, so
+concurrent trials use every core without oversubscribing them. Trials whose
+validation loss lags the median of earlier trials after a few epochs are pruned.
+
+    python -m agents.hyperparameter_search --data data/historical_data.csv --max-trials 24
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.log_setup import setup_logging
+
+FEATURES = ["open", "high", "low", "close", "volume"]
+SEARCH_DIR = "models/search"
+SEARCH_SPACE = {
+    "look_back": [30, 50, 100],
+    "units": [32, 64, 128],
+    "dropout": [0.2, 0.3],
+    "label_threshold": [0.001, 0.002, 0.004],
+    "epochs": [10, 20],
+}
+VAL_FRACTION = 0.2
+WARMUP_EPOCHS = 3  # epochs before a trial can be pruned
+MIN_PEERS = 3  # earlier trials needed at an epoch before pruning against their median
+PATIENCE = 3  # epochs without val-loss improvement before a trial stops on its own
+
+
+# ==========================
+# WORKERS
+# ==========================
+def core_slices(threads_per_trial):
+    """Disjoint core sets, one per concurrent trial."""
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    threads_per_trial = max(1, min(threads_per_trial, len(cores)))
+    return [cores[i:i + threads_per_trial] for i in range(0, len(cores) - threads_per_trial + 1, threads_per_trial)]
+
+
+def _init_worker(slots):
+    """Claims a core slice, pins this process to it and sizes TensorFlow's thread pools to match."""
+    cores = slots.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    os.environ["OMP_NUM_THREADS"] = str(len(cores))
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(len(cores))
+    tf.config.threading.set_inter_op_parallelism_threads(min(2, len(cores)))
+    logging.disable(logging.INFO)
+
+
+class MedianPruner:
+    """
+    Shared across workers through a Manager. A trial is pruned when, past the
+    warm-up epochs, its validation loss is worse than the median reported by
+    earlier trials at the same epoch. Trials with different label thresholds
+    solve different classification tasks, so each threshold is compared only
+    with its own group.
+    """
+    def __init__(self, manager, warmup_epochs=WARMUP_EPOCHS, min_peers=MIN_PEERS):
+        self.warmup_epochs = warmup_epochs
+        self.min_peers = min_peers
+        self._losses = manager.dict()
+        self._lock = manager.Lock()
+
+    def report(self, group, epoch, loss):
+        """Records a validation loss; returns True if the trial should stop."""
+        key = (group, epoch)
+        with self._lock:
+            peers = list(self._losses.get(key, []))
+            self._losses[key] = peers + [loss]
+        return (
+            epoch + 1 >= self.warmup_epochs
+            and len(peers) >= self.min_peers
+            and loss > float(np.median(peers))
+        )
+
+
+def run_trial(trial_id, params, series_path, split, workdir, pruner, batch_size=256, patience=PATIENCE):
+    """Trains one configuration on the train split and scores it on the validation split."""
+    from agents.lstm_model import LSTMModel
+
+    start = time.perf_counter()
+    result = {"trial": trial_id, "params": params, "status": "complete", "history": []}
+    try:
+        series = np.load(series_path, mmap_mode="r")
+        lstm = LSTMModel(
+            model_path=os.path.join(workdir, f"trial_{trial_id}.keras"),
+            look_back=params["look_back"],
+            units=params["units"],
+            dropout=params["dropout"],
+            label_threshold=params["label_threshold"],
+        )
+        train, val = series[:split], series[split - params["look_back"]:]
+        train_ds = lstm.window_dataset(train, lstm.make_labels(train), batch_size=batch_size, shuffle=True)
+        val_ds = lstm.window_dataset(val, lstm.make_labels(val), batch_size=batch_size)
+
+        best_loss, best_weights, stale = np.inf, None, 0
+        for epoch in range(params["epochs"]):
+            fit = lstm.model.fit(train_ds, epochs=epoch + 1, initial_epoch=epoch, verbose=0)
+            val_loss, val_accuracy = lstm.model.evaluate(val_ds, verbose=0)
+            result["history"].append({
+                "epoch": epoch + 1,
+                "loss": float(fit.history["loss"][-1]),
+                "val_loss": float(val_loss),
+                "val_accuracy": float(val_accuracy),
+            })
+            if val_loss < best_loss:
+                best_loss, best_weights, stale = val_loss, lstm.model.get_weights(), 0
+                result["val_loss"], result["val_accuracy"], result["best_epoch"] = float(val_loss), float(val_accuracy), epoch + 1
+            else:
+                stale += 1
+            prune = pruner.report(params["label_threshold"], epoch, float(val_loss))
+            if prune and epoch + 1 < params["epochs"]:
+                result["status"] = "pruned"
+                break
+            if stale >= patience:
+                break
+
+        if result["status"] == "complete":
+            lstm.model.set_weights(best_weights)
+            lstm.save_model()
+            result["model_path"] = lstm.model_path
+    except Exception as e:
+        result.update(status="error", reason=repr(e))
+    result["wall_s"] = round(time.perf_counter() - start, 2)
+    return result
+
+
+# ==========================
+# DRIVER
+# ==========================
+def trial_configs(space=SEARCH_SPACE, max_trials=None, seed=0):
+    """Full grid, or a seeded random sample of it when `max_trials` is smaller."""
+    keys = list(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+    if max_trials and max_trials < len(grid):
+        grid = random.Random(seed).sample(grid, max_trials)
+    return grid
+
+
+def prepare_series(data, workdir, val_fraction=VAL_FRACTION):
+    """
+    Scales `data` with a MinMaxScaler fitted on the training rows only (so the
+    validation split stays unseen) and writes it to a float32 .npy that every
+    worker memory-maps. Returns (series path, scaler path, split row).
+    """
+    import joblib
+    from sklearn.preprocessing import MinMaxScaler
+
+    os.makedirs(workdir, exist_ok=True)
+    split = int(len(data) * (1 - val_fraction))
+    scaler = MinMaxScaler().fit(data[:split])
+    series_path = os.path.join(workdir, "series.npy")
+    np.save(series_path, scaler.transform(data).astype(np.float32))
+    scaler_path = os.path.join(workdir, "scaler.save")
+    joblib.dump(scaler, scaler_path)
+    return series_path, scaler_path, split
+
+
+def search(data, space=SEARCH_SPACE, max_trials=None, threads_per_trial=1, workdir=SEARCH_DIR,
+           val_fraction=VAL_FRACTION, batch_size=256, warmup_epochs=WARMUP_EPOCHS, seed=0, data_range=None):
+    """
+    Runs the search and returns trial results, best validation loss first.
+    `data_range` is an optional (first, last) bar timestamp pair, recorded in
+    results.json and published with the best trial.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    series_path, _, split = prepare_series(data, workdir, val_fraction)
+    configs = trial_configs(space, max_trials, seed)
+    slices = core_slices(threads_per_trial)
+    logging.info(f"Searching {len(configs)} trials on {len(slices)} workers x {len(slices[0])} cores")
+
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Manager() as manager:
+        slots = manager.Queue()
+        for cores in slices:
+            slots.put(cores)
+        pruner = MedianPruner(manager, warmup_epochs)
+        results = []
+        with ProcessPoolExecutor(len(slices), mp_context=ctx, initializer=_init_worker, initargs=(slots,)) as pool:
+            futures = [
+                pool.submit(run_trial, i, params, series_path, split, workdir, pruner, batch_size)
+                for i, params in enumerate(configs)
+            ]
+            for future in as_completed(futures):
+                r = future.result()
+                results.append(r)
+                logging.info(
+                    f"Trial {r['trial']} {r['status']} in {r['wall_s']}s "
+                    f"val_loss={r.get('val_loss', float('nan')):.4f} {r['params']}"
+                )
+
+    results.sort(key=lambda r: (r["status"] != "complete", r.get("val_loss", np.inf)))
+    with open(os.path.join(workdir, "results.json"), "w") as f:
+        json.dump({
+            "val_fraction": val_fraction,
+            "split": split,
+            "rows": len(data),
+            "data_range": {
+                "rows": len(data),
+                "start": data_range[0] if data_range else None,
+                "end": data_range[1] if data_range else None,
+            },
+            "trials": results,
+        }, f, indent=2)
+    return results
+
+
+def publish_best(results, workdir=SEARCH_DIR, registry=None):
+    """
+    Publishes the best completed trial (with the search scaler and the data range
+    from results.json) to the model registry.
+    """
+    import joblib
+    from tensorflow.keras.models import load_model
+    from agents.model_registry import ModelRegistry
+
+    best = next((r for r in results if r["status"] == "complete"), None)
+    if best is None:
+        raise RuntimeError("No completed trial to publish.")
+    registry = registry or ModelRegistry()
+    scaler = joblib.load(os.path.join(workdir, "scaler.save"))
+    with open(os.path.join(workdir, "results.json"), "r") as f:
+        data_range = json.load(f).get("data_range")
+    return registry.publish(load_model(best["model_path"]), scaler, {
+        "feature_config": {"features": FEATURES, **{k: v for k, v in best["params"].items() if k != "epochs"}},
+        "data_range": data_range,
+        "metrics": {"val_loss": best["val_loss"], "val_accuracy": best["val_accuracy"]},
+        "epochs": best["best_epoch"],
+        "search_trial": best["trial"],
+    })
+
+
+if __name__ == "__main__":
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Parallel LSTM hyperparameter search.")
+    parser.add_argument("--data", default="data/historical_data.csv", help="CSV with time and OHLCV columns")
+    parser.add_argument("--max-trials", type=int, default=None, help="random sample of the grid")
+    parser.add_argument("--threads-per-trial", type=int, default=1, help="cores pinned to each worker")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workdir", default=SEARCH_DIR)
+    parser.add_argument("--publish", action="store_true", help="publish the best trial to the model registry")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    results = search(
+        df[FEATURES].values,
+        max_trials=args.max_trials,
+        threads_per_trial=args.threads_per_trial,
+        workdir=args.workdir,
+        batch_size=args.batch_size,
+        data_range=(str(df["time"].iloc[0]), str(df["time"].iloc[-1])) if "time" in df.columns else None,
+    )
+    for r in results[:5]:
+        print(f"{r['status']:<9}{r.get('val_loss', float('nan')):>10.4f}  {r['params']}")
+    if args.publish:
+        print(f"Published model version {publish_best(results, args.workdir)}")
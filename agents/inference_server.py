@@ -0,0 +1,303 @@
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import threading
+import socketserver
+from collections import deque
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import INFERENCE_HOST, INFERENCE_PORT
+from agents.model_registry import REGISTRY_DIR
+from utils.log_setup import setup_logging
+
+# === Logging (configured when run as a service) ===
+LOG_DIR = "logs"
+LOG_FILE = os.path.join(LOG_DIR, "inference_server.log")
+
+MODEL_PATH = "models/lstm_model.keras"
+LOOK_BACK = 50
+LATENCY_WINDOW = 10_000  # recent requests kept for percentiles
+REGISTRY_POLL_SECONDS = 30
+
+
+class InferenceStats:
+    """Thread-safe request, error and latency counters."""
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.by_op = {}
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, op, seconds, ok=True):
+        with self._lock:
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self.by_op[op] = self.by_op.get(op, 0) + 1
+            self.total_latency += seconds
+            self.max_latency = max(self.max_latency, seconds)
+            self.latencies.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            recent = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+            return {
+                "uptime_s": round(time.time() - self.started, 1),
+                "requests": self.requests,
+                "errors": self.errors,
+                "by_op": dict(self.by_op),
+                "latency_ms": {
+                    "mean": round(self.total_latency / self.requests * 1000, 3) if self.requests else 0.0,
+                    "p50": round(float(np.percentile(recent, 50)), 3),
+                    "p95": round(float(np.percentile(recent, 95)), 3),
+                    "p99": round(float(np.percentile(recent, 99)), 3),
+                    "max": round(self.max_latency * 1000, 3),
+                },
+            }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line, one JSON response per line, for as long as the caller stays connected."""
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.dispatch(line)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class InferenceServer(socketserver.ThreadingTCPServer):
+    """
+    Keeps one LSTMModel (graph, weights and scaler) resident and serves predictions
+    to local callers, so a trading cycle never pays TensorFlow's cold start.
+    Each connection gets its own thread; forward passes are serialized on the model.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, model, host=INFERENCE_HOST, port=INFERENCE_PORT):
+        super().__init__((host, port), _RequestHandler)
+        self.model = model
+        self.stats = InferenceStats()
+        self._model_lock = threading.Lock()
+        self._streamer = None
+        self._streamer_version = None
+        logging.info(f"Inference server listening on {host}:{self.server_address[1]}")
+
+    def watch_registry(self, interval=REGISTRY_POLL_SECONDS):
+        """Background thread that hot-swaps the model when the registry's active version changes."""
+        def poll():
+            while True:
+                time.sleep(interval)
+                try:
+                    if self.model.refresh(lock=self._model_lock):
+                        logging.info(f"Switched to model version {self.model.version_id}")
+                except Exception as e:
+                    logging.error(f"Model refresh failed, keeping version {self.model.version_id}: {e}")
+
+        thread = threading.Thread(target=poll, name="registry-watch", daemon=True)
+        thread.start()
+        return thread
+
+    def streamer(self):
+        """Per-instrument streaming state, rebuilt whenever the model reloads. Call under the model lock."""
+        version = getattr(self.model, "model_version", None)
+        if self._streamer is None or version != self._streamer_version:
+            self._streamer = self.model.streaming()
+            self._streamer_version = version
+        return self._streamer
+
+    def dispatch(self, line):
+        start = time.perf_counter()
+        op = "invalid"
+        try:
+            request = json.loads(line)
+            op = request.get("op", "predict")
+            if op == "ping":
+                response = {"ok": True, "look_back": self.model.look_back,
+                            "version": getattr(self.model, "version_id", None)}
+            elif op == "stats":
+                stats = self.stats.snapshot()
+                if hasattr(self.model, "cache"):
+                    stats["prediction_cache"] = self.model.cache.stats()
+                if self._streamer is not None:
+                    stats["streaming"] = self._streamer.stats()
+                response = {"ok": True, "stats": stats}
+            elif op == "predict":
+                data = np.asarray(request["data"], dtype=np.float64)
+                with self._model_lock:
+                    prediction = self.model.predict(data, request.get("instrument"), request.get("timestamp"))
+                response = {"ok": True, "prediction": prediction.tolist()}
+            elif op == "prime":
+                data = np.asarray(request["data"], dtype=np.float64)
+                with self._model_lock:
+                    prediction = self.streamer().prime(request["instrument"], data)
+                response = {"ok": True, "prediction": prediction}
+            elif op == "step":
+                with self._model_lock:
+                    predictions = self.streamer().update_batch(request["bars"], request.get("time"))
+                response = {"ok": True, "prediction": predictions}
+            elif op == "predict_batch":
+                df = pd.DataFrame(request["data"], columns=["open", "high", "low", "close", "volume"])
+                df.insert(0, "instrument", request["instrument"])
+                with self._model_lock:
+                    result = self.model.predict_batch(df, all_windows=request.get("all_windows", False))
+                response = {
+                    "ok": True,
+                    "positions": result.index.tolist(),
+                    "prediction": result["prediction"].tolist(),
+                }
+            else:
+                raise ValueError(f"Unknown op: {op}")
+            ok = True
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+            ok = False
+        self.stats.record(op, time.perf_counter() - start, ok)
+        return response
+
+
+class InferenceClient:
+    """
+    Persistent connection to an InferenceServer. `predict` mirrors LSTMModel.predict,
+    so callers can use either one.
+    """
+    def __init__(self, host=INFERENCE_HOST, port=INFERENCE_PORT, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.look_back = None
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, host=INFERENCE_HOST, port=INFERENCE_PORT, timeout=5.0):
+        """Returns a connected client, or None if no server is answering."""
+        client = cls(host, port, timeout)
+        try:
+            client.look_back = client._call({"op": "ping"})["look_back"]
+            return client
+        except (OSError, RuntimeError, KeyError):
+            client.close()
+            return None
+
+    def _open(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rwb")
+
+    def _call(self, payload):
+        message = json.dumps(payload).encode() + b"\n"
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._open()
+                    self._file.write(message)
+                    self._file.flush()
+                    line = self._file.readline()
+                    if not line:
+                        raise ConnectionError("Inference server closed the connection.")
+                    break
+                except OSError:
+                    # One reconnect covers a server restart between calls
+                    self.close()
+                    if attempt == 1:
+                        raise
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RuntimeError(f"Inference server error: {response.get('error')}")
+        return response
+
+    def predict(self, data, instrument=None, timestamp=None):
+        data = np.asarray(data)
+        if self.look_back and data.ndim == 2:
+            # Rows are scaled independently, so only the last window matters
+            data = data[-self.look_back:]
+        payload = {"op": "predict", "data": data.tolist()}
+        if instrument is not None:
+            payload["instrument"] = str(instrument)
+        if timestamp is not None:
+            payload["timestamp"] = str(timestamp)
+        return np.array(self._call(payload)["prediction"])
+
+    def predict_batch(self, df, all_windows=False):
+        """Same contract as LSTMModel.predict_batch; the forward pass runs on the server."""
+        instruments = df["instrument"] if "instrument" in df.columns else pd.Series("default", index=df.index)
+        response = self._call({
+            "op": "predict_batch",
+            "instrument": instruments.astype(str).tolist(),
+            "data": df[["open", "high", "low", "close", "volume"]].values.tolist(),
+            "all_windows": all_windows,
+        })
+        positions = np.array(response["positions"], dtype=np.int64)
+        predictions = np.array(response["prediction"], dtype=np.int64)
+        return pd.DataFrame({
+            "instrument": instruments.values[positions],
+            "time": df["time"].values[positions] if "time" in df.columns else df.index[positions],
+            "prediction": predictions,
+            "label": np.array(["Hold", "Buy", "Sell"])[predictions],
+        }, index=df.index[positions])
+
+    def prime(self, instrument, history):
+        """Seeds server-side streaming state for `instrument` from its latest OHLCV rows."""
+        history = np.asarray(history)[-self.look_back:] if self.look_back else np.asarray(history)
+        return self._call({"op": "prime", "instrument": instrument, "data": history.tolist()})["prediction"]
+
+    def step(self, bars, timestamps=None):
+        """
+        Advances server-side streaming state by one closed bar per instrument
+        ({instrument: [open, high, low, close, volume]}); see StreamingLSTM.update_batch.
+        """
+        payload = {"op": "step", "bars": {k: np.asarray(v).tolist() for k, v in bars.items()}}
+        if timestamps:
+            payload["time"] = {k: str(v) for k, v in timestamps.items()}
+        return self._call(payload)["prediction"]
+
+    def stats(self):
+        return self._call({"op": "stats"})["stats"]
+
+    def close(self):
+        for handle in (self._file, self._sock):
+            try:
+                if handle is not None:
+                    handle.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+
+def serve(model_path=MODEL_PATH, look_back=LOOK_BACK, host=INFERENCE_HOST, port=INFERENCE_PORT,
+          registry_dir=REGISTRY_DIR, poll_interval=REGISTRY_POLL_SECONDS):
+    from agents.lstm_model import LSTMModel
+    from agents.model_registry import ModelRegistry
+
+    model = LSTMModel(model_path=model_path, look_back=look_back, registry=ModelRegistry(registry_dir))
+    # Warm-up pass so the first real request doesn't pay for graph tracing
+    if hasattr(model.scaler, "min_"):
+        model.predict(np.tile(model.scaler.data_min_, (model.look_back, 1)))
+    with InferenceServer(model, host, port) as server:
+        server.watch_registry(poll_interval)
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    setup_logging(LOG_FILE)
+    try:
+        serve()
+    except KeyboardInterrupt:
+        logging.info("Inference server stopped.")
@@ -1,16 +1,25 @@
 import os
+import sys
+import copy
+from contextlib import nullcontext
 import numpy as np
 import pandas as pd
 import joblib
 import logging
+import tensorflow as tf
+from numpy.lib.stride_tricks import sliding_window_view
 from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from sklearn.preprocessing import MinMaxScaler
 from tensorflow.keras.callbacks import ModelCheckpoint
 
-# === Logging Setup ===
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache import TTLCache, array_digest
+from agents.model_registry import ModelRegistry, MODEL_FILE, SCALER_FILE
+from utils.log_setup import setup_logging
+
+# === Logging (configured by the entry point) ===
 LOG_FILE = "logs/lstm_model.log"
-os.makedirs("logs", exist_ok=True)
 
 def safe_log(msg):
     try:
@@ -18,114 +27,491 @@ def safe_log(msg):
     except UnicodeEncodeError:
         logging.info(msg.encode("ascii", "ignore").decode())
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding="utf-8"),
-        logging.StreamHandler()
-    ],
-)
+LABEL_THRESHOLD = 0.002  # scaled close change that separates Buy/Sell from Hold
+CLASS_LABELS = ["Hold", "Buy", "Sell"]
+FEATURES = ["open", "high", "low", "close", "volume"]
+SCALE_CHUNK_ROWS = 1_000_000
+LSTM_UNITS = 64
+DROPOUT = 0.3
+FINE_TUNE_EPOCHS = 3
+FINE_TUNE_LR = 1e-4  # well below Adam's default so new bars adjust rather than overwrite
+REPLAY_RATIO = 0.5  # older windows mixed in per new training window
+FINE_TUNE_TOLERANCE = 0.02  # accepted relative val-loss increase over the parent version
+SCALER_POLICIES = ("fixed", "expand")
+PREDICTION_CACHE_SIZE = 16384  # cached windows across all instruments; holds every window of a few 5k-bar histories
+PREDICTION_CACHE_TTL = 900  # seconds; spans a few trading cycles
 
 class LSTMModel:
     """
     LSTM-based classification model to predict direction (Buy/Sell/Hold)
     using OHLCV features.
     """
-    def __init__(self, model_path="models/lstm_model.keras", look_back=50):
+    def __init__(self, model_path="models/lstm_model.keras", look_back=50,
+                 cache_size=PREDICTION_CACHE_SIZE, cache_ttl=PREDICTION_CACHE_TTL, registry=None,
+                 units=LSTM_UNITS, dropout=DROPOUT, label_threshold=LABEL_THRESHOLD):
         self.look_back = look_back
+        self.units = units
+        self.dropout = dropout
+        self.label_threshold = label_threshold
         self.model_path = model_path
         self.scaler_path = model_path.replace(".keras", "_scaler.save")
         self.scaler = MinMaxScaler()
+        self.model_version = 0
+        self.cache = TTLCache(cache_size, cache_ttl)
+        # With a ModelRegistry, versions are loaded from and published to the registry;
+        # model_path is only used as a fallback until the first version exists
+        self.registry = registry
+        self.version_id = None
+        self.metadata = {}
         self.model = self.build_model()
-        self.load_model()
-        self.load_scaler()
+        if registry is not None and registry.current_version():
+            self.load_version()
+        else:
+            self.load_model()
+            self.load_scaler()
 
     def build_model(self):
         model = Sequential([
-            LSTM(64, return_sequences=True, input_shape=(self.look_back, 5)),
-            Dropout(0.3),
-            LSTM(64),
-            Dropout(0.3),
+            LSTM(self.units, return_sequences=True, input_shape=(self.look_back, 5)),
+            Dropout(self.dropout),
+            LSTM(self.units),
+            Dropout(self.dropout),
             Dense(3, activation="softmax")  # [Hold, Buy, Sell]
         ])
         model.compile(optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"])
         safe_log("✅ LSTM classification model built.")
         return model
 
+    def window_view(self, scaled):
+        """All look_back-length windows of `scaled` as a strided view (no copy)."""
+        return sliding_window_view(scaled, (self.look_back, scaled.shape[1]))[:, 0]
+
+    def make_labels(self, scaled):
+        """
+        Class index per training window (0 Hold, 1 Buy, 2 Sell) from the change in
+        scaled close between the bar after the window and the one after that.
+        """
+        close = scaled[:, 3]
+        delta = close[self.look_back + 1:] - close[self.look_back:-1]
+        labels = np.zeros(len(delta), dtype=np.int8)
+        labels[delta > self.label_threshold] = 1
+        labels[delta < -self.label_threshold] = 2
+        return labels
+
     def preprocess_data(self, data):
         scaled = self.scaler.fit_transform(data)
-        X, y = [], []
-        for i in range(self.look_back, len(scaled) - 1):
-            X.append(scaled[i - self.look_back:i])
-            delta = scaled[i + 1, 3] - scaled[i, 3]  # change in close
-            if delta > 0.002:
-                label = [0, 1, 0]  # Buy
-            elif delta < -0.002:
-                label = [0, 0, 1]  # Sell
-            else:
-                label = [1, 0, 0]  # Hold
-            y.append(label)
-        return np.array(X), np.array(y)
+        labels = self.make_labels(scaled)
+        if len(labels) == 0:
+            return np.empty((0, self.look_back, scaled.shape[1])), np.empty((0, 3), dtype=int)
+        X = self.window_view(scaled)[:len(labels)]
+        y = np.eye(3, dtype=int)[labels]
+        return X, y
+
+    def prepare_series(self, data, path):
+        """
+        Fits the scaler over `data` chunk by chunk and writes the scaled series to a
+        float32 .npy file, returned memory-mapped for the training pipeline.
+        """
+        self.scaler = MinMaxScaler()
+        for start in range(0, len(data), SCALE_CHUNK_ROWS):
+            self.scaler.partial_fit(data[start:start + SCALE_CHUNK_ROWS])
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=data.shape)
+        for start in range(0, len(data), SCALE_CHUNK_ROWS):
+            out[start:start + SCALE_CHUNK_ROWS] = self.scaler.transform(data[start:start + SCALE_CHUNK_ROWS])
+        out.flush()
+        del out
+        return np.load(path, mmap_mode="r")
+
+    def window_dataset(self, series, labels=None, count=None, batch_size=32, shuffle=False, starts=None):
+        """
+        tf.data pipeline that gathers look_back windows from `series` per batch,
+        so only the batches in flight are ever materialized. Batches are built in
+        parallel and prefetched while the model trains on the previous ones.
+        `starts` restricts it to explicit window start rows.
+        """
+        if count is None and starts is None:
+            count = len(labels) if labels is not None else len(series) - self.look_back + 1
+        offsets = np.arange(self.look_back)
+        features = series.shape[1]
+
+        def gather(idx):
+            return np.asarray(series[idx[:, None] + offsets], dtype=np.float32)
+
+        def to_batch(idx):
+            X = tf.numpy_function(gather, [idx], tf.float32)
+            X.set_shape((None, self.look_back, features))
+            if labels is None:
+                return X
+            y = tf.one_hot(tf.cast(tf.gather(label_tensor, idx), tf.int32), 3)
+            return X, y
+
+        if labels is not None:
+            label_tensor = tf.constant(labels)
+        if starts is not None:
+            ds = tf.data.Dataset.from_tensor_slices(np.asarray(starts, dtype=np.int64))
+            if shuffle:
+                ds = ds.shuffle(len(starts), reshuffle_each_iteration=True)
+            ds = ds.batch(batch_size)
+        elif shuffle:
+            # Fresh permutation of window indices each epoch; only indices are shuffled
+            ds = tf.data.Dataset.from_tensors(tf.constant(count, dtype=tf.int64)).flat_map(
+                lambda n: tf.data.Dataset.from_tensor_slices(tf.random.shuffle(tf.range(n))).batch(batch_size)
+            )
+        else:
+            ds = tf.data.Dataset.range(count).batch(batch_size)
+        return ds.map(to_batch, num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+    def feature_config(self):
+        return {
+            "features": FEATURES,
+            "look_back": self.look_back,
+            "label_threshold": self.label_threshold,
+            "units": self.units,
+            "dropout": self.dropout,
+        }
+
+    def train_model(self, data, epochs=10, batch_size=32, series_path=None, data_range=None):
+        """
+        Trains from a memory-mapped scaled copy of `data` (an array or a path to a
+        .npy file), feeding windows through window_dataset instead of
+        materializing every window up front.
 
-    def train_model(self, data, epochs=10, batch_size=32):
-        X, y = self.preprocess_data(data)
+        With a registry the checkpoint and final model are written into a staging
+        directory and published as a new version (its ID is returned), so nothing
+        a running service reads is ever overwritten. `data_range` is an optional
+        (first, last) bar timestamp pair recorded with the version.
+        """
+        if isinstance(data, str):
+            data = np.load(data, mmap_mode="r")
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+        if self.registry is not None:
+            version, staging = self.registry.stage()
+            checkpoint_path = os.path.join(staging, "checkpoint.keras")
+        else:
+            checkpoint_path = self.model_path.replace(".keras", "_checkpoint.keras")
+        series_path = series_path or self.model_path.replace(".keras", "_series.npy")
+        series = self.prepare_series(data, series_path)
+        labels = self.make_labels(series)
+        dataset = self.window_dataset(series, labels, batch_size=batch_size, shuffle=True)
         checkpoint_cb = ModelCheckpoint(
-            self.model_path, monitor="loss", mode="min", save_best_only=True, verbose=1
+            checkpoint_path, monitor="loss", mode="min", save_best_only=True, verbose=1
+        )
+        try:
+            history = self.model.fit(dataset, epochs=epochs, callbacks=[checkpoint_cb])
+        except BaseException:
+            if self.registry is not None:
+                self.registry.discard(staging)
+            raise
+        self._model_changed()
+
+        if self.registry is None:
+            self.save_model()
+            self.save_scaler()
+            return None
+
+        metadata = {
+            "feature_config": self.feature_config(),
+            "data_range": {
+                "rows": len(data),
+                "start": data_range[0] if data_range else None,
+                "end": data_range[1] if data_range else None,
+            },
+            "metrics": {name: float(values[-1]) for name, values in history.history.items()},
+            "epochs": len(history.epoch),
+            "batch_size": batch_size,
+        }
+        self.model.save(os.path.join(staging, MODEL_FILE))
+        joblib.dump(self.scaler, os.path.join(staging, SCALER_FILE))
+        self.registry.export_weights(staging, self.model, self.scaler)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.version_id = self.registry.commit(version, staging, metadata)
+        self.metadata = self.registry.metadata(self.version_id)
+        return self.version_id
+
+    def fine_tune(self, df, epochs=FINE_TUNE_EPOCHS, batch_size=32, replay_ratio=REPLAY_RATIO,
+                  scaler_policy="fixed", val_fraction=0.2, tolerance=FINE_TUNE_TOLERANCE, seed=0):
+        """
+        Continues training the loaded registry version on bars after its training
+        cutoff, mixed with a random replay sample of older windows so it doesn't
+        forget the rest of the history. `df` holds `time` plus OHLCV in time order.
+
+        scaler_policy "fixed" keeps the parent's scaler (labels and inputs stay
+        comparable); "expand" partial_fits it on the new bars so out-of-range
+        prices stay within [0, 1], at the cost of shifting every input.
+
+        The newest `val_fraction` of the new windows is held out. The result is
+        published only if its loss there is within `tolerance` of the parent's;
+        returns the new version ID, or None if there was nothing to do or it was rejected.
+        """
+        if self.registry is None or self.version_id is None:
+            raise RuntimeError("Fine-tuning needs a model version loaded from the registry.")
+        if scaler_policy not in SCALER_POLICIES:
+            raise ValueError(f"Unknown scaler policy: {scaler_policy}")
+        data_range = self.metadata.get("data_range") or {}
+        if not data_range.get("end"):
+            raise RuntimeError(f"Version {self.version_id} has no training cutoff; run train_model with data_range.")
+
+        times = pd.to_datetime(df["time"], utc=True)
+        is_new = (times > pd.to_datetime(data_range["end"], utc=True)).values
+        if not is_new.any():
+            safe_log(f"ℹ️ No bars after {data_range['end']}; nothing to fine-tune.")
+            return None
+        first_new = int(is_new.argmax())
+
+        data = df[FEATURES].values.astype(np.float64)
+        scaler = copy.deepcopy(self.scaler)
+        if scaler_policy == "expand":
+            scaler.partial_fit(data[first_new:])
+        else:
+            scaled_new = scaler.transform(data[first_new:])
+            outside = np.mean((scaled_new < 0) | (scaled_new > 1))
+            if outside:
+                safe_log(f"⚠️ {outside * 100:.1f}% of new feature values fall outside the scaler range.")
+        series = scaler.transform(data).astype(np.float32)
+        labels = self.make_labels(series)
+
+        # Windows whose inputs or label bars reach past the cutoff
+        new_starts = np.arange(max(0, first_new - self.look_back - 1), len(labels))
+        n_val = max(1, int(len(new_starts) * val_fraction))
+        if len(new_starts) - n_val < 1:
+            safe_log(f"ℹ️ Only {len(new_starts)} new windows; waiting for more bars.")
+            return None
+        train_starts, val_starts = new_starts[:-n_val], new_starts[-n_val:]
+        old_starts = np.arange(0, new_starts[0])
+        rng = np.random.default_rng(seed)
+        replay = rng.choice(old_starts, min(len(old_starts), int(len(train_starts) * replay_ratio)), replace=False)
+
+        if scaler_policy == "fixed":
+            parent_series, parent_labels = series, labels
+        else:
+            parent_series = self.scaler.transform(data).astype(np.float32)
+            parent_labels = self.make_labels(parent_series)
+        baseline_loss, _ = self.model.evaluate(
+            self.window_dataset(parent_series, parent_labels, batch_size=batch_size, starts=val_starts), verbose=0
         )
-        self.model.fit(X, y, epochs=epochs, batch_size=batch_size, callbacks=[checkpoint_cb])
-        self.save_model()
-        self.save_scaler()
 
-    def predict(self, data):
+        model = tf.keras.models.clone_model(self.model)
+        model.set_weights(self.model.get_weights())
+        model.compile(optimizer=tf.keras.optimizers.Adam(FINE_TUNE_LR), loss="categorical_crossentropy", metrics=["accuracy"])
+        history = model.fit(
+            self.window_dataset(series, labels, batch_size=batch_size, shuffle=True,
+                                starts=np.concatenate([train_starts, replay])),
+            epochs=epochs,
+        )
+        val_loss, val_accuracy = model.evaluate(
+            self.window_dataset(series, labels, batch_size=batch_size, starts=val_starts), verbose=0
+        )
+        safe_log(f"📊 Fine-tune val loss {val_loss:.4f} vs parent {baseline_loss:.4f} "
+                 f"({len(train_starts)} new + {len(replay)} replay windows)")
+        if val_loss > baseline_loss * (1 + tolerance):
+            safe_log(f"⚠️ Fine-tuned model rejected; keeping version {self.version_id}.")
+            return None
+
+        parent = self.version_id
+        version = self.registry.publish(model, scaler, {
+            "feature_config": self.feature_config(),
+            "data_range": {"rows": len(df), "start": data_range.get("start"), "end": str(df["time"].iloc[-1])},
+            "metrics": {
+                "loss": float(history.history["loss"][-1]),
+                "val_loss": float(val_loss),
+                "val_accuracy": float(val_accuracy),
+                "parent_val_loss": float(baseline_loss),
+            },
+            "epochs": epochs,
+            "batch_size": batch_size,
+            "fine_tune": {
+                "parent": parent,
+                "new_windows": len(train_starts),
+                "replay_windows": len(replay),
+                "val_windows": len(val_starts),
+                "scaler_policy": scaler_policy,
+            },
+        })
+        self.model, self.scaler = model, scaler
+        self.version_id = version
+        self.metadata = self.registry.metadata(version)
+        self._model_changed()
+        return version
+
+    def load_version(self, version=None, lock=None):
+        """
+        Loads a registry version (the active one by default) and swaps it in.
+        Loading and a warm-up pass happen before `lock` is taken, so concurrent
+        predictions only wait for the reference swap.
+        """
+        model, scaler, metadata = self.registry.load(version)
+        config = metadata.get("feature_config", {})
+        look_back = config.get("look_back", self.look_back)
+        model.predict_on_batch(np.zeros((1, look_back, len(FEATURES)), dtype=np.float32))
+        with lock or nullcontext():
+            self.model, self.scaler, self.metadata = model, scaler, metadata
+            self.version_id = metadata["version"]
+            self.look_back = look_back
+            self.units = config.get("units", self.units)
+            self.dropout = config.get("dropout", self.dropout)
+            self.label_threshold = config.get("label_threshold", self.label_threshold)
+            self._model_changed()
+        safe_log(f"📦 Model version {self.version_id} loaded from registry")
+
+    def refresh(self, lock=None):
+        """Hot-swaps to the registry's active version if it changed; returns True on a swap."""
+        current = self.registry.current_version() if self.registry is not None else None
+        if current is None or current == self.version_id:
+            return False
+        self.load_version(current, lock)
+        return True
+
+    def _model_changed(self):
+        """New weights or scaler: bump the version so no cached prediction is reused."""
+        self.model_version += 1
+        self.cache.clear()
+
+    def _cache_key(self, window, instrument=None, timestamp=None):
+        return (self.model_version, instrument, None if timestamp is None else str(timestamp), array_digest(window))
+
+    def predict(self, data, instrument=None, timestamp=None):
+        """
+        Class index for the last look_back rows of `data`. Results are cached on
+        (model version, instrument, window end timestamp, window content), so
+        repeated calls on an unchanged window skip the forward pass.
+        """
         if not hasattr(self.scaler, "min_"):
             raise RuntimeError("Scaler not loaded or fitted.")
 
+        data = np.asarray(data)
         if data.ndim == 3:
             # Already reshaped input for a single sequence
-            scaled = self.scaler.transform(data.reshape(-1, data.shape[2]))  # Flatten for scaling
-            scaled = scaled.reshape(data.shape)  # Reshape back to (1, LOOK_BACK, 5)
-        else:
-            scaled = self.scaler.transform(data)
+            data = data.reshape(-1, data.shape[2])
+        if data.shape[0] < self.look_back:
+            raise ValueError("Not enough data to make prediction.")
+
+        # Rows are scaled independently, so only the last window needs scaling
+        window = data[-self.look_back:]
+        key = self._cache_key(window, instrument, timestamp)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached.copy()
+
+        X = self.scaler.transform(window)[None]
+        # predict_on_batch reuses the compiled predict step; model.predict() builds
+        # an input pipeline for every call, which dominates for a single window
+        predictions = self.model.predict_on_batch(X)
+        result = np.argmax(predictions, axis=1)
+        self.cache.put(key, result)
+        return result.copy()
+
+    def streaming(self, resync_every=None):
+        """
+        Stateful one-bar-at-a-time predictor running the current weights and scaler
+        (see agents.numpy_lstm.StreamingLSTM). Build a new one after reloading.
+        """
+        from agents.numpy_lstm import NumpyLSTM, StreamingLSTM, weight_arrays
 
-        X = []
-        if scaled.shape[0] >= self.look_back:
-            X.append(scaled[-self.look_back:])
+        if not hasattr(self.scaler, "min_"):
+            raise RuntimeError("Scaler not loaded or fitted.")
+        return StreamingLSTM(NumpyLSTM(arrays=weight_arrays(self.model, self.scaler)), resync_every)
+
+    def predict_batch(self, df, all_windows=False, batch_size=1024):
+        """
+        Scores several instruments in one go. `df` holds OHLCV rows with an optional
+        `instrument` column (rows of one instrument in time order) and an optional
+        `time` column. By default only the latest window of each instrument is
+        scored, in a single forward pass; with `all_windows` every full window is
+        scored through one model.predict call. Either way windows already in the
+        prediction cache are not scored again.
+
+        Returns a DataFrame indexed like the scored rows of `df` (the last bar of each
+        window) with instrument, time, prediction (class index) and label.
+        """
+        if not hasattr(self.scaler, "min_"):
+            raise RuntimeError("Scaler not loaded or fitted.")
+
+        instruments = df["instrument"] if "instrument" in df.columns else pd.Series("default", index=df.index)
+        values = df[FEATURES].values
+        times = df["time"].values if "time" in df.columns else df.index
+        groups = list(instruments.groupby(instruments.values, sort=False).indices.values())
+        short = [instruments.iloc[rows[0]] for rows in groups if len(rows) < self.look_back]
+        if short:
+            safe_log(f"⚠️ Not enough bars for LSTM prediction: {', '.join(map(str, short))}")
+        groups = [rows for rows in groups if len(rows) >= self.look_back]
+        if not groups:
+            return pd.DataFrame(columns=["instrument", "time", "prediction", "label"])
+
+        # Rows regrouped so every instrument is contiguous; windows never cross instruments
+        order = np.concatenate(groups)
+        ordered = values[order]
+        bounds = np.cumsum([0] + [len(rows) for rows in groups])
+        if all_windows:
+            starts = np.concatenate([
+                np.arange(start, end - self.look_back + 1) for start, end in zip(bounds[:-1], bounds[1:])
+            ])
         else:
-            raise ValueError("Not enough data to make prediction.")
+            starts = bounds[1:] - self.look_back
+        positions = order[starts + self.look_back - 1]
+
+        def score(missing):
+            miss_starts = starts[missing]
+            if all_windows:
+                probabilities = self.model.predict(
+                    self.window_dataset(self.scaler.transform(ordered), batch_size=batch_size, starts=miss_starts),
+                    verbose=0,
+                )
+            else:
+                X = self.scaler.transform(np.concatenate([ordered[s:s + self.look_back] for s in miss_starts]))
+                probabilities = self.model.predict_on_batch(X.reshape(len(miss_starts), self.look_back, -1))
+            return [np.array([p]) for p in np.argmax(probabilities, axis=1)]
+
+        # Windows already scored (same model, instrument, end bar and content) come
+        # from the prediction cache; only the misses go through the model, together
+        keys = [
+            self._cache_key(ordered[s:s + self.look_back], instruments.values[pos], times[pos])
+            for s, pos in zip(starts, positions)
+        ]
+        predictions = np.array([value[0] for value in self.cache.get_or_compute(keys, score)], dtype=np.int64)
 
-        X = np.array(X)
-        predictions = self.model.predict(X)
-        return np.argmax(predictions, axis=1)
+        result = pd.DataFrame({
+            "instrument": instruments.values[positions],
+            "time": times[positions],
+            "prediction": predictions,
+            "label": np.array(CLASS_LABELS)[predictions],
+        }, index=df.index[positions])
+        return result
 
-    def evaluate_model(self, data):
-        X, y_true = self.preprocess_data(data)
-        y_pred = self.model.predict(X)
-        y_true_labels = np.argmax(y_true, axis=1)
+    def evaluate_model(self, data, batch_size=256):
+        scaled = self.scaler.fit_transform(data)
+        y_true_labels = self.make_labels(scaled)
+        y_pred = self.model.predict(self.window_dataset(scaled, count=len(y_true_labels), batch_size=batch_size))
         y_pred_labels = np.argmax(y_pred, axis=1)
         acc = np.mean(y_true_labels == y_pred_labels)
         safe_log(f"📊 Classification Accuracy: {acc * 100:.2f}%")
         print(f"📊 Classification Accuracy: {acc * 100:.2f}%")
 
     def save_model(self):
-        self.model.save(self.model_path)
+        # Written aside and renamed so readers never load a half-written file
+        tmp_path = self.model_path.replace(".keras", ".tmp.keras")
+        self.model.save(tmp_path)
+        os.replace(tmp_path, self.model_path)
         safe_log(f"✅ Model saved → {self.model_path}")
 
     def load_model(self):
         if os.path.exists(self.model_path):
             self.model = load_model(self.model_path)
+            self._model_changed()
             safe_log(f"📦 Model loaded → {self.model_path}")
         else:
             safe_log("⚠️ No saved model found. Starting fresh.")
 
     def save_scaler(self):
-        joblib.dump(self.scaler, self.scaler_path)
+        tmp_path = self.scaler_path + ".tmp"
+        joblib.dump(self.scaler, tmp_path)
+        os.replace(tmp_path, self.scaler_path)
         safe_log(f"✅ Scaler saved → {self.scaler_path}")
 
     def load_scaler(self):
         if os.path.exists(self.scaler_path):
             self.scaler = joblib.load(self.scaler_path)
+            self._model_changed()
             safe_log(f"📦 Scaler loaded → {self.scaler_path}")
         else:
             safe_log("⚠️ Scaler not found. Make sure to train the model first.")
@@ -133,6 +519,7 @@ class LSTMModel:
 
 # === Standalone Entry Point for Training and Evaluation ===
 if __name__ == "__main__":
+    setup_logging(LOG_FILE)
     HISTORICAL_DATA_PATH = "data/EUR_USD_historical_data.csv"
     MODEL_PATH = "models/lstm_model.keras"
 
@@ -141,13 +528,15 @@ if __name__ == "__main__":
 
     print("📥 Loading historical data...")
     df = pd.read_csv(HISTORICAL_DATA_PATH)
+    data_range = (str(df["time"].iloc[0]), str(df["time"].iloc[-1])) if "time" in df.columns else None
     df = df[["open", "high", "low", "close", "volume"]]
     print(f"✅ Loaded {len(df)} rows.")
 
-    lstm = LSTMModel(model_path=MODEL_PATH, look_back=50)
+    lstm = LSTMModel(model_path=MODEL_PATH, look_back=50, registry=ModelRegistry())
 
     print("🚀 Training LSTM model...")
-    lstm.train_model(df.values, epochs=10, batch_size=32)
+    version = lstm.train_model(df.values, epochs=10, batch_size=32, data_range=data_range)
+    print(f"✅ Published model version {version}")
 
     print("🧠 Evaluating model...")
     lstm.evaluate_model(df.values)
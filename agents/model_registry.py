@@ -0,0 +1,149 @@
+import os
+import json
+import shutil
+import logging
+import secrets
+from datetime import datetime, timezone
+
+REGISTRY_DIR = "models/registry"
+MODEL_FILE = "model.keras"
+SCALER_FILE = "scaler.save"
+WEIGHTS_FILE = "weights.npz"  # NumPy runtime export (agents.numpy_lstm)
+META_FILE = "meta.json"
+CURRENT_FILE = "CURRENT"
+STAGING_DIR = ".staging"
+
+
+class ModelRegistry:
+    """
+    Versioned store for trained LSTM models.
+
+    Each version lives in its own directory (model, scaler, the NumPy runtime
+    weights and meta.json with the training data range, metrics and feature
+    config) and is never modified once published. A version is written into a private staging directory and renamed
+    into place in one step, and the CURRENT pointer is swapped with os.replace,
+    so a reader only ever sees complete versions.
+    """
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    # === Paths ===
+    def version_dir(self, version):
+        return os.path.join(self.root, version)
+
+    def model_path(self, version=None):
+        return os.path.join(self.version_dir(version or self._require_current()), MODEL_FILE)
+
+    def scaler_path(self, version=None):
+        return os.path.join(self.version_dir(version or self._require_current()), SCALER_FILE)
+
+    def weights_path(self, version=None):
+        return os.path.join(self.version_dir(version or self._require_current()), WEIGHTS_FILE)
+
+    # === Queries ===
+    def current_version(self):
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), "r") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _require_current(self):
+        version = self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"No active model version in {self.root}")
+        return version
+
+    def versions(self):
+        """Published version IDs, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, name, META_FILE))
+        )
+
+    def metadata(self, version=None):
+        with open(os.path.join(self.version_dir(version or self._require_current()), META_FILE), "r") as f:
+            return json.load(f)
+
+    # === Publishing ===
+    def stage(self):
+        """Reserves a new version ID and a private directory to write it into."""
+        # Microseconds keep IDs in publish order (versions(), prune) even within one second
+        version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f") + "-" + secrets.token_hex(3)
+        path = os.path.join(self.root, STAGING_DIR, version)
+        os.makedirs(path)
+        return version, path
+
+    def commit(self, version, staging_path, metadata, activate=True):
+        """Moves a fully written staging directory into the registry and optionally activates it."""
+        metadata = dict(metadata, version=version, created=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        with open(os.path.join(staging_path, META_FILE), "w") as f:
+            json.dump(metadata, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(staging_path, self.version_dir(version))
+        logging.info(f"Model version {version} published → {self.version_dir(version)}")
+        if activate:
+            self.activate(version)
+        return version
+
+    def publish(self, model, scaler, metadata, activate=True):
+        import joblib
+
+        version, path = self.stage()
+        try:
+            model.save(os.path.join(path, MODEL_FILE))
+            joblib.dump(scaler, os.path.join(path, SCALER_FILE))
+            self.export_weights(path, model, scaler)
+        except Exception:
+            self.discard(path)
+            raise
+        return self.commit(version, path, metadata, activate)
+
+    def export_weights(self, staging_path, model, scaler):
+        """Writes the NumPy runtime weights next to the Keras model being staged."""
+        import numpy as np
+        from agents.numpy_lstm import weight_arrays
+
+        try:
+            arrays = weight_arrays(model, scaler)
+        except ValueError as e:
+            logging.warning(f"No NumPy runtime weights for this version: {e}")
+            return
+        np.savez(os.path.join(staging_path, WEIGHTS_FILE), **arrays)
+
+    def discard(self, staging_path):
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+    def activate(self, version):
+        """Points CURRENT at `version` (also used to roll back)."""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version: {version}")
+        tmp = os.path.join(self.root, f"{CURRENT_FILE}.{secrets.token_hex(4)}.tmp")
+        with open(tmp, "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.root, CURRENT_FILE))
+        logging.info(f"Active model version → {version}")
+
+    def prune(self, keep=5):
+        """Deletes all but the newest `keep` versions; the active one is always kept."""
+        current = self.current_version()
+        removed = [v for v in self.versions()[:-keep] if v != current] if keep else []
+        for version in removed:
+            shutil.rmtree(self.version_dir(version), ignore_errors=True)
+        return removed
+
+    # === Loading ===
+    def load(self, version=None):
+        """Returns (keras model, scaler, metadata) for `version` or the active one."""
+        import joblib
+        from tensorflow.keras.models import load_model
+
+        version = version or self._require_current()
+        model = load_model(self.model_path(version))
+        scaler = joblib.load(self.scaler_path(version))
+        return model, scaler, self.metadata(version)
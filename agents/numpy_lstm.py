@@ -0,0 +1,417 @@
+import os
+import sys
+import logging
+import argparse
+from collections import deque
+from contextlib import nullcontext
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache import TTLCache, array_digest
+from utils.log_setup import setup_logging
+
+MODEL_PATH = "models/lstm_model.keras"
+CLASS_LABELS = ["Hold", "Buy", "Sell"]
+FEATURES = ["open", "high", "low", "close", "volume"]
+PARITY_ATOL = 1e-5
+INT8_PARITY_ATOL = 5e-2
+BATCH_ROWS = 1024  # windows per forward pass when scoring whole histories
+PREDICTION_CACHE_SIZE = 16384
+PREDICTION_CACHE_TTL = 900  # seconds
+
+
+def weights_path_for(model_path, quantize=False):
+    suffix = "_weights_int8.npz" if quantize else "_weights.npz"
+    return model_path.replace(".keras", suffix)
+
+
+# ==========================
+# EXPORT
+# ==========================
+def _quantize(w):
+    """Symmetric per-output-column int8 quantization; returns (int8 weights, float32 scales)."""
+    scale = np.abs(w).max(axis=0) / 127.0
+    scale[scale == 0] = 1.0
+    return np.round(w / scale).astype(np.int8), scale.astype(np.float32)
+
+
+def weight_arrays(model, scaler, quantize=False):
+    """LSTM/Dense weights of a Keras model plus MinMaxScaler parameters, as named arrays."""
+    arrays = {
+        "scaler_scale": scaler.scale_.astype(np.float32),
+        "scaler_min": scaler.min_.astype(np.float32),
+        "look_back": np.array(model.input_shape[1]),
+    }
+    lstm_layers = 0
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == "LSTM":
+            if layer.recurrent_activation.__name__ != "sigmoid" or layer.activation.__name__ != "tanh":
+                raise ValueError(f"Unsupported activations in {layer.name}")
+            names = ["kernel", "recurrent_kernel", "bias"]
+            prefix = f"lstm{lstm_layers}"
+            lstm_layers += 1
+        elif kind == "Dense":
+            names = ["kernel", "bias"]
+            prefix = "dense"
+        else:
+            continue
+        for name, weight in zip(names, layer.get_weights()):
+            weight = weight.astype(np.float32)
+            if quantize and name != "bias":
+                arrays[f"{prefix}_{name}"], arrays[f"{prefix}_{name}_scale"] = _quantize(weight)
+            else:
+                arrays[f"{prefix}_{name}"] = weight
+    arrays["lstm_layers"] = np.array(lstm_layers)
+    return arrays
+
+
+def export_weights(model_path=MODEL_PATH, out_path=None, quantize=False):
+    """
+    Extracts LSTM/Dense weights and the MinMaxScaler parameters of a trained
+    LSTMModel into one .npz file that NumpyLSTM can run without TensorFlow.
+    """
+    import joblib
+    from tensorflow.keras.models import load_model
+
+    out_path = out_path or weights_path_for(model_path, quantize)
+    arrays = weight_arrays(load_model(model_path), joblib.load(model_path.replace(".keras", "_scaler.save")), quantize)
+    np.savez(out_path, **arrays)
+    logging.info(f"Exported {int(arrays['lstm_layers'])} LSTM layers{' (int8)' if quantize else ''} → {out_path}")
+    return out_path
+
+
+def export_registry_weights(registry, version=None):
+    """Adds NumPy runtime weights to a published version (the active one by default) that has none."""
+    version = version or registry.current_version()
+    model, scaler, _ = registry.load(version)
+    path = registry.weights_path(version)
+    tmp_path = path.replace(".npz", ".tmp.npz")
+    np.savez(tmp_path, **weight_arrays(model, scaler))
+    os.replace(tmp_path, path)
+    logging.info(f"Exported NumPy weights for model version {version} → {path}")
+    return path
+
+
+# ==========================
+# RUNTIME
+# ==========================
+def _sigmoid(x):
+    with np.errstate(over="ignore"):
+        return 1.0 / (1.0 + np.exp(-x))
+
+
+class NumpyLSTM:
+    """
+    Forward pass of LSTMModel's network (stacked LSTMs + softmax Dense) in NumPy.
+    Weights are float32; int8 exports are dequantized once at load.
+    Dropout is inactive at inference, so it has no counterpart here.
+    Predictions are cached like LSTMModel's. Built with from_registry(), it
+    runs a registry version's exported weights and refresh() follows the
+    active version.
+    """
+    def __init__(self, weights_path=None, arrays=None, cache_size=PREDICTION_CACHE_SIZE,
+                 cache_ttl=PREDICTION_CACHE_TTL):
+        self.weights_path = weights_path
+        self.cache = TTLCache(cache_size, cache_ttl)
+        if arrays is None:
+            with np.load(weights_path) as f:
+                arrays = {k: f[k] for k in f.files}
+        self.registry = None
+        self.version_id = None
+        self._load(arrays)
+        if weights_path:
+            logging.info(f"NumPy LSTM loaded → {weights_path}")
+
+    def _load(self, arrays):
+        def weight(name):
+            w = arrays[name]
+            if f"{name}_scale" in arrays:
+                w = w.astype(np.float32) * arrays[f"{name}_scale"]
+            return w
+
+        self.look_back = int(arrays["look_back"])
+        self.scaler_scale = arrays["scaler_scale"]
+        self.scaler_min = arrays["scaler_min"]
+        self.layers = [
+            (weight(f"lstm{i}_kernel"), weight(f"lstm{i}_recurrent_kernel"), arrays[f"lstm{i}_bias"])
+            for i in range(int(arrays["lstm_layers"]))
+        ]
+        self.dense_kernel = weight("dense_kernel")
+        self.dense_bias = arrays["dense_bias"]
+
+    @classmethod
+    def from_registry(cls, registry, version=None):
+        """Runtime for a registry version's exported weights (the active version by default)."""
+        version = version or registry.current_version()
+        engine = cls(registry.weights_path(version))
+        engine.registry, engine.version_id = registry, version
+        return engine
+
+    def refresh(self, lock=None):
+        """Switches to the registry's active version if it changed; returns True on a swap."""
+        current = self.registry.current_version() if self.registry is not None else None
+        if current is None or current == self.version_id:
+            return False
+        path = self.registry.weights_path(current)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model version {current} has no NumPy weights; export them with --registry")
+        with np.load(path) as f:
+            arrays = {k: f[k] for k in f.files}
+        with lock or nullcontext():
+            self._load(arrays)
+            self.weights_path, self.version_id = path, current
+            self.cache.clear()
+        logging.info(f"NumPy LSTM switched to model version {current}")
+        return True
+
+    def scale(self, data):
+        return (np.asarray(data, dtype=np.float32) * self.scaler_scale + self.scaler_min).astype(np.float32)
+
+    def run(self, X, states=None):
+        """
+        Forward pass over scaled windows of shape (batch, steps, features), starting
+        from per-layer (h, c) `states` or from zeros. Returns softmax class
+        probabilities and the per-layer (h, c) after the last step.
+        """
+        seq = np.asarray(X, dtype=np.float32)
+        batch, steps, _ = seq.shape
+        final = []
+        for layer, (kernel, recurrent, bias) in enumerate(self.layers):
+            units = recurrent.shape[0]
+            # Input projection for every step in one matmul; only h @ U stays in the loop
+            projected = (seq.reshape(batch * steps, -1) @ kernel + bias).reshape(batch, steps, 4 * units)
+            if states is None:
+                h = np.zeros((batch, units), dtype=np.float32)
+                c = np.zeros((batch, units), dtype=np.float32)
+            else:
+                h, c = states[layer]
+            outputs = np.empty((batch, steps, units), dtype=np.float32)
+            for t in range(steps):
+                z = projected[:, t] + h @ recurrent
+                gates = _sigmoid(z)  # i, f, (unused), o
+                c = gates[:, units:2 * units] * c + gates[:, :units] * np.tanh(z[:, 2 * units:3 * units])
+                h = gates[:, 3 * units:] * np.tanh(c)
+                outputs[:, t] = h
+            final.append((h, c))
+            seq = outputs
+        logits = seq[:, -1] @ self.dense_kernel + self.dense_bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True), final
+
+    def forward(self, X):
+        """Softmax class probabilities for scaled windows of shape (batch, look_back, features)."""
+        return self.run(X)[0]
+
+    def _cache_key(self, window, instrument=None, timestamp=None):
+        return (self.version_id, instrument, None if timestamp is None else str(timestamp), array_digest(window))
+
+    def predict(self, data, instrument=None, timestamp=None):
+        """Same contract as LSTMModel.predict: class index for the last window of `data`."""
+        data = np.asarray(data)
+        if data.ndim == 3:
+            data = data.reshape(-1, data.shape[2])
+        if data.shape[0] < self.look_back:
+            raise ValueError("Not enough data to make prediction.")
+        window = data[-self.look_back:]
+        key = self._cache_key(window, instrument, timestamp)
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = np.argmax(self.forward(self.scale(window)[None]), axis=1)
+            self.cache.put(key, cached)
+        return cached.copy()
+
+    def predict_batch(self, df, all_windows=False):
+        """Same contract as LSTMModel.predict_batch, cached windows included."""
+        instruments = df["instrument"] if "instrument" in df.columns else pd.Series("default", index=df.index)
+        values = df[FEATURES].values
+        times = df["time"].values if "time" in df.columns else df.index
+        groups = [rows for rows in instruments.groupby(instruments.values, sort=False).indices.values()
+                  if len(rows) >= self.look_back]
+        if not groups:
+            return pd.DataFrame(columns=["instrument", "time", "prediction", "label"])
+
+        order = np.concatenate(groups)
+        ordered = values[order]
+        bounds = np.cumsum([0] + [len(rows) for rows in groups])
+        if all_windows:
+            starts = np.concatenate([
+                np.arange(start, end - self.look_back + 1) for start, end in zip(bounds[:-1], bounds[1:])
+            ])
+        else:
+            starts = bounds[1:] - self.look_back
+        positions = order[starts + self.look_back - 1]
+
+        def score(missing):
+            scaled = self.scale(ordered)
+            offsets = np.arange(self.look_back)
+            miss_starts = starts[missing]
+            predictions = [
+                np.argmax(self.forward(scaled[miss_starts[i:i + BATCH_ROWS, None] + offsets]), axis=1)
+                for i in range(0, len(miss_starts), BATCH_ROWS)
+            ]
+            return [np.array([p]) for p in np.concatenate(predictions)]
+
+        keys = [
+            self._cache_key(ordered[s:s + self.look_back], instruments.values[pos], times[pos])
+            for s, pos in zip(starts, positions)
+        ]
+        predictions = np.array([value[0] for value in self.cache.get_or_compute(keys, score)], dtype=np.int64)
+
+        return pd.DataFrame({
+            "instrument": instruments.values[positions],
+            "time": times[positions],
+            "prediction": predictions,
+            "label": np.array(CLASS_LABELS)[predictions],
+        }, index=df.index[positions])
+
+
+# ==========================
+# STREAMING
+# ==========================
+class StreamingLSTM:
+    """
+    Scores each instrument one closed bar at a time by carrying the LSTM (h, c)
+    state forward, so a bar costs one recurrent step instead of look_back steps.
+
+    The network was trained on windows that start from a zero state, while a
+    carried state keeps memory of older bars. To bound that drift the state is
+    rebuilt from a zero-state pass over the latest look_back bars whenever an
+    instrument has advanced `resync_every` steps; that bar's prediction matches
+    the full-window forward pass exactly.
+    """
+    def __init__(self, engine, resync_every=None):
+        self.engine = engine
+        self.look_back = engine.look_back
+        self.resync_every = resync_every or engine.look_back
+        self._buffers = {}     # instrument -> deque of the latest look_back scaled bars
+        self._states = {}      # instrument -> per-layer (h, c) vectors
+        self._since_sync = {}  # instrument -> steps since the last full-window pass
+        self._last = {}        # instrument -> (bar timestamp, prediction)
+        self.steps = 0
+        self.resyncs = 0
+
+    def reset(self, instrument=None):
+        """Forgets one instrument's state (e.g. after a data gap), or all of them."""
+        for store in (self._buffers, self._states, self._since_sync, self._last):
+            if instrument is None:
+                store.clear()
+            else:
+                store.pop(instrument, None)
+
+    def prime(self, instrument, history):
+        """Seeds an instrument from OHLCV history (rows in time order) with a full-window pass."""
+        history = np.asarray(history)
+        if len(history) < self.look_back:
+            raise ValueError("Not enough data to prime streaming prediction.")
+        self._buffers[instrument] = deque(self.engine.scale(history[-self.look_back:]), maxlen=self.look_back)
+        self._states.pop(instrument, None)
+        self._last.pop(instrument, None)
+        return self._advance([instrument])[instrument]
+
+    def update(self, instrument, bar, timestamp=None):
+        """Feeds one closed OHLCV bar; returns the class index, or None while warming up."""
+        return self.update_batch({instrument: bar}, None if timestamp is None else {instrument: timestamp})[instrument]
+
+    def update_batch(self, bars, timestamps=None):
+        """
+        Feeds one closed bar per instrument ({instrument: ohlcv}) and advances all of
+        them together. A bar whose timestamp was already seen is not stepped again.
+        Returns {instrument: class index, or None while fewer than look_back bars}.
+        """
+        timestamps = timestamps or {}
+        results, fresh = {}, []
+        for instrument, bar in bars.items():
+            timestamp = timestamps.get(instrument)
+            last = self._last.get(instrument)
+            if timestamp is not None and last is not None and last[0] == timestamp:
+                results[instrument] = last[1]
+                continue
+            buffer = self._buffers.setdefault(instrument, deque(maxlen=self.look_back))
+            buffer.append(self.engine.scale(np.asarray(bar).reshape(1, -1))[0])
+            if len(buffer) < self.look_back:
+                results[instrument] = None
+            else:
+                fresh.append(instrument)
+        results.update(self._advance(fresh))
+        for instrument in fresh:
+            self._last[instrument] = (timestamps.get(instrument), results[instrument])
+        return results
+
+    def _advance(self, instruments):
+        resync = [i for i in instruments if i not in self._states or self._since_sync[i] >= self.resync_every]
+        step = [i for i in instruments if i not in resync]
+        results = {}
+        if resync:
+            windows = np.stack([np.array(self._buffers[i]) for i in resync])
+            probabilities, states = self.engine.run(windows)
+            self._store(resync, states, resynced=True)
+            results.update(zip(resync, np.argmax(probabilities, axis=1).tolist()))
+            self.resyncs += len(resync)
+        if step:
+            bars = np.stack([self._buffers[i][-1] for i in step])[:, None]
+            states = [
+                (np.stack([self._states[i][layer][0] for i in step]), np.stack([self._states[i][layer][1] for i in step]))
+                for layer in range(len(self.engine.layers))
+            ]
+            probabilities, states = self.engine.run(bars, states)
+            self._store(step, states, resynced=False)
+            results.update(zip(step, np.argmax(probabilities, axis=1).tolist()))
+            self.steps += len(step)
+        return results
+
+    def _store(self, instruments, states, resynced):
+        for row, instrument in enumerate(instruments):
+            self._states[instrument] = [(h[row], c[row]) for h, c in states]
+            self._since_sync[instrument] = 0 if resynced else self._since_sync[instrument] + 1
+
+    def stats(self):
+        return {"instruments": len(self._states), "steps": self.steps, "resyncs": self.resyncs}
+
+
+# ==========================
+# PARITY CHECK
+# ==========================
+def check_parity(model_path=MODEL_PATH, weights_path=None, samples=512, atol=PARITY_ATOL, seed=0):
+    """
+    Compares NumpyLSTM against the Keras model on random scaled windows.
+    Returns (max_abs_diff, argmax_agreement); raises AssertionError past `atol`.
+    """
+    from tensorflow.keras.models import load_model
+
+    weights_path = weights_path or weights_path_for(model_path)
+    keras_model = load_model(model_path)
+    engine = NumpyLSTM(weights_path)
+    X = np.random.default_rng(seed).random((samples, engine.look_back, len(FEATURES)), dtype=np.float32)
+    expected = keras_model.predict_on_batch(X)
+    actual = engine.forward(X)
+    max_diff = float(np.abs(expected - actual).max())
+    agreement = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+    logging.info(f"Parity vs Keras → max |diff| {max_diff:.2e}, argmax agreement {agreement * 100:.2f}%")
+    if max_diff > atol:
+        raise AssertionError(f"NumPy LSTM deviates from Keras by {max_diff:.2e} (atol {atol:.0e})")
+    return max_diff, agreement
+
+
+if __name__ == "__main__":
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Export and verify the TensorFlow-free LSTM runtime.")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--int8", action="store_true", help="store int8-quantized kernels")
+    parser.add_argument("--atol", type=float, default=None, help=f"parity tolerance (default {PARITY_ATOL:g}, {INT8_PARITY_ATOL:g} for int8)")
+    parser.add_argument("--registry", nargs="?", const="active", default=None, metavar="VERSION",
+                        help="export into a registry version (the active one if no ID is given) instead of --model")
+    args = parser.parse_args()
+
+    if args.registry:
+        from agents.model_registry import ModelRegistry
+
+        registry = ModelRegistry()
+        version = None if args.registry == "active" else args.registry
+        path = export_registry_weights(registry, version)
+        check_parity(registry.model_path(version), path)
+    else:
+        path = export_weights(args.model, quantize=args.int8)
+        check_parity(args.model, path, atol=args.atol or (INT8_PARITY_ATOL if args.int8 else PARITY_ATOL))
@@ -0,0 +1,201 @@
+"""
+Asynchronous order execution for EnhancedTradingBot.
+
+Each instrument gets its own queue and worker, so orders for different
+instruments are submitted concurrently while orders for one instrument keep
+their arrival order. A shared semaphore bounds how many OrderCreate requests
+are in flight at once; an order holds it per attempt, not while backing off.
+Failed submissions are retried with full-jitter backoff (only when the error
+can succeed on a retry, and never past the order deadline), and the post-fill
+Telegram alert and trade-log write run on a separate side-effect queue, so
+they never delay the next order.
+
+    results = execute_orders(bot, [dict(instrument=..., signal=..., ...), ...])
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.oanda_client import is_retryable
+from utils.retry import RetryPolicy
+
+MAX_IN_FLIGHT = 4  # OrderCreate requests outstanding across all instruments
+QUEUE_SIZE = 100  # pending orders per instrument before submit() waits
+RETRIES = 3
+BASE_DELAY = 0.25  # seconds; backoff ceiling doubles per attempt
+MAX_DELAY = 4.0
+DEADLINE = 10.0  # seconds an order may spend retrying before it is reported failed
+LATENCY_WINDOW = 1000
+
+
+class OrderPipeline:
+    """
+    Use as an async context manager; leaving it drains every queue and the
+    side-effect backlog. `submit` returns a future resolving to the order result:
+    a dict with client_trade_id, instrument, status ("filled", "not_filled",
+    "failed" or "skipped"), attempts, queued_ms and submit_ms.
+    """
+    def __init__(self, bot, max_in_flight=MAX_IN_FLIGHT, queue_size=QUEUE_SIZE, retries=RETRIES,
+                 base_delay=BASE_DELAY, max_delay=MAX_DELAY, deadline=DEADLINE):
+        self.bot = bot
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.policy = RetryPolicy("orders.pipeline", attempts=retries, base=base_delay, cap=max_delay,
+                                  deadline=deadline, retryable=is_retryable)
+        self._queues = {}
+        self._workers = {}
+        self._slots = None
+        self._side_effects = None
+        self._side_effect_task = None
+        # Blocking OANDA calls run here; the default executor is too small on few cores
+        self._submit_pool = ThreadPoolExecutor(max_in_flight, thread_name_prefix="order")
+        # One thread keeps trade-log rows in fill order
+        self._effect_pool = ThreadPoolExecutor(1, thread_name_prefix="order-effects")
+        self.counts = {"filled": 0, "not_filled": 0, "failed": 0, "skipped": 0, "retries": 0}
+        self._queued = deque(maxlen=LATENCY_WINDOW)
+        self._submit = deque(maxlen=LATENCY_WINDOW)
+
+    async def __aenter__(self):
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._side_effects = asyncio.Queue()
+        self._side_effect_task = asyncio.create_task(self._run_side_effects())
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # === Submission ===
+    async def submit(self, **order):
+        """Queues one order (EnhancedTradingBot.place_order arguments) behind its instrument."""
+        instrument = order["instrument"]
+        queue = self._queues.get(instrument)
+        if queue is None:
+            queue = self._queues[instrument] = asyncio.Queue(self.queue_size)
+            self._workers[instrument] = asyncio.create_task(self._run_instrument(queue))
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((order, future, time.perf_counter()))
+        return future
+
+    async def _run_instrument(self, queue):
+        while True:
+            order, future, enqueued = await queue.get()
+            try:
+                result = await self._execute(order, enqueued)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                logging.error(f"Order pipeline error for {order.get('instrument')}: {e}")
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                queue.task_done()
+
+    async def _execute(self, order, enqueued):
+        loop = asyncio.get_running_loop()
+        ticket = self.bot.prepare_order(**order)
+        if ticket is None:
+            self.counts["skipped"] += 1
+            return {"client_trade_id": None, "instrument": order["instrument"], "status": "skipped", "attempts": 0}
+
+        result = {"client_trade_id": ticket["client_trade_id"], "instrument": ticket["instrument"], "attempts": 0}
+        started = None
+
+        async def submit():
+            # A slot is held per attempt, never through a backoff sleep, so orders
+            # retrying through an outage don't block other instruments
+            nonlocal started
+            async with self._slots:
+                if started is None:
+                    started = time.perf_counter()
+                result["attempts"] += 1
+                return await loop.run_in_executor(self._submit_pool, self.bot.submit_order, ticket)
+
+        def retried(attempt, error, delay):
+            self.counts["retries"] += 1
+            logging.error(f"Order {ticket['client_trade_id']} attempt {attempt} failed: {error}")
+
+        try:
+            res = await self.policy.arun(submit, on_retry=retried)
+        except Exception as e:
+            result.update(status="failed", error=str(e))
+            logging.error(f"Order {ticket['client_trade_id']} failed after {result['attempts']} attempts: {e}")
+        else:
+            if res.get("orderFillTransaction"):
+                result["status"] = "filled"
+                self._side_effects.put_nowait(ticket)
+            else:
+                reason = res.get("orderCancelTransaction", {}).get("reason")
+                result.update(status="not_filled", error=reason)
+                logging.error(f"Order {ticket['client_trade_id']} not filled: {reason}")
+        started = started or time.perf_counter()
+        queued = started - enqueued
+        submitted = time.perf_counter() - started
+
+        self.counts[result["status"]] += 1
+        self._queued.append(queued)
+        self._submit.append(submitted)
+        result.update(queued_ms=round(queued * 1000, 2), submit_ms=round(submitted * 1000, 2))
+        return result
+
+    # === Side effects ===
+    async def _run_side_effects(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            ticket = await self._side_effects.get()
+            try:
+                await loop.run_in_executor(self._effect_pool, self.bot.record_fill, ticket)
+            except Exception as e:
+                logging.error(f"Post-fill handling failed for {ticket['client_trade_id']}: {e}")
+            finally:
+                self._side_effects.task_done()
+
+    # === Lifecycle ===
+    async def drain(self):
+        """Waits until every queued order is resolved and its side effects are done."""
+        for queue in list(self._queues.values()):
+            await queue.join()
+        await self._side_effects.join()
+
+    async def close(self):
+        await self.drain()
+        for task in [*self._workers.values(), self._side_effect_task]:
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), self._side_effect_task, return_exceptions=True)
+        self._submit_pool.shutdown(wait=False)
+        self._effect_pool.shutdown(wait=True)
+
+    def stats(self):
+        def pct(values, q):
+            return round(float(np.percentile(values, q)) * 1000, 2) if values else 0.0
+
+        return {
+            **self.counts,
+            "instruments": len(self._queues),
+            "queued_p50_ms": pct(self._queued, 50),
+            "queued_p95_ms": pct(self._queued, 95),
+            "submit_p50_ms": pct(self._submit, 50),
+            "submit_p95_ms": pct(self._submit, 95),
+        }
+
+
+async def run_orders(bot, orders, **pipeline_kwargs):
+    """Submits `orders` through a fresh pipeline; returns (results in input order, pipeline stats)."""
+    async with OrderPipeline(bot, **pipeline_kwargs) as pipeline:
+        futures = [await pipeline.submit(**order) for order in orders]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+    return results, pipeline.stats()
+
+
+def execute_orders(bot, orders, **pipeline_kwargs):
+    """Blocking entry point for scripts that are not already running an event loop."""
+    return asyncio.run(run_orders(bot, orders, **pipeline_kwargs))
@@ -1,40 +1,39 @@
 import os
+import sys
 import logging
 import pandas as pd
 from datetime import datetime
 
-# Setup logging
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.metrics import max_drawdown
+from utils.trade_journal import TradeJournal, JOURNAL_FILE
+from utils.log_setup import setup_logging
+
+# Logging is configured by the entry point
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "performance_tracker.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+METRIC_COLUMNS = ["profit", "duration"]  # all compute_metrics needs
 
 class PerformanceTracker:
     """
     Tracks trading session results and saves summary performance reports.
     """
-    def __init__(self, trade_log_path="logs/trade_log.csv"):
-        self.trade_log_path = trade_log_path
-        logging.info(f"PerformanceTracker initialized with trade log: {self.trade_log_path}")
+    def __init__(self, journal_path=JOURNAL_FILE, initial_capital=1000.0):
+        self.journal_path = journal_path
+        self.initial_capital = initial_capital
+        logging.info(f"PerformanceTracker initialized with trade journal: {self.journal_path}")
 
-    def load_trades(self):
-        if not os.path.exists(self.trade_log_path):
-            logging.warning("Trade log not found.")
-            return None
+    def load_trades(self, columns=None):
+        """Trades from the journal (cumulative_profit included), or None if there are none."""
         try:
-            df = pd.read_csv(self.trade_log_path)
-            df["cumulative_profit"] = df["profit"].cumsum()
+            df = TradeJournal(self.journal_path).load(columns)
+            if df.empty:
+                logging.warning("Trade journal is empty.")
+                return None
             logging.info(f"Loaded {len(df)} trades.")
             return df
         except Exception as e:
-            logging.error(f"Failed to read trade log: {e}")
+            logging.error(f"Failed to read trade journal: {e}")
             return None
 
     def compute_metrics(self, df):
@@ -60,11 +59,11 @@ class PerformanceTracker:
             logging.error(f"Metric calculation failed: {e}")
             return None
 
-    def calculate_drawdown(self, equity_curve):
+    def calculate_drawdown(self, cumulative_profit):
+        """Max drawdown of the account equity (initial capital + cumulative profit)."""
         try:
-            peak = equity_curve.cummax()
-            dd = (equity_curve - peak) / peak
-            return dd.min()
+            equity = self.initial_capital + cumulative_profit.to_numpy(dtype=float)
+            return max_drawdown(equity)[0]
         except Exception as e:
             logging.error(f"Drawdown calculation failed: {e}")
             return None
@@ -80,7 +79,7 @@ class PerformanceTracker:
             logging.error(f"Report save failed: {e}")
 
     def run(self):
-        df = self.load_trades()
+        df = self.load_trades(METRIC_COLUMNS)
         if df is not None:
             metrics = self.compute_metrics(df)
             if metrics:
@@ -90,6 +89,7 @@ class PerformanceTracker:
 
 
 if __name__ == "__main__":
+    setup_logging(LOG_FILE)
     tracker = PerformanceTracker()
     result = tracker.run()
     if result:
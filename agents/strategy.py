@@ -1,28 +1,25 @@
 import os
 import logging
 import pandas as pd
-import talib
 from datetime import datetime
-import json
 import sys
-import asyncio
-from telegram import Bot
-import oandapyV20
-import oandapyV20.endpoints.orders as orders
 
 # Add project root to system path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import OANDA_API_KEY, OANDA_ACCOUNT_ID, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from utils.lazy import lazy_import
+from utils.oanda_client import get_client
+from utils.log_setup import setup_logging
+from utils.wallet_ledger import WalletLedger
+from utils.telegram_queue import get_telegram_queue
 
-# Configure logging
+# Heavy dependencies load on first use
+talib = lazy_import("talib")
+orders = lazy_import("oandapyV20.endpoints.orders")
+
+# Logging is configured by the entry point
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "sapera_strategy.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(LOG_FILE), logging.StreamHandler()],
-)
 
 LIVE_DATA_FILE = "data/live_data_session.csv"
 
@@ -30,49 +27,34 @@ LIVE_DATA_FILE = "data/live_data_session.csv"
 class WalletManager:
     def __init__(self, wallet_file="wallet.json", initial_balance=1000):
         self.wallet_file = wallet_file
-        self.wallet_balance = self.load_wallet_balance(initial_balance)
+        self.ledger = WalletLedger(wallet_file, initial_balance)
         self.session_balance = 0
 
-    def load_wallet_balance(self, initial_balance):
-        try:
-            with open(self.wallet_file, "r") as file:
-                data = json.load(file)
-                return data.get("wallet_balance", initial_balance)
-        except FileNotFoundError:
-            logging.info("Wallet file not found. Using initial balance.")
-            return initial_balance
-
-    def save_wallet_balance(self):
-        with open(self.wallet_file, "w") as file:
-            json.dump({"wallet_balance": self.wallet_balance}, file)
+    @property
+    def wallet_balance(self):
+        return self.ledger.balance
 
     def allocate_balance(self, amount):
-        if amount <= 0 or amount > self.wallet_balance:
+        if not self.ledger.allocate(amount):
             logging.error("Invalid allocation amount.")
             return False
-        self.wallet_balance -= amount
         self.session_balance = amount
-        self.save_wallet_balance()
         logging.info(f"Allocated ${amount:.2f} for the session.")
         return True
 
     def update_balance(self, pnl):
-        self.wallet_balance += (self.session_balance + pnl)
+        self.ledger.release(self.session_balance, pnl)
         self.session_balance = 0
-        self.save_wallet_balance()
         logging.info(f"Updated wallet balance: ${self.wallet_balance:.2f}")
 
     class TelegramNotifier:
         def __init__(self, token, chat_id):
-            self.bot = Bot(token=token)
+            # Delivery runs on the shared background queue; send_message never blocks
+            self.queue = get_telegram_queue(token, chat_id)
             self.chat_id = chat_id
 
         def send_message(self, message):
-            try:
-                asyncio.run(self.bot.send_message(chat_id=self.chat_id, text=message))
-                logging.info(f"Telegram: {message}")
-            except Exception as e:
-                logging.error(f"Telegram error: {e}")
+            self.queue.send(message)
 
 
 class StrategyAnalyzer:
@@ -129,7 +111,7 @@ class StrategyAnalyzer:
 
 class TradingBot:
     def __init__(self, wallet_manager, notifier, risk_percentage=1, tp_multiplier=2.5):
-        self.client = oandapyV20.API(access_token=OANDA_API_KEY)
+        self.client = get_client(OANDA_API_KEY)
         self.wallet_manager = wallet_manager
         self.notifier = notifier
         self.risk_percentage = risk_percentage
@@ -151,6 +133,7 @@ class TradingBot:
 
 
 if __name__ == "__main__":
+    setup_logging(LOG_FILE)
     notifier = WalletManager.TelegramNotifier(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
     wallet = WalletManager(initial_balance=1000)
     analyzer = StrategyAnalyzer()
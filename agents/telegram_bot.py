@@ -2,27 +2,24 @@ import os
 import sys
 import time
 import logging
-import asyncio
 import pandas as pd
-import talib
 from datetime import datetime
-from telegram import Bot
-import oandapyV20
-import oandapyV20.endpoints.orders as orders
 
 # === Load Configs ===
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import OANDA_API_KEY, OANDA_ACCOUNT_ID, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from utils.lazy import lazy_import
+from utils.oanda_client import get_client
+from utils.log_setup import setup_logging
+from utils.telegram_queue import get_telegram_queue
 
-# === Logging Setup ===
+# === Heavy dependencies load on first use ===
+talib = lazy_import("talib")
+orders = lazy_import("oandapyV20.endpoints.orders")
+
+# === Logging (configured by the entry point) ===
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "sapera_step1.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(LOG_FILE), logging.StreamHandler()],
-)
 
 LIVE_DATA_FILE = "data/live_data_session.csv"
 
@@ -49,15 +46,12 @@ class WalletManager:
 # === Telegram Notifier ===
 class TelegramNotifier:
     def __init__(self, token, chat_id):
-        self.bot = Bot(token)
+        # Queued for the background sender, so the session loop never waits on Telegram
+        self.queue = get_telegram_queue(token, chat_id)
         self.chat_id = chat_id
 
     def send(self, msg):
-        try:
-            asyncio.run(self.bot.send_message(chat_id=self.chat_id, text=msg))
-            logging.info(f"Telegram sent: {msg}")
-        except Exception as e:
-            logging.error(f"Telegram error: {e}")
+        self.queue.send(msg)
 
 # === Strategy Analyzer ===
 class StrategyAnalyzer:
@@ -93,7 +87,7 @@ class StrategyAnalyzer:
 # === Trading Bot ===
 class TradingBot:
     def __init__(self, risk=1.0, tp_mult=2.5):
-        self.client = oandapyV20.API(access_token=OANDA_API_KEY)
+        self.client = get_client(OANDA_API_KEY)
         self.risk = risk
         self.tp_mult = tp_mult
 
@@ -126,6 +120,7 @@ class TradingBot:
 
 # === Main Loop ===
 if __name__ == "__main__":
+    setup_logging(LOG_FILE)
     notifier = TelegramNotifier(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
     wallet = WalletManager(total_balance=1000)
     analyzer = StrategyAnalyzer()
@@ -1,29 +1,29 @@
 import os
 import sys
-import json
-import time
 import logging
-import asyncio
+import itertools
 from datetime import datetime
-import pandas as pd
-
-import oandapyV20
-import oandapyV20.endpoints.orders as orders
-import oandapyV20.endpoints.accounts as accounts
-from telegram import Bot
 
 # Config and Credentials
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import OANDA_API_KEY, OANDA_ACCOUNT_ID, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
-
-# Setup Logging
-os.makedirs("logs", exist_ok=True)
-TRADE_LOG = "logs/trade_log.csv"
-logging.basicConfig(
-    filename="logs/trading_bot.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+from utils.lazy import lazy_import
+from utils.oanda_client import get_client, is_retryable
+from utils.retry import RetryPolicy
+from utils.trade_journal import TradeJournal
+from utils.wallet_ledger import WalletLedger
+from utils.telegram_queue import get_telegram_queue
+from utils.log_setup import setup_logging
+
+# Heavy dependencies load on first use
+orders = lazy_import("oandapyV20.endpoints.orders")
+accounts = lazy_import("oandapyV20.endpoints.accounts")
+
+# Logging is configured by the entry point
+LOG_FILE = "logs/trading_bot.log"
+TRADE_JOURNAL = "logs/trade_journal.db"
+BALANCE_DEADLINE = 5.0  # seconds a balance lookup may spend retrying
+ORDER_DEADLINE = 10.0  # seconds an order may spend retrying
 
 # ==========================
 # WALLET MANAGER
@@ -31,68 +31,73 @@ logging.basicConfig(
 class WalletManager:
     def __init__(self, wallet_file="wallet.json"):
         self.wallet_file = wallet_file
-        self.wallet_balance = self._load_balance()
-
-    def _load_balance(self):
-        try:
-            with open(self.wallet_file, "r") as f:
-                return json.load(f).get("wallet_balance", 1000.0)
-        except FileNotFoundError:
-            logging.info("No wallet file found. Starting with $1000.")
-            return 1000.0
+        # Append-only balance ledger shared with every process using this wallet
+        self.ledger = WalletLedger(wallet_file)
+        self.session_balance = 0.0
 
-    def _save_balance(self):
-        with open(self.wallet_file, "w") as f:
-            json.dump({"wallet_balance": self.wallet_balance}, f)
+    @property
+    def wallet_balance(self):
+        return self.ledger.balance
 
     def initialize_session(self, amount):
-        if amount > self.wallet_balance:
+        if not self.ledger.allocate(amount):
             logging.error("Insufficient wallet balance.")
             return None
-        self.wallet_balance -= amount
-        self._save_balance()
+        self.session_balance = amount
         logging.info(f"Session started with ${amount:.2f}. Wallet remaining: ${self.wallet_balance:.2f}")
         return amount
 
+    def close_session(self, pnl=0.0):
+        """Returns the session's capital (plus `pnl`) to the wallet."""
+        if not self.session_balance:
+            return
+        self.ledger.release(self.session_balance, pnl)
+        logging.info(f"Session closed; ${self.session_balance + pnl:.2f} returned. Wallet: ${self.wallet_balance:.2f}")
+        self.session_balance = 0.0
+
     def update_balance(self, profit_or_loss):
-        self.wallet_balance += profit_or_loss
-        self._save_balance()
+        self.ledger.adjust(profit_or_loss)
         logging.info(f"Wallet updated. New balance: ${self.wallet_balance:.2f}")
 
     class TelegramNotifier:
         def __init__(self, token, chat_id):
-            self.bot = Bot(token=token)
+            # Delivery runs on the shared background queue; send_message never blocks
+            self.queue = get_telegram_queue(token, chat_id)
             self.chat_id = chat_id
 
         def send_message(self, message):
-            try:
-                self.bot.send_message(chat_id=self.chat_id, text=message)
-                logging.info(f"Telegram alert sent: {message}")
-            except Exception as e:
-                logging.error(f"Telegram failed: {e}")
+            self.queue.send(message)
 
 # ==========================
 # TRADING BOT
 # ==========================
 class EnhancedTradingBot:
-    def __init__(self, wallet_manager, notifier, risk_pct=1.0, tp_multiplier=2.5, retries=3):
-        self.client = oandapyV20.API(access_token=OANDA_API_KEY)
+    def __init__(self, wallet_manager, notifier, risk_pct=1.0, tp_multiplier=2.5, retries=3, account_cache=None):
+        self.client = get_client(OANDA_API_KEY)
+        self.account_cache = account_cache
         self.wallet = wallet_manager
         self.notifier = notifier
         self.risk_pct = risk_pct
         self.tp_multiplier = tp_multiplier
         self.retries = retries
+        self.balance_retry = RetryPolicy("account.balance", attempts=retries, deadline=BALANCE_DEADLINE,
+                                         retryable=is_retryable)
+        self.order_retry = RetryPolicy("orders.submit", attempts=retries, deadline=ORDER_DEADLINE,
+                                       retryable=is_retryable)
+        self._order_seq = itertools.count(1)
+        # Shared with the trade-outcome trackers; rows are committed by a background writer
+        self.journal = TradeJournal(TRADE_JOURNAL)
         logging.info("✅ EnhancedTradingBot initialized")
 
     def get_account_balance(self):
-        for attempt in range(self.retries):
-            try:
-                req = accounts.AccountDetails(OANDA_ACCOUNT_ID)
-                res = self.client.request(req)
-                return float(res["account"]["balance"])
-            except Exception as e:
-                logging.warning(f"Attempt {attempt+1} - Balance fetch failed: {e}")
-        raise Exception("Unable to fetch OANDA account balance.")
+        # A live account cache answers from memory; REST is the fallback when it is stale
+        if self.account_cache is not None and self.account_cache.fresh():
+            return self.account_cache.balance()
+        try:
+            res = self.balance_retry.run(lambda: self.client.request(accounts.AccountDetails(OANDA_ACCOUNT_ID)))
+            return float(res["account"]["balance"])
+        except Exception as e:
+            raise Exception(f"Unable to fetch OANDA account balance: {e}")
 
     def calculate_trade_size(self, capital, atr, instrument):
         try:
@@ -115,77 +120,102 @@ class EnhancedTradingBot:
             "stop_loss": stop_loss,
             "take_profit": take_profit,
             "trade_size": units,
-            "lstm_prediction": round(lstm_prediction, 5),
+            "lstm_prediction": round(lstm_prediction, 5) if isinstance(lstm_prediction, float) else lstm_prediction,
             "correct_prediction": correct_prediction,
             "profit": 0,
-            "cumulative_profit": 0,
             "duration": 0
         }
-        df = pd.DataFrame([entry])
-        if not os.path.exists(TRADE_LOG):
-            df.to_csv(TRADE_LOG, index=False)
-        else:
-            df.to_csv(TRADE_LOG, mode="a", header=False, index=False)
+        self.journal.append(entry)
         logging.info(f"Trade logged with LSTM: {trade_id}")
 
-    def place_order(self, instrument, signal, price, atr, capital, lstm_prediction):
+    def prepare_order(self, instrument, signal, price, atr, capital, lstm_prediction, correct_prediction=None):
+        """Builds the order ticket for a signal, or None if the position size rounds to zero."""
         units = self.calculate_trade_size(capital, atr, instrument)
         if units == 0:
-            return
+            return None
 
         stop_loss = price - atr if signal == "Buy" else price + atr
         take_profit = price + atr * self.tp_multiplier if signal == "Buy" else price - atr * self.tp_multiplier
-        client_trade_id = f"{instrument}_{datetime.utcnow().strftime('%H%M%S')}"
+        # The sequence number keeps IDs unique when several orders go out within the same second
+        client_trade_id = f"{instrument}_{datetime.utcnow().strftime('%H%M%S')}_{next(self._order_seq)}"
 
-        correct_prediction = (
-            lstm_prediction > price if signal == "Buy" else lstm_prediction < price
-        )
+        if correct_prediction is None:
+            correct_prediction = (
+                lstm_prediction > price if signal == "Buy" else lstm_prediction < price
+            )
 
-        order_data = {
-            "order": {
-                "instrument": instrument,
-                "units": str(units if signal == "Buy" else -units),
-                "type": "MARKET",
-                "positionFill": "DEFAULT",
-                "stopLossOnFill": {"price": f"{stop_loss:.5f}"},
-                "takeProfitOnFill": {"price": f"{take_profit:.5f}"},
-                "clientExtensions": {"id": client_trade_id}
-            }
+        return {
+            "client_trade_id": client_trade_id,
+            "instrument": instrument,
+            "signal": signal,
+            "price": price,
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+            "units": units,
+            "lstm_prediction": lstm_prediction,
+            "correct_prediction": correct_prediction,
+            "data": {
+                "order": {
+                    "instrument": instrument,
+                    "units": str(units if signal == "Buy" else -units),
+                    "type": "MARKET",
+                    "positionFill": "DEFAULT",
+                    "stopLossOnFill": {"price": f"{stop_loss:.5f}"},
+                    "takeProfitOnFill": {"price": f"{take_profit:.5f}"},
+                    "clientExtensions": {"id": client_trade_id}
+                }
+            },
         }
 
-        for attempt in range(self.retries):
-            try:
-                req = orders.OrderCreate(OANDA_ACCOUNT_ID, data=order_data)
-                res = self.client.request(req)
-                if res.get("orderFillTransaction"):
-                    self.notifier.send_message(
-                        f"Trade ✅\n{instrument} | {signal}\nEntry: {price:.5f}\nSL: {stop_loss:.5f} | TP: {take_profit:.5f}"
-                    )
-                    self.log_trade(
-                        trade_id=client_trade_id,
-                        instrument=instrument,
-                        signal=signal,
-                        price=price,
-                        stop_loss=stop_loss,
-                        take_profit=take_profit,
-                        units=units,
-                        lstm_prediction=lstm_prediction,
-                        correct_prediction=correct_prediction
-                    )
-                    return
-            except Exception as e:
-                logging.error(f"Order attempt {attempt+1} failed: {e}")
-        logging.error("❌ Order placement failed after max retries")
+    def submit_order(self, ticket):
+        """Sends one OrderCreate for a prepared ticket and returns the raw response."""
+        req = orders.OrderCreate(OANDA_ACCOUNT_ID, data=ticket["data"])
+        return self.client.request(req)
+
+    def record_fill(self, ticket):
+        """Post-fill side effects: Telegram alert and trade log row."""
+        self.notifier.send_message(
+            f"Trade ✅\n{ticket['instrument']} | {ticket['signal']}\nEntry: {ticket['price']:.5f}\n"
+            f"SL: {ticket['stop_loss']:.5f} | TP: {ticket['take_profit']:.5f}"
+        )
+        self.log_trade(
+            trade_id=ticket["client_trade_id"],
+            instrument=ticket["instrument"],
+            signal=ticket["signal"],
+            price=ticket["price"],
+            stop_loss=ticket["stop_loss"],
+            take_profit=ticket["take_profit"],
+            units=ticket["units"],
+            lstm_prediction=ticket["lstm_prediction"],
+            correct_prediction=ticket["correct_prediction"]
+        )
+
+    def place_order(self, instrument, signal, price, atr, capital, lstm_prediction, correct_prediction=None):
+        """Blocking single-order path; batches of signals should go through agents.order_pipeline."""
+        ticket = self.prepare_order(instrument, signal, price, atr, capital, lstm_prediction, correct_prediction)
+        if ticket is None:
+            return
+
+        try:
+            res = self.order_retry.run(lambda: self.submit_order(ticket))
+        except Exception as e:
+            logging.error(f"❌ Order placement failed: {e}")
+            return
+        if res.get("orderFillTransaction"):
+            self.record_fill(ticket)
+            return
+        logging.error(f"Order {ticket['client_trade_id']} not filled: {res.get('orderCancelTransaction', {}).get('reason')}")
 
 # ==========================
 # DEMO ENTRY POINT
 # ==========================
 if __name__ == "__main__":
+    setup_logging(LOG_FILE, console=False)
     wallet = WalletManager()
     notifier = WalletManager.TelegramNotifier(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
     bot = EnhancedTradingBot(wallet, notifier)
 
     capital = wallet.initialize_session(500)
     if capital:
-        bot.place_order("EUR_USD", "Buy", 1.10500, 0.0025, capital)
-        wallet.update_balance(+50)  # Simulate profit update
+        bot.place_order("EUR_USD", "Buy", 1.10500, 0.0025, capital, lstm_prediction=1.10600)
+        wallet.close_session(50)  # Simulated profit; returns the session capital to the ledger
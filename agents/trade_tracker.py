@@ -1,76 +1,47 @@
-import os
 import time
-import json
 import logging
-import pandas as pd
-from datetime import datetime
-import oandapyV20
-import oandapyV20.endpoints.trades as trades
 
 from config import OANDA_API_KEY, OANDA_ACCOUNT_ID
+from utils.oanda_client import get_client
+from utils.log_setup import setup_logging
+from utils.trade_journal import TradeJournal
+from utils.transaction_sync import TransactionSync
 
-# Setup logging
-os.makedirs("logs", exist_ok=True)
-logging.basicConfig(
-    filename="logs/trade_tracker.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+# Logging is configured by the entry point
+LOG_FILE = "logs/trade_tracker.log"
 
-TRADE_LOG = "logs/trade_log.csv"
+TRADE_JOURNAL = "logs/trade_journal.db"
+STATE_FILE = "logs/trade_tracker_state.json"  # last processed transaction ID
 
 class TradeOutcomeTracker:
-    def __init__(self):
-        self.client = oandapyV20.API(access_token=OANDA_API_KEY)
+    def __init__(self, journal_path=None, state_path=None):
+        self.client = get_client(OANDA_API_KEY)
+        self.journal = TradeJournal(journal_path or TRADE_JOURNAL)
+        self.sync = TransactionSync(self.client, OANDA_ACCOUNT_ID, state_path or STATE_FILE)
 
     def fetch_closed_trades(self):
+        """Trades closed since the last processed transaction (commit with self.sync.commit())."""
         try:
-            r = trades.TradesList(OANDA_ACCOUNT_ID)
-            self.client.request(r)
-            return r.response.get("trades", [])
+            return self.sync.poll()
         except Exception as e:
             logging.error(f"Failed to fetch trades: {e}")
-            return []
+            return None
 
     def update_trade_log(self):
-        if not os.path.exists(TRADE_LOG):
-            logging.warning("Trade log not found.")
-            return
-
         try:
-            df = pd.read_csv(TRADE_LOG)
             closed_trades = self.fetch_closed_trades()
-
-            for trade in closed_trades:
-                if trade.get("state") != "CLOSED":
-                    continue
-
-                instrument = trade["instrument"]
-                units = abs(int(trade["initialUnits"]))
-                realized_pl = float(trade.get("realizedPL", 0))
-                open_time = pd.to_datetime(trade["openTime"])
-                close_time = pd.to_datetime(trade["closeTime"])
-                duration = (close_time - open_time).total_seconds() / 60
-
-                match_idx = df[
-                    (df["instrument"] == instrument) &
-                    (df["profit"] == 0) &
-                    (df["trade_size"] == units)
-                ].index
-
-                if not match_idx.empty:
-                    idx = match_idx[0]
-                    df.at[idx, "profit"] = realized_pl
-                    df.at[idx, "duration"] = round(duration, 2)
-                    df["cumulative_profit"] = df["profit"].cumsum()
-                    logging.info(f"Updated trade {instrument} with P&L: {realized_pl:.2f}")
-
-            df.to_csv(TRADE_LOG, index=False)
+            if closed_trades is None:
+                return
+            # One indexed UPDATE per closed trade; a quiet cycle writes nothing
+            for outcome in self.journal.apply_outcomes(closed_trades).values():
+                logging.info(f"Updated trade {outcome['instrument']} with P&L: {outcome['profit']:.2f}")
+            self.sync.commit()
         except Exception as e:
             logging.error(f"Failed to update trade log: {e}")
 
 
 if __name__ == "__main__":
+    setup_logging(LOG_FILE, console=False)
     tracker = TradeOutcomeTracker()
     while True:
         tracker.update_trade_log()
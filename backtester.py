@@ -1,22 +1,18 @@
 import os
 import pandas as pd
 import numpy as np
-import talib
 import logging
 from datetime import datetime
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
+from utils.metrics import EquityCurve, risk_metrics, rolling_risk_metrics, BARS_PER_YEAR
+from utils.lazy import lazy_import
+from utils.log_setup import setup_logging
 
-# Configure logging
+talib = lazy_import("talib")
+WARMUP_PERIODS = 40  # longest indicator periods of history replayed ahead of each streamed chunk
+
+# Logging is configured by the entry point
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "backtester.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(LOG_FILE), logging.StreamHandler()],
-)
 
 class WalletManager:
     def __init__(self, total_balance):
@@ -44,9 +40,11 @@ class Backtester:
         self.initial_balance = wallet_manager.session_balance
         self.current_balance = self.initial_balance
         self.trades = []
+        self.equity_curve = EquityCurve()
         self.config = config or self.default_config()
-        self.scaler = StandardScaler()
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+        # RandomForest and its scaler are created on first use (scikit-learn is slow to import)
+        self.scaler = None
+        self.model = None
         logging.info("Backtester initialized.")
 
     @staticmethod
@@ -62,6 +60,7 @@ class Backtester:
             "bollinger_period": 20,
             "bollinger_dev": 2,
             "adx_threshold": 20,
+            "bars_per_year": BARS_PER_YEAR,
         }
 
     def load_data(self):
@@ -74,6 +73,12 @@ class Backtester:
             logging.error(f"Error loading data: {e}")
             return None
 
+    def iter_chunks(self, chunk_size):
+        """Yield the data file as DataFrames of at most `chunk_size` rows."""
+        for chunk in pd.read_csv(self.data_path, parse_dates=["time"], chunksize=chunk_size):
+            chunk.set_index("time", inplace=True)
+            yield chunk
+
     def calculate_indicators(self, df):
         try:
             df["EMA_Fast"] = talib.EMA(df["close"], timeperiod=self.config["ema_fast"])
@@ -92,25 +97,55 @@ class Backtester:
             logging.error(f"Indicator calculation failed: {e}")
             return df
 
+    def warmup_rows(self):
+        """
+        Rows carried from one streamed chunk into the next. EMA and Wilder smoothing
+        forget their start geometrically, so after WARMUP_PERIODS of the longest
+        period the recomputed values agree with a single pass to float precision.
+        """
+        longest = max(self.config["ema_fast"], self.config["ema_slow"], self.config["rsi_period"],
+                      self.config["bollinger_period"], 2 * 14)  # ADX needs 2 * period - 1 bars
+        return WARMUP_PERIODS * longest
+
+    def calculate_indicators_streaming(self, df, tail):
+        """
+        calculate_indicators over `tail` (the last rows of earlier chunks) followed
+        by `df`. Returns (df with indicators, the tail for the next chunk).
+        """
+        history = df if tail is None else pd.concat([tail, df])
+        tail = history.iloc[-self.warmup_rows():].copy()
+        history = self.calculate_indicators(history.copy())
+        return history.iloc[len(history) - len(df):], tail
+
+    def generate_signals(self, df):
+        df["signal"] = "Hold"
+        buy = (
+            (df["EMA_Fast"] > df["EMA_Slow"]) &
+            (df["RSI"] < self.config["rsi_oversold"]) &
+            (df["ADX"] > self.config["adx_threshold"])
+        )
+        sell = (
+            (df["EMA_Fast"] < df["EMA_Slow"]) &
+            (df["RSI"] > self.config["rsi_overbought"]) &
+            (df["ADX"] > self.config["adx_threshold"])
+        )
+        df.loc[buy, "signal"] = "Buy"
+        df.loc[sell, "signal"] = "Sell"
+        return df
+
     def apply_strategy(self, df):
         try:
-            df["signal"] = "Hold"
-            buy = (
-                (df["EMA_Fast"] > df["EMA_Slow"]) &
-                (df["RSI"] < self.config["rsi_oversold"]) &
-                (df["ADX"] > self.config["adx_threshold"])
-            )
-            sell = (
-                (df["EMA_Fast"] < df["EMA_Slow"]) &
-                (df["RSI"] > self.config["rsi_overbought"]) &
-                (df["ADX"] > self.config["adx_threshold"])
-            )
-            df.loc[buy, "signal"] = "Buy"
-            df.loc[sell, "signal"] = "Sell"
-
+            df = self.generate_signals(df)
             df.dropna(inplace=True)
             X = df[["EMA_Fast", "EMA_Slow", "RSI", "ATR", "ADX"]]
             y = (df["signal"] == "Buy").astype(int)
+            from sklearn.ensemble import RandomForestClassifier
+            from sklearn.preprocessing import StandardScaler
+            from sklearn.model_selection import train_test_split
+
+            if self.model is None:
+                self.scaler = StandardScaler()
+                self.model = RandomForestClassifier(n_estimators=100, random_state=42)
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
             self.model.fit(self.scaler.fit_transform(X_train), y_train)
             df["ml_signal"] = self.model.predict(self.scaler.transform(X))
@@ -120,32 +155,53 @@ class Backtester:
             return df
 
     def simulate_trades(self, df):
+        """
+        Books every Buy/Sell bar at ATR * take_profit_multiplier and records the
+        balance after each bar in the equity curve.
+        """
         try:
-            for _, row in df.iterrows():
-                if row["signal"] == "Buy":
-                    pnl = row["ATR"] * self.config["take_profit_multiplier"]
-                    self.trades.append({"type": "Buy", "pnl": pnl})
-                    self.current_balance += pnl
-                elif row["signal"] == "Sell":
-                    pnl = row["ATR"] * self.config["take_profit_multiplier"]
-                    self.trades.append({"type": "Sell", "pnl": pnl})
-                    self.current_balance += pnl
+            signal = df["signal"].values
+            buys, sells = signal == "Buy", signal == "Sell"
+            traded = buys | sells
+            pnl = np.where(traded, df["ATR"].values * self.config["take_profit_multiplier"], 0.0)
+            # Sequential cumsum from the running balance adds each P&L in bar order
+            equity = np.cumsum(np.concatenate(([self.current_balance], pnl)))[1:]
+            position = buys.astype(np.int8) - sells.astype(np.int8)
+            self.equity_curve.extend(equity, position)
+            self.trades.extend(
+                {"type": t, "pnl": p} for t, p in zip(signal[traded].tolist(), pnl[traded].tolist())
+            )
+            if len(equity):
+                self.current_balance = float(equity[-1])
         except Exception as e:
             logging.error(f"Trade simulation failed: {e}")
 
     def calculate_metrics(self):
         wins = [t for t in self.trades if t["pnl"] > 0]
         roi = (self.current_balance - self.initial_balance) / self.initial_balance * 100
-        return {
+        metrics = {
             "Total Trades": len(self.trades),
             "Win Rate": len(wins) / len(self.trades) * 100 if self.trades else 0,
             "ROI (%)": roi,
             "Final Balance": self.current_balance
         }
+        metrics.update(risk_metrics(
+            self.equity_curve.equity, self.equity_curve.position, self.config.get("bars_per_year", BARS_PER_YEAR)
+        ))
+        return metrics
+
+    def rolling_metrics(self, window):
+        """Rolling-window risk metrics over the per-bar equity curve of the last run."""
+        return rolling_risk_metrics(
+            self.equity_curve.equity, window, self.equity_curve.position, self.config.get("bars_per_year", BARS_PER_YEAR)
+        )
 
-    def run(self):
+    def run(self, chunk_size=None):
+        if chunk_size:
+            return self.run_streaming(chunk_size)
         df = self.load_data()
         if df is not None:
+            self.equity_curve.reserve(len(df))
             df = self.calculate_indicators(df)
             df = self.apply_strategy(df)
             self.simulate_trades(df)
@@ -153,8 +209,35 @@ class Backtester:
             logging.info("Backtest completed.")
             return metrics
 
+    def run_streaming(self, chunk_size=100_000):
+        """
+        Out-of-core backtest: reads `chunk_size` rows at a time and carries an
+        indicator warm-up tail and the running balance across chunks, so peak memory
+        follows the chunk size rather than the file size. Trades and metrics match run().
+        The RandomForest `ml_signal` column is not produced here; it needs the whole
+        dataset for its train/test split and does not feed simulate_trades.
+        """
+        try:
+            tail = None
+            self.equity_curve.reserve(chunk_size)
+            rows = 0
+            for chunk in self.iter_chunks(chunk_size):
+                rows += len(chunk)
+                chunk, tail = self.calculate_indicators_streaming(chunk, tail)
+                chunk = self.generate_signals(chunk)
+                chunk.dropna(inplace=True)
+                self.simulate_trades(chunk)
+            logging.info(f"Streamed {rows} records from {self.data_path} in chunks of {chunk_size}.")
+        except Exception as e:
+            logging.error(f"Streaming backtest failed: {e}")
+            return None
+        metrics = self.calculate_metrics()
+        logging.info("Backtest completed.")
+        return metrics
+
 
 if __name__ == "__main__":
+    setup_logging(LOG_FILE)
     wallet = WalletManager(total_balance=10000)
     wallet.allocate_balance(5000)
     backtester = Backtester(data_path="EUR_USD_historical_data.csv", wallet_manager=wallet)
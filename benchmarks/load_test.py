@@ -0,0 +1,191 @@
+# benchmarks/load_test.py
+"""
+Throughput and tail latency of the OANDA-facing agents against the local
+stand-in server (benchmarks/oanda_standin.py), with no network access.
+
+Scenarios run back to back against one in-process server:
+  fetcher  - concurrent DataFetcher.fetch_live_data calls
+  orders   - batches of signals through the async order pipeline
+  tracker  - TradeOutcomeTracker.update_trade_log over the trades just placed
+
+    python -m benchmarks.load_test --profile realistic --duration 15
+    python -m benchmarks.load_test --profile adversarial --scenarios orders --no-limiter
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import threading
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from benchmarks.oanda_standin import PROFILES, serve
+from benchmarks.synthetic import INSTRUMENTS
+from utils.oanda_client import LOCAL_URL_ENV
+
+ACCOUNT_ID = "101-000-0000000-001"
+SCENARIOS = ("fetcher", "orders", "tracker")
+
+
+class NullNotifier:
+    """Stands in for Telegram so alerts cost nothing during the run."""
+    def send_message(self, message):
+        pass
+
+
+def summarize(latencies, errors, wall):
+    ms = np.array(latencies) * 1000
+    calls = len(latencies)
+    return {
+        "calls": calls,
+        "errors": errors,
+        "throughput_per_s": round(calls / wall, 2) if wall else 0.0,
+        "p50_ms": round(float(np.percentile(ms, 50)), 2) if calls else None,
+        "p95_ms": round(float(np.percentile(ms, 95)), 2) if calls else None,
+        "p99_ms": round(float(np.percentile(ms, 99)), 2) if calls else None,
+        "max_ms": round(float(ms.max()), 2) if calls else None,
+    }
+
+
+def run_concurrent(call, workers, duration):
+    """Calls `call()` from `workers` threads for `duration` seconds; it returns True on success."""
+    latencies, errors, lock = [], [0], threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            ok = call()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                errors[0] += not ok
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(latencies, errors[0], time.perf_counter() - start)
+
+
+# ==========================
+# SCENARIOS
+# ==========================
+def scenario_fetcher(workers, duration, **_):
+    from config import OANDA_API_KEY
+    from agents.data_fetcher import DataFetcher
+
+    fetcher = DataFetcher(api_key=OANDA_API_KEY, account_id=ACCOUNT_ID)
+    instruments = ",".join(INSTRUMENTS)
+    return run_concurrent(lambda: fetcher.fetch_live_data(instruments) is not None, workers, duration)
+
+
+def scenario_orders(workers, duration, bot=None, batch=20, **_):
+    from agents.order_pipeline import execute_orders
+
+    latencies, statuses, batches = [], {}, []
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        orders = [
+            dict(instrument=INSTRUMENTS[i % len(INSTRUMENTS)], signal="Buy" if i % 2 else "Sell",
+                 price=1.0, atr=0.001, capital=1000, lstm_prediction="Buy" if i % 2 else "Sell",
+                 correct_prediction=True)
+            for i in range(batch)
+        ]
+        t = time.perf_counter()
+        results, _ = execute_orders(bot, orders, max_in_flight=workers)
+        batches.append(time.perf_counter() - t)
+        for r in results:
+            if isinstance(r, dict):
+                statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+                if "submit_ms" in r:
+                    latencies.append(r["submit_ms"] / 1000)
+            else:
+                statuses["exception"] = statuses.get("exception", 0) + 1
+    result = summarize(latencies, sum(v for k, v in statuses.items() if k != "filled"), time.perf_counter() - start)
+    result["statuses"] = statuses
+    result["batch"] = summarize(batches, 0, sum(batches))
+    return result
+
+
+def scenario_tracker(workers, duration, **_):
+    from agents.trade_tracker import TradeOutcomeTracker
+
+    tracker = TradeOutcomeTracker()
+    # update_trade_log swallows its own errors, so only latency is meaningful here
+    return run_concurrent(lambda: tracker.update_trade_log() is None, 1, duration)
+
+
+RUNNERS = {"fetcher": scenario_fetcher, "orders": scenario_orders, "tracker": scenario_tracker}
+
+
+def run(profile="realistic", scenarios=SCENARIOS, duration=10.0, workers=4, batch=20, limiter=True,
+        workdir=None, **overrides):
+    """Starts a stand-in server, points the agents at it and runs each scenario; returns a report dict."""
+    workdir = workdir or tempfile.mkdtemp(prefix="sapera_load_")
+    server = serve(port=0, profile=profile, trade_lifetime=max(2.0, duration / 3), **overrides).start()
+    os.environ[LOCAL_URL_ENV] = server.url
+
+    import agents.trade_executor as trade_executor
+    import agents.trade_tracker as trade_tracker
+    from utils.oanda_client import get_client, client_stats
+    from utils.rate_limiter import RateLimiter
+    from utils.retry import retry_stats
+
+    # Keep the run's trade journal and rate-limit budget out of the live bot's files
+    trade_executor.TRADE_JOURNAL = trade_tracker.TRADE_JOURNAL = os.path.join(workdir, "trade_journal.db")
+    trade_executor.OANDA_ACCOUNT_ID = trade_tracker.OANDA_ACCOUNT_ID = ACCOUNT_ID
+    trade_tracker.STATE_FILE = os.path.join(workdir, "trade_tracker_state.json")
+    client = get_client(trade_executor.OANDA_API_KEY)
+    client.limiter = RateLimiter(path=os.path.join(workdir, "ratelimit")) if limiter else None
+    bot = trade_executor.EnhancedTradingBot(wallet_manager=None, notifier=NullNotifier())
+
+    report = {"profile": profile, "overrides": overrides, "duration_s": duration, "workers": workers,
+              "limiter": limiter, "scenarios": {}}
+    for name in scenarios:
+        logging.info(f"Running {name} ({profile}, {duration}s, {workers} workers)")
+        report["scenarios"][name] = RUNNERS[name](workers=workers, duration=duration, bot=bot, batch=batch)
+    report["server_status_counts"] = server.stats
+    report["client_stats"] = client_stats()
+    report["retry_stats"] = retry_stats()
+    if client.limiter is not None:
+        report["rate_limit_waits"] = client.limiter.stats()["waits"]
+    server.shutdown()
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Load-test the OANDA agents against the local stand-in.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent callers / orders in flight")
+    parser.add_argument("--batch", type=int, default=20, help="signals per order batch")
+    parser.add_argument("--no-limiter", action="store_true", help="bypass the client-side rate limiter")
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--rate-limit-rate", type=float)
+    parser.add_argument("--max-rps", type=int)
+    parser.add_argument("--out", help="write the JSON report here as well")
+    args = parser.parse_args()
+
+    overrides = {k: v for k, v in {
+        "latency_ms": args.latency_ms, "error_rate": args.error_rate,
+        "rate_limit_rate": args.rate_limit_rate, "max_rps": args.max_rps,
+    }.items() if v is not None}
+    report = run(args.profile, args.scenarios.split(","), args.duration, args.workers, args.batch,
+                 limiter=not args.no_limiter, **overrides)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
@@ -0,0 +1,635 @@
+# benchmarks/oanda_standin.py
+"""
+Local stand-in for the OANDA v20 REST and streaming API, for offline load and
+latency testing.
+
+It serves pricing (poll and stream), instrument candles, orders, trades,
+transactions (sinceid, stream), account details and account changes. Prices
+come from a recorded CSV or a deterministic synthetic walk. Every request goes
+through a fault profile: a latency distribution with occasional spikes, random
+5xx errors and 429s (random, plus a server-side request budget).
+
+    python -m benchmarks.oanda_standin --port 8090 --profile adversarial
+    SAPERA_OANDA_URL=http://127.0.0.1:8090 python main.py
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import itertools
+import threading
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic import synthetic_ohlcv
+
+STARTING_BALANCE = 100_000.0
+TRADE_LIFETIME = 30.0  # seconds before an open trade is closed at market
+HEARTBEAT_SECONDS = 5.0
+MAX_TRANSACTIONS = 1000  # per sinceid page, as on v20
+
+# Latency in ms is lognormal around `latency_ms`; `spike_rate` of requests take `spike_ms` more.
+PROFILES = {
+    "ideal": dict(latency_ms=0.0, sigma=0.0, spike_rate=0.0, spike_ms=0.0,
+                  error_rate=0.0, rate_limit_rate=0.0, max_rps=0),
+    "realistic": dict(latency_ms=40.0, sigma=0.4, spike_rate=0.005, spike_ms=800.0,
+                      error_rate=0.002, rate_limit_rate=0.0, max_rps=120),
+    "adversarial": dict(latency_ms=120.0, sigma=0.9, spike_rate=0.05, spike_ms=3000.0,
+                        error_rate=0.05, rate_limit_rate=0.1, max_rps=30),
+}
+
+
+def rfc3339(ts=None):
+    ts = ts or datetime.now(timezone.utc)
+    return ts.strftime("%Y-%m-%dT%H:%M:%S.%f") + "000Z"
+
+
+def pip_size(instrument):
+    return 0.01 if "JPY" in instrument else 0.0001
+
+
+# ==========================
+# FAULTS
+# ==========================
+class FaultProfile:
+    """Latency, error and throttling behaviour applied to every REST request."""
+    def __init__(self, latency_ms=0.0, sigma=0.0, spike_rate=0.0, spike_ms=0.0,
+                 error_rate=0.0, rate_limit_rate=0.0, max_rps=0, seed=None):
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.spike_rate = spike_rate
+        self.spike_ms = spike_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_rps = max_rps
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(max_rps)
+        self._updated = time.monotonic()
+
+    @classmethod
+    def named(cls, name, **overrides):
+        return cls(**dict(PROFILES[name], **overrides))
+
+    def delay(self):
+        with self._lock:
+            ms = self.latency_ms * self._rng.lognormvariate(0.0, self.sigma) if self.latency_ms else 0.0
+            if self.spike_rate and self._rng.random() < self.spike_rate:
+                ms += self.spike_ms
+        return ms / 1000
+
+    def _over_budget(self):
+        if not self.max_rps:
+            return False
+        now = time.monotonic()
+        self._tokens = min(self.max_rps, self._tokens + (now - self._updated) * self.max_rps)
+        self._updated = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def fault(self):
+        """(status, body) to answer with instead of the real response, or None."""
+        with self._lock:
+            if self._over_budget() or (self.rate_limit_rate and self._rng.random() < self.rate_limit_rate):
+                return 429, {"errorMessage": "Requests are being rate limited"}
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return self._rng.choice([500, 502, 503]), {"errorMessage": "Service temporarily unavailable"}
+        return None
+
+
+# ==========================
+# PRICES
+# ==========================
+class PriceFeed:
+    """
+    Mid prices that advance one bar every `tick_seconds`, wrapping at the end.
+    Recorded data is a CSV with close (and optionally instrument/open/high/low)
+    columns; any other instrument gets a synthetic walk.
+    """
+    def __init__(self, source=None, tick_seconds=1.0, bars=10_000, seed=0, spread_pips=1.0):
+        self.tick_seconds = tick_seconds
+        self.bars = bars
+        self.seed = seed
+        self.spread_pips = spread_pips
+        self.start = time.monotonic()
+        self._frames = {}
+        self._lock = threading.Lock()
+        if source:
+            df = pd.read_csv(source)
+            if "instrument" not in df.columns:
+                df["instrument"] = "EUR_USD"
+            for instrument, frame in df.groupby("instrument"):
+                self._frames[instrument] = self._ohlc(frame)
+
+    @staticmethod
+    def _ohlc(frame):
+        close = frame["close"].to_numpy(dtype=float)
+        cols = {c: frame[c].to_numpy(dtype=float) if c in frame.columns else close for c in ("open", "high", "low")}
+        volume = frame["volume"].to_numpy() if "volume" in frame.columns else np.full(len(close), 1)
+        return {"open": cols["open"], "high": cols["high"], "low": cols["low"], "close": close, "volume": volume}
+
+    def _frame(self, instrument):
+        frame = self._frames.get(instrument)
+        if frame is None:
+            with self._lock:
+                frame = self._frames.get(instrument)
+                if frame is None:
+                    frame = self._frames[instrument] = self._ohlc(synthetic_ohlcv(self.bars, instrument, self.seed))
+        return frame
+
+    def index(self):
+        return int((time.monotonic() - self.start) / self.tick_seconds)
+
+    def mid(self, instrument):
+        close = self._frame(instrument)["close"]
+        return float(close[self.index() % len(close)])
+
+    def quote(self, instrument):
+        mid = self.mid(instrument)
+        half = pip_size(instrument) * self.spread_pips / 2
+        return mid - half, mid + half
+
+    def candles(self, instrument, count):
+        frame = self._frame(instrument)
+        n = len(frame["close"])
+        end = self.index()
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        out = []
+        for k, i in enumerate(range(end - count + 1, end + 1)):
+            j = i % n
+            digits = 3 if "JPY" in instrument else 5
+            out.append({
+                "complete": i < end,
+                "volume": int(frame["volume"][j]),
+                "time": rfc3339(now - timedelta(minutes=count - 1 - k)),
+                "mid": {c[0]: f"{frame[c][j]:.{digits}f}" for c in ("open", "high", "low", "close")},
+            })
+        return out
+
+
+# ==========================
+# ACCOUNT STATE
+# ==========================
+class Account:
+    """Balance, trades and the transaction log of one stand-in account."""
+    def __init__(self, account_id, feed, trade_lifetime=TRADE_LIFETIME):
+        self.id = account_id
+        self.feed = feed
+        self.trade_lifetime = trade_lifetime
+        self.balance = STARTING_BALANCE
+        self.trades = {}  # id -> trade dict (open and closed)
+        self.opened_at = {}  # id -> monotonic open time
+        self.client_ids = {}  # clientExtensions id -> trade id
+        self.transactions = []
+        self._ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self._record({"type": "CREATE", "accountBalance": f"{self.balance:.4f}"})
+
+    @property
+    def last_id(self):
+        return self.transactions[-1]["id"]
+
+    def _record(self, tx):
+        tx = dict(tx, id=str(next(self._ids)), accountID=self.id, time=rfc3339())
+        self.transactions.append(tx)
+        return tx
+
+    def _pl(self, trade, price):
+        return (price - float(trade["price"])) * int(trade["currentUnits"])
+
+    def sweep(self):
+        """Closes trades whose SL/TP was crossed or whose lifetime ran out (caller holds the lock)."""
+        now = time.monotonic()
+        for trade in [t for t in self.trades.values() if t["state"] == "OPEN"]:
+            bid, ask = self.feed.quote(trade["instrument"])
+            units = int(trade["currentUnits"])
+            price = bid if units > 0 else ask
+            sl, tp = trade.get("_sl"), trade.get("_tp")
+            hit = (sl is not None and (price <= sl if units > 0 else price >= sl)) or \
+                  (tp is not None and (price >= tp if units > 0 else price <= tp))
+            if hit or now - self.opened_at[trade["id"]] >= self.trade_lifetime:
+                self.close_trade(trade, price)
+
+    def close_trade(self, trade, price):
+        pl = round(self._pl(trade, price), 4)
+        self.balance += pl
+        tx = self._record({
+            "type": "ORDER_FILL", "instrument": trade["instrument"], "units": str(-int(trade["currentUnits"])),
+            "price": f"{price:.5f}", "pl": f"{pl:.4f}", "accountBalance": f"{self.balance:.4f}",
+            "tradesClosed": [{"tradeID": trade["id"], "units": str(-int(trade["currentUnits"])), "realizedPL": f"{pl:.4f}"}],
+        })
+        trade.update(state="CLOSED", currentUnits="0", realizedPL=f"{pl:.4f}", unrealizedPL="0.0000",
+                     averageClosePrice=f"{price:.5f}", closeTime=tx["time"], _close_tx=int(tx["id"]))
+        return tx
+
+    def market_order(self, order):
+        instrument = order["instrument"]
+        units = int(float(order["units"]))
+        client_id = order.get("clientExtensions", {}).get("id")
+        create = self._record({"type": "MARKET_ORDER", "instrument": instrument, "units": str(units),
+                               "clientExtensions": order.get("clientExtensions")})
+        if client_id and client_id in self.client_ids:
+            reject = dict(create, type="MARKET_ORDER_REJECT", rejectReason="CLIENT_ORDER_ID_ALREADY_EXISTS")
+            self.transactions[-1] = reject
+            return 400, {"orderRejectTransaction": reject, "errorCode": "CLIENT_ORDER_ID_ALREADY_EXISTS",
+                         "errorMessage": "The client Order ID specified is already in use",
+                         "lastTransactionID": self.last_id}
+        bid, ask = self.feed.quote(instrument)
+        price = ask if units > 0 else bid
+        fill = self._record({
+            "type": "ORDER_FILL", "orderID": create["id"], "clientOrderID": client_id,
+            "instrument": instrument, "units": str(units),
+            "price": f"{price:.5f}", "accountBalance": f"{self.balance:.4f}", "pl": "0.0000",
+            "tradeOpened": {"tradeID": None, "units": str(units), "clientExtensions": order.get("clientExtensions")},
+        })
+        trade_id = fill["id"]
+        fill["tradeOpened"]["tradeID"] = trade_id
+        self.trades[trade_id] = {
+            "id": trade_id, "instrument": instrument, "price": f"{price:.5f}", "openTime": fill["time"],
+            "initialUnits": str(units), "currentUnits": str(units), "state": "OPEN", "realizedPL": "0.0000",
+            "unrealizedPL": "0.0000", "clientExtensions": order.get("clientExtensions") or {},
+            "_sl": float(order["stopLossOnFill"]["price"]) if order.get("stopLossOnFill") else None,
+            "_tp": float(order["takeProfitOnFill"]["price"]) if order.get("takeProfitOnFill") else None,
+            "_open_tx": int(trade_id),
+        }
+        self.opened_at[trade_id] = time.monotonic()
+        if client_id:
+            self.client_ids[client_id] = trade_id
+        return 201, {"orderCreateTransaction": create, "orderFillTransaction": fill,
+                     "relatedTransactionIDs": [create["id"], fill["id"]], "lastTransactionID": self.last_id}
+
+    # === Views ===
+    @staticmethod
+    def public(trade):
+        return {k: v for k, v in trade.items() if not k.startswith("_")}
+
+    def open_trades(self):
+        return [t for t in self.trades.values() if t["state"] == "OPEN"]
+
+    def positions(self, instruments=None):
+        out = {}
+        for t in self.trades.values():
+            if instruments is not None and t["instrument"] not in instruments:
+                continue
+            p = out.setdefault(t["instrument"], {"instrument": t["instrument"], "pl": 0.0, "unrealizedPL": 0.0,
+                                                 "long": {"units": 0}, "short": {"units": 0}})
+            p["pl"] += float(t["realizedPL"])
+            units = int(t["currentUnits"])
+            if units:
+                p["long" if units > 0 else "short"]["units"] += units
+                p["unrealizedPL"] += self._pl(t, self.feed.mid(t["instrument"]))
+        for p in out.values():
+            p["long"]["units"], p["short"]["units"] = str(p["long"]["units"]), str(p["short"]["units"])
+            p["pl"], p["unrealizedPL"] = f"{p['pl']:.4f}", f"{p['unrealizedPL']:.4f}"
+        return list(out.values())
+
+    def summary(self):
+        unrealized = sum(self._pl(t, self.feed.mid(t["instrument"])) for t in self.open_trades())
+        margin_used = sum(abs(int(t["currentUnits"])) * float(t["price"]) * 0.02 for t in self.open_trades())
+        nav = self.balance + unrealized
+        return {
+            "id": self.id, "currency": "USD", "balance": f"{self.balance:.4f}", "NAV": f"{nav:.4f}",
+            "unrealizedPL": f"{unrealized:.4f}", "marginUsed": f"{margin_used:.4f}",
+            "marginAvailable": f"{nav - margin_used:.4f}", "openTradeCount": len(self.open_trades()),
+            "openPositionCount": sum(1 for p in self.positions() if p["long"]["units"] != "0" or p["short"]["units"] != "0"),
+            "pendingOrderCount": 0, "lastTransactionID": self.last_id,
+        }
+
+    def changes(self, since):
+        since = int(since)
+        opened = [self.public(t) for t in self.trades.values() if t["_open_tx"] > since and t["state"] == "OPEN"]
+        closed = [self.public(t) for t in self.trades.values() if t.get("_close_tx", 0) > since]
+        touched = {t["instrument"] for t in opened + closed}
+        state = self.summary()
+        state["trades"] = [{"id": t["id"], "unrealizedPL": f"{self._pl(t, self.feed.mid(t['instrument'])):.4f}"}
+                           for t in self.open_trades()]
+        state["positions"] = [{"instrument": p["instrument"], "netUnrealizedPL": p["unrealizedPL"]} for p in self.positions()]
+        return {
+            "changes": {
+                "tradesOpened": opened, "tradesClosed": closed, "tradesReduced": [],
+                "positions": self.positions(touched), "transactions": self.transactions[since:],
+                "ordersCreated": [], "ordersFilled": [], "ordersCancelled": [], "ordersTriggered": [],
+            },
+            "state": state,
+            "lastTransactionID": self.last_id,
+        }
+
+
+# ==========================
+# HTTP
+# ==========================
+ROUTES = []
+
+
+def route(method, pattern, name, stream=False):
+    def register(fn):
+        ROUTES.append((method, re.compile(pattern + r"/?$"), name, stream, fn))
+        return fn
+    return register
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, profile=None, feed=None, trade_lifetime=TRADE_LIFETIME):
+        super().__init__(address, StandInHandler)
+        self.profile = profile or FaultProfile()
+        self.feed = feed or PriceFeed()
+        self.trade_lifetime = trade_lifetime
+        self.accounts = {}
+        self._accounts_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def account(self, account_id):
+        with self._accounts_lock:
+            if account_id not in self.accounts:
+                self.accounts[account_id] = Account(account_id, self.feed, self.trade_lifetime)
+            return self.accounts[account_id]
+
+    def record(self, name, status):
+        with self._stats_lock:
+            entry = self.stats.setdefault(name, {})
+            entry[status] = entry.get(status, 0) + 1
+
+    def start(self):
+        """Serves from a daemon thread; returns self."""
+        threading.Thread(target=self.serve_forever, name="oanda-standin", daemon=True).start()
+        return self
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out as separate writes; avoid the delayed-ACK stall
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+
+        for m, pattern, name, stream, handler in ROUTES:
+            match = pattern.match(url.path)
+            if m == method and match:
+                break
+        else:
+            self.server.record("unknown", 404)
+            return self._send(404, {"errorMessage": f"Unknown endpoint {method} {url.path}"})
+
+        delay = self.server.profile.delay()
+        if delay:
+            time.sleep(delay)
+        fault = self.server.profile.fault()
+        if fault is not None:
+            self.server.record(name, fault[0])
+            return self._send(*fault)
+        if stream:
+            self.server.record(name, 200)
+            return handler(self, query, **match.groupdict())
+
+        params = match.groupdict()
+        account_id = params.pop("account", None)
+        try:
+            if account_id is not None:
+                account = self.server.account(account_id)
+                with account.lock:
+                    account.sweep()
+                    status, payload = handler(self, account, query, body, **params)
+            else:
+                status, payload = handler(self, query, body, **params)
+        except (KeyError, ValueError, TypeError) as e:
+            status, payload = 400, {"errorMessage": f"Invalid request: {e}"}
+        self.server.record(name, status)
+        self._send(status, payload)
+
+    def _stream(self, lines):
+        """Writes JSON lines until the client goes away; the connection is closed afterwards."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for line in lines:
+                self.wfile.write(json.dumps(line).encode() + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+A = r"/v3/accounts/(?P<account>[^/]+)"
+
+
+@route("GET", A, "account.details")
+def account_details(h, account, query, body, **_):
+    summary = account.summary()
+    summary.update(positions=account.positions(), trades=[account.public(t) for t in account.open_trades()], orders=[])
+    return 200, {"account": summary, "lastTransactionID": account.last_id}
+
+
+@route("GET", A + "/summary", "account.summary")
+def account_summary(h, account, query, body, **_):
+    return 200, {"account": account.summary(), "lastTransactionID": account.last_id}
+
+
+@route("GET", A + "/changes", "account.changes")
+def account_changes(h, account, query, body, **_):
+    return 200, account.changes(query["sinceTransactionID"])
+
+
+@route("GET", A + "/pricing", "pricing.info")
+def pricing_info(h, account, query, body, **_):
+    prices = []
+    for instrument in query["instruments"].split(","):
+        bid, ask = h.server.feed.quote(instrument)
+        prices.append({"type": "PRICE", "instrument": instrument, "time": rfc3339(), "tradeable": True,
+                       "bids": [{"price": f"{bid:.5f}", "liquidity": 1_000_000}],
+                       "asks": [{"price": f"{ask:.5f}", "liquidity": 1_000_000}],
+                       "closeoutBid": f"{bid:.5f}", "closeoutAsk": f"{ask:.5f}"})
+    return 200, {"prices": prices, "time": rfc3339()}
+
+
+@route("GET", A + "/pricing/stream", "pricing.stream", stream=True)
+def pricing_stream(h, query, account, **_):
+    feed = h.server.feed
+    instruments = query["instruments"].split(",")
+
+    def lines():
+        last, heartbeat = None, time.monotonic()
+        while True:
+            index = feed.index()
+            if index != last:
+                last = index
+                for instrument in instruments:
+                    bid, ask = feed.quote(instrument)
+                    yield {"type": "PRICE", "instrument": instrument, "time": rfc3339(), "tradeable": True,
+                           "bids": [{"price": f"{bid:.5f}", "liquidity": 1_000_000}],
+                           "asks": [{"price": f"{ask:.5f}", "liquidity": 1_000_000}]}
+            if time.monotonic() - heartbeat >= HEARTBEAT_SECONDS:
+                heartbeat = time.monotonic()
+                yield {"type": "HEARTBEAT", "time": rfc3339()}
+            time.sleep(min(feed.tick_seconds, 0.25))
+    h._stream(lines())
+
+
+@route("GET", r"/v3/instruments/(?P<instrument>[^/]+)/candles", "instruments.candles")
+def instrument_candles(h, query, body, instrument, **_):
+    count = min(int(query.get("count", 500)), 5000)
+    return 200, {"instrument": instrument, "granularity": query.get("granularity", "S5"),
+                 "candles": h.server.feed.candles(instrument, count)}
+
+
+@route("POST", A + "/orders", "orders.create")
+def order_create(h, account, query, body, **_):
+    order = body["order"]
+    if order.get("type", "MARKET") != "MARKET":
+        return 400, {"errorMessage": "Only MARKET orders are supported by the stand-in"}
+    return account.market_order(order)
+
+
+@route("GET", A + "/trades", "trades.list")
+def trades_list(h, account, query, body, **_):
+    state = query.get("state", "OPEN")
+    count = min(int(query.get("count", 50)), 500)
+    rows = [t for t in account.trades.values()
+            if (state == "ALL" or t["state"] == state)
+            and ("instrument" not in query or t["instrument"] == query["instrument"])
+            and ("beforeID" not in query or int(t["id"]) < int(query["beforeID"]))]
+    rows = sorted(rows, key=lambda t: int(t["id"]), reverse=True)[:count]
+    return 200, {"trades": [account.public(t) for t in rows], "lastTransactionID": account.last_id}
+
+
+@route("GET", A + "/openTrades", "trades.open")
+def open_trades(h, account, query, body, **_):
+    return 200, {"trades": [account.public(t) for t in account.open_trades()], "lastTransactionID": account.last_id}
+
+
+@route("GET", A + r"/trades/(?P<trade>[^/]+)", "trades.details")
+def trade_details(h, account, query, body, trade, **_):
+    if trade.startswith("@"):
+        trade = account.client_ids.get(trade[1:], trade)
+    if trade not in account.trades:
+        return 404, {"errorMessage": "The Trade specified does not exist"}
+    return 200, {"trade": account.public(account.trades[trade]), "lastTransactionID": account.last_id}
+
+
+@route("PUT", A + r"/trades/(?P<trade>[^/]+)/close", "trades.close")
+def trade_close(h, account, query, body, trade, **_):
+    t = account.trades.get(trade)
+    if t is None or t["state"] != "OPEN":
+        return 404, {"errorMessage": "The Trade specified does not exist or is closed"}
+    bid, ask = account.feed.quote(t["instrument"])
+    tx = account.close_trade(t, bid if int(t["currentUnits"]) > 0 else ask)
+    return 200, {"orderFillTransaction": tx, "lastTransactionID": account.last_id}
+
+
+@route("GET", A + "/openPositions", "positions.open")
+def open_positions(h, account, query, body, **_):
+    positions = [p for p in account.positions() if p["long"]["units"] != "0" or p["short"]["units"] != "0"]
+    return 200, {"positions": positions, "lastTransactionID": account.last_id}
+
+
+@route("GET", A + "/positions", "positions.list")
+def positions_list(h, account, query, body, **_):
+    return 200, {"positions": account.positions(), "lastTransactionID": account.last_id}
+
+
+@route("GET", A + "/transactions/sinceid", "transactions.sinceid")
+def transactions_since(h, account, query, body, **_):
+    since = int(query["id"])
+    return 200, {"transactions": account.transactions[since:since + MAX_TRANSACTIONS],
+                 "lastTransactionID": account.last_id}
+
+
+@route("GET", A + "/transactions/stream", "transactions.stream", stream=True)
+def transactions_stream(h, query, account, **_):
+    acct = h.server.account(account)
+
+    def lines():
+        with acct.lock:
+            seen = len(acct.transactions)
+        heartbeat = time.monotonic()
+        while True:
+            with acct.lock:
+                acct.sweep()
+                new = acct.transactions[seen:]
+                seen += len(new)
+            yield from new
+            if time.monotonic() - heartbeat >= HEARTBEAT_SECONDS:
+                heartbeat = time.monotonic()
+                yield {"type": "HEARTBEAT", "lastTransactionID": acct.last_id, "time": rfc3339()}
+            time.sleep(0.05)
+    h._stream(lines())
+
+
+def serve(host="127.0.0.1", port=8090, profile="realistic", prices=None, tick_seconds=1.0,
+          trade_lifetime=TRADE_LIFETIME, **overrides):
+    """Builds a StandInServer (port 0 picks a free one); call .start() or .serve_forever()."""
+    fault_profile = FaultProfile.named(profile, **overrides)
+    return StandInServer((host, port), fault_profile, PriceFeed(prices, tick_seconds), trade_lifetime)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Local OANDA v20 stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--prices", help="CSV of recorded prices (close, optional instrument/open/high/low)")
+    parser.add_argument("--tick-seconds", type=float, default=1.0, help="wall seconds per price bar")
+    parser.add_argument("--trade-lifetime", type=float, default=TRADE_LIFETIME)
+    parser.add_argument("--latency-ms", type=float, help="override the profile's median latency")
+    parser.add_argument("--error-rate", type=float, help="override the profile's 5xx rate")
+    parser.add_argument("--rate-limit-rate", type=float, help="override the profile's random 429 rate")
+    parser.add_argument("--max-rps", type=int, help="override the profile's request budget (0 = none)")
+    args = parser.parse_args()
+
+    overrides = {k: v for k, v in {
+        "latency_ms": args.latency_ms, "error_rate": args.error_rate,
+        "rate_limit_rate": args.rate_limit_rate, "max_rps": args.max_rps,
+    }.items() if v is not None}
+    server = serve(args.host, args.port, args.profile, args.prices, args.tick_seconds, args.trade_lifetime, **overrides)
+    logging.info(f"OANDA stand-in on {server.url} ({args.profile}); export SAPERA_OANDA_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info(f"Requests served: {json.dumps(server.stats)}")
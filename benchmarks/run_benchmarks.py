@@ -0,0 +1,302 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark suite for the SAPERA pipeline on deterministic synthetic data.
+
+Each (stage, size) pair runs in a fresh process so peak RSS belongs to that stage
+alone. Results are appended to a JSON history and compared against a stored baseline.
+
+    python -m benchmarks.run_benchmarks --sizes 10k,1M
+    python -m benchmarks.run_benchmarks --sizes 10k --stages backtester --save-baseline
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import multiprocessing
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from benchmarks.synthetic import INSTRUMENTS, synthetic_market, synthetic_trade_log
+
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+DATA_DIR = os.path.join(BENCH_DIR, "data")
+HISTORY_FILE = os.path.join(BENCH_DIR, "results", "history.json")
+BASELINE_FILE = os.path.join(BENCH_DIR, "results", "baseline.json")
+DEFAULT_SIZES = "10k,1M,10M"
+DEFAULT_TOLERANCE = 0.15
+OHLCV = ["open", "high", "low", "close", "volume"]
+
+
+# ==========================
+# STAGES
+# ==========================
+# Each stage takes (bars, workdir), does its untimed setup and returns the callable to time.
+
+def _market_csv(bars, workdir):
+    path = os.path.join(workdir, f"market_{bars}.csv")
+    if not os.path.exists(path):
+        os.makedirs(workdir, exist_ok=True)
+        synthetic_market(bars, INSTRUMENTS).drop(columns="instrument").to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def stage_backtester(bars, workdir, chunk_size=None):
+    import backtester
+
+    path = _market_csv(bars, workdir)
+
+    def run():
+        wallet = backtester.WalletManager(total_balance=10000)
+        wallet.allocate_balance(5000)
+        backtester.Backtester(data_path=path, wallet_manager=wallet).run(chunk_size=chunk_size)
+    return run
+
+
+def stage_backtester_streaming(bars, workdir):
+    return stage_backtester(bars, workdir, chunk_size=100_000)
+
+
+def stage_strategy_indicators(bars, workdir):
+    from agents.strategy import StrategyAnalyzer
+
+    analyzer = StrategyAnalyzer()
+    df = synthetic_market(bars, INSTRUMENTS)
+    return lambda: analyzer.calculate_indicators(df)
+
+
+def stage_strategy_signals(bars, workdir):
+    from agents.strategy import StrategyAnalyzer
+
+    analyzer = StrategyAnalyzer()
+    df = analyzer.calculate_indicators(synthetic_market(bars, INSTRUMENTS))
+    return lambda: analyzer.generate_signals(df)
+
+
+def _lstm(workdir):
+    from agents.lstm_model import LSTMModel
+
+    # Untrained model in the scratch dir so the benchmark never touches models/
+    return LSTMModel(model_path=os.path.join(workdir, "bench_lstm.keras"), look_back=50)
+
+
+def stage_lstm_preprocess(bars, workdir):
+    lstm = _lstm(workdir)
+    data = synthetic_market(bars, INSTRUMENTS)[OHLCV].values
+    return lambda: lstm.preprocess_data(data)
+
+
+def stage_lstm_predict(bars, workdir):
+    lstm = _lstm(workdir)
+    data = synthetic_market(bars, INSTRUMENTS)[OHLCV].values
+    lstm.scaler.fit(data)
+    return lambda: lstm.predict(data)
+
+
+def stage_performance_metrics(bars, workdir):
+    from agents.performance_tracker import PerformanceTracker
+
+    tracker = PerformanceTracker()
+    df = synthetic_trade_log(bars)
+    return lambda: tracker.compute_metrics(df)
+
+
+STAGES = {
+    "backtester": stage_backtester,
+    "backtester_streaming": stage_backtester_streaming,
+    "strategy.calculate_indicators": stage_strategy_indicators,
+    "strategy.generate_signals": stage_strategy_signals,
+    "lstm.preprocess_data": stage_lstm_preprocess,
+    "lstm.predict": stage_lstm_predict,
+    "performance.compute_metrics": stage_performance_metrics,
+}
+
+
+# ==========================
+# MEASUREMENT
+# ==========================
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _run_stage(stage, bars, workdir, trace_allocations, conn):
+    logging.disable(logging.INFO)
+    try:
+        run = STAGES[stage](bars, workdir)
+        setup_rss = peak_rss_mb()
+        start = time.perf_counter()
+        run()
+        result = {
+            "status": "ok",
+            "wall_s": round(time.perf_counter() - start, 6),
+            "setup_rss_mb": setup_rss,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        if trace_allocations:
+            # Separate traced pass so tracemalloc overhead never skews the wall time
+            tracemalloc.start()
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result["alloc_peak_mb"] = round(peak / (1024 * 1024), 3)
+    except ImportError as e:
+        result = {"status": "skipped", "reason": str(e)}
+    except Exception as e:
+        result = {"status": "error", "reason": repr(e)}
+    conn.send(result)
+    conn.close()
+
+
+def measure(stage, bars, workdir=DATA_DIR, trace_allocations=True, timeout=None):
+    """Runs one stage in a fresh process and returns its measurement dict."""
+    ctx = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_run_stage, args=(stage, bars, workdir, trace_allocations, child_conn))
+    proc.start()
+    child_conn.close()
+    result = None
+    if parent_conn.poll(timeout):
+        try:
+            result = parent_conn.recv()
+        except EOFError:
+            pass
+    proc.join(5 if result is None else None)
+    if proc.is_alive():
+        proc.terminate()
+        return {"status": "timeout"}
+    if result is None:
+        return {"status": "crashed", "exitcode": proc.exitcode}
+    return result
+
+
+# ==========================
+# HISTORY & BASELINE
+# ==========================
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def find_regressions(run, baseline, tolerance):
+    """Stages whose wall time or peak RSS grew by more than `tolerance` over the baseline."""
+    previous = {(r["stage"], r["bars"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in run["results"]:
+        base = previous.get((r["stage"], r["bars"]))
+        if not base or r.get("status") != "ok" or base.get("status") != "ok":
+            continue
+        for key in ("wall_s", "peak_rss_mb"):
+            old, new = base.get(key), r.get(key)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{r['stage']} @ {r['bars']:,} bars: {key} {old:.3f} -> {new:.3f} (+{(new / old - 1) * 100:.1f}%)")
+    return regressions
+
+
+def format_row(r):
+    if r.get("status") != "ok":
+        return f"{r['stage']:<32}{r['bars']:>12,}  {r['status']}: {r.get('reason', r.get('exitcode', ''))}"
+    alloc = r.get("alloc_peak_mb")
+    rss = r.get("peak_rss_mb")
+    return (
+        f"{r['stage']:<32}{r['bars']:>12,}{r['wall_s']:>12.4f}s"
+        f"{(f'{rss:.1f}' if rss is not None else '-'):>12}MB"
+        f"{(f'{alloc:.1f}' if alloc is not None else '-'):>12}MB"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SAPERA pipeline on synthetic data.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated bar counts, e.g. 10k,1M,10M")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated stage names")
+    parser.add_argument("--workdir", default=DATA_DIR, help="scratch dir for generated CSVs")
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown fraction")
+    parser.add_argument("--no-alloc", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per stage before it is killed")
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)}")
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "instruments": INSTRUMENTS,
+        "results": [],
+    }
+    print(f"{'stage':<32}{'bars':>12}{'wall':>13}{'peak RSS':>14}{'alloc peak':>14}")
+    for bars in (parse_size(s) for s in args.sizes.split(",")):
+        for stage in stages:
+            result = {"stage": stage, "bars": bars}
+            result.update(measure(stage, bars, args.workdir, not args.no_alloc, args.timeout))
+            run["results"].append(result)
+            print(format_row(result), flush=True)
+
+    history = load_json(args.history, [])
+    history.append(run)
+    save_json(args.history, history)
+
+    regressions = find_regressions(run, load_json(args.baseline, {}), args.tolerance)
+    if args.save_baseline:
+        save_json(args.baseline, run)
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print("\nRegressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
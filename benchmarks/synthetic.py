@@ -0,0 +1,65 @@
+# benchmarks/synthetic.py
+
+import zlib
+import numpy as np
+import pandas as pd
+
+INSTRUMENTS = ["EUR_USD", "USD_JPY", "GBP_USD", "AUD_USD"]
+BASE_PRICES = {"EUR_USD": 1.10, "USD_JPY": 145.0, "GBP_USD": 1.27, "AUD_USD": 0.66}
+BAR_VOLATILITY = 0.0001  # ~1 pip per M1 bar on majors
+
+
+def _seed(instrument, seed):
+    return zlib.crc32(f"{instrument}:{seed}".encode())
+
+
+def synthetic_ohlcv(bars, instrument="EUR_USD", seed=0, start="2020-01-01"):
+    """
+    Deterministic M1 OHLCV random walk for one instrument.
+    The same (bars, instrument, seed) always produces the same frame.
+    """
+    rng = np.random.default_rng(_seed(instrument, seed))
+    base = BASE_PRICES.get(instrument, 1.0)
+    log_returns = rng.normal(0.0, BAR_VOLATILITY, bars)
+    close = base * np.exp(np.cumsum(log_returns))
+    open_ = np.empty(bars)
+    open_[0] = base
+    open_[1:] = close[:-1]
+    wick = np.abs(rng.normal(0.0, BAR_VOLATILITY / 2, (2, bars))) * close
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+    volume = rng.poisson(50, bars) + 1
+    return pd.DataFrame({
+        "time": pd.date_range(start, periods=bars, freq="min"),
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+    })
+
+
+def synthetic_market(bars, instruments=INSTRUMENTS, seed=0):
+    """`bars` rows in total, split evenly across instruments, with an `instrument` column."""
+    per_instrument = max(bars // len(instruments), 1)
+    frames = []
+    for instrument in instruments:
+        df = synthetic_ohlcv(per_instrument, instrument, seed)
+        df.insert(0, "instrument", instrument)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def synthetic_trade_log(trades, seed=0):
+    """Trade log shaped like logs/trade_log.csv with closed-trade P&L filled in."""
+    rng = np.random.default_rng(_seed("trade_log", seed))
+    instruments = np.array(INSTRUMENTS)[rng.integers(0, len(INSTRUMENTS), trades)]
+    profit = np.round(rng.normal(0.5, 10.0, trades), 2)
+    return pd.DataFrame({
+        "time": pd.date_range("2020-01-01", periods=trades, freq="5min"),
+        "instrument": instruments,
+        "signal": np.where(rng.random(trades) < 0.5, "Buy", "Sell"),
+        "profit": profit,
+        "cumulative_profit": np.cumsum(profit),
+        "duration": np.round(rng.exponential(30.0, trades), 2),
+    })
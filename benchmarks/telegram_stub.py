@@ -0,0 +1,136 @@
+# benchmarks/telegram_stub.py
+"""
+Local stand-in for the Telegram Bot API (getMe and sendMessage), for testing
+notification delivery offline.
+
+Messages are recorded per chat. Like Telegram, it answers 429 with a
+retry_after when a chat gets messages faster than `min_interval`, and it can
+add latency to every call.
+
+    python -m benchmarks.telegram_stub --port 8091
+    SAPERA_TELEGRAM_URL=http://127.0.0.1:8091 python main.py
+"""
+
+import json
+import math
+import time
+import logging
+import argparse
+import threading
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MIN_INTERVAL = 1.0  # seconds between messages to one chat before 429s
+
+
+class TelegramStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, min_interval=MIN_INTERVAL, latency_ms=0.0):
+        super().__init__(address, TelegramStubHandler)
+        self.min_interval = min_interval
+        self.latency_ms = latency_ms
+        self.messages = {}  # chat_id -> [(time, text)]
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._last = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serves from a daemon thread; returns self."""
+        threading.Thread(target=self.serve_forever, name="telegram-stub", daemon=True).start()
+        return self
+
+    def accept(self, chat_id, text):
+        """Records a message, or returns the seconds the sender must wait."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._last.get(chat_id, -math.inf) + self.min_interval - now
+            if wait > 0:
+                self.rejected += 1
+                return wait
+            self._last[chat_id] = now
+            self.messages.setdefault(chat_id, []).append((time.time(), text))
+            return 0.0
+
+
+class TelegramStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):
+        logging.debug(f"telegram-stub: {fmt % args}")
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _params(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        if not body:
+            return {}
+        if "json" in (self.headers.get("Content-Type") or ""):
+            return json.loads(body)
+        return {k: v[0] for k, v in parse_qs(body).items()}
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self):
+        params = self._params()
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+        method = self.path.rstrip("/").rsplit("/", 1)[-1]
+        if method == "getMe":
+            return self._reply(200, {"ok": True, "result": {
+                "id": 1, "is_bot": True, "first_name": "SAPERA stub", "username": "sapera_stub_bot",
+                "can_join_groups": False, "can_read_all_group_messages": False, "supports_inline_queries": False,
+            }})
+        if method == "sendMessage":
+            chat_id, text = str(params.get("chat_id")), params.get("text", "")
+            wait = self.server.accept(chat_id, text)
+            if wait > 0:
+                retry_after = math.ceil(wait)
+                return self._reply(429, {"ok": False, "error_code": 429,
+                                         "description": f"Too Many Requests: retry after {retry_after}",
+                                         "parameters": {"retry_after": retry_after}})
+            chat = {"id": int(chat_id) if chat_id.lstrip("-").isdigit() else 0, "type": "private"}
+            return self._reply(200, {"ok": True, "result": {
+                "message_id": len(self.server.messages[chat_id]), "date": int(time.time()), "chat": chat, "text": text,
+            }})
+        self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+
+
+def serve(host="127.0.0.1", port=8091, min_interval=MIN_INTERVAL, latency_ms=0.0):
+    """Builds a TelegramStub (port 0 picks a free one); call .start() or .serve_forever()."""
+    return TelegramStub((host, port), min_interval, latency_ms)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Local Telegram Bot API stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--min-interval", type=float, default=MIN_INTERVAL, help="seconds between messages per chat")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.min_interval, args.latency_ms)
+    logging.info(f"Telegram stub on {server.url}; export SAPERA_TELEGRAM_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        for chat_id, messages in server.messages.items():
+            logging.info(f"chat {chat_id}: {len(messages)} messages")
@@ -11,3 +11,13 @@ FETCH_INTERVAL = 60
 
 # Mode
 USE_BACKTEST = False  # Set True for backtest, False for live trading
+HISTORICAL_DATA_FILE = "data/historical_data.csv"  # backtest data and the live-data fallback
+
+# Local LSTM inference service
+INFERENCE_HOST = "127.0.0.1"
+INFERENCE_PORT = 8765
+
+# Long-lived trading daemon (daemon.py) and its health endpoint
+CYCLE_INTERVAL = 300  # seconds between trading cycles
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8766
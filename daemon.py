@@ -0,0 +1,206 @@
+"""
+Long-lived SAPERA 2.0 trading daemon.
+
+Initializes clients, the LSTM, the account cache and the wallet session once,
+then runs main.run_cycle every CYCLE_INTERVAL seconds in-process. A small HTTP
+endpoint reports health and stats and accepts a drain request: the cycle in
+progress finishes, the session capital goes back to the wallet and the
+process exits 0. SIGTERM and Ctrl+C drain the same way.
+
+    python daemon.py
+    curl http://127.0.0.1:8766/health
+    curl -X POST http://127.0.0.1:8766/drain
+
+It exits EXIT_NO_CAPITAL if the wallet cannot fund the session, so that
+scripts/run_forever.py, which restarts it whenever it exits non-zero or
+stops reporting healthy, tries again later.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
+
+import main as trading
+from config import CYCLE_INTERVAL, DAEMON_HOST, DAEMON_PORT
+from utils.log_setup import setup_logging
+from utils.oanda_client import client_stats
+from utils.rate_limiter import rate_limit_stats
+from utils.retry import retry_stats
+
+LOG_FILE = os.path.join("logs", "sapera_daemon.log")
+HEARTBEAT = 5.0  # seconds between heartbeats while idle
+CYCLE_TIMEOUT = 600  # seconds without a heartbeat before /health reports the daemon hung
+MAX_FAILURES = 3  # consecutive failed cycles before /health reports unhealthy
+EXIT_NO_CAPITAL = 2
+
+
+class TradingDaemon:
+    def __init__(self, interval=CYCLE_INTERVAL, host=DAEMON_HOST, port=DAEMON_PORT):
+        self.interval = interval
+        self.state = "starting"
+        self.started = time.time()
+        self.components = None
+        self.cycles = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_cycle = None
+        self.next_cycle_at = None
+        self.heartbeat = time.monotonic()
+        self._drain = threading.Event()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), HealthHandler)
+        self.server.daemon_threads = True
+        self.server.owner = self
+
+    # === Lifecycle ===
+    def start(self):
+        """Serves /health, initializes every component once and opens the wallet session."""
+        threading.Thread(target=self.server.serve_forever, name="daemon-health", daemon=True).start()
+        t = time.perf_counter()
+        self.components = trading.initialize()
+        notifier, wallet = self.components[0], self.components[1]
+        if not wallet.initialize_session(trading.SESSION_CAPITAL):
+            notifier.send_message("Wallet has insufficient funds to start session.")
+            return False
+        self.state = "running"
+        host, port = self.server.server_address[:2]
+        logging.info(f"🟢 Daemon ready in {time.perf_counter() - t:.1f}s; health on http://{host}:{port}/health")
+        return True
+
+    def run(self):
+        """Runs cycles on schedule until drained; a late cycle is followed by the next slot, not a burst."""
+        next_at = time.monotonic()
+        while not self._drain.is_set():
+            self.next_cycle_at = time.time() + max(0.0, next_at - time.monotonic())
+            while not self._drain.is_set() and time.monotonic() < next_at:
+                self.heartbeat = time.monotonic()
+                self._drain.wait(min(HEARTBEAT, next_at - time.monotonic()))
+            if self._drain.is_set():
+                break
+            self.run_once()
+            next_at += self.interval
+            if next_at < time.monotonic():
+                next_at = time.monotonic() + self.interval
+
+    def run_once(self):
+        self.heartbeat = time.monotonic()
+        started, t = time.time(), time.perf_counter()
+        try:
+            ok = trading.run_cycle(*self.components)
+        except Exception as e:
+            logging.exception(f"Cycle crashed: {e}")
+            ok = False
+        duration_ms = (time.perf_counter() - t) * 1000
+        with self._lock:
+            self.cycles += 1
+            if ok:
+                self.consecutive_failures = 0
+            else:
+                self.failures += 1
+                self.consecutive_failures += 1
+            self.last_cycle = {"started": started, "duration_ms": round(duration_ms, 1), "ok": ok}
+        self.heartbeat = time.monotonic()
+        logging.info(f"Cycle {self.cycles} {'completed' if ok else 'failed'} in {duration_ms:.0f} ms")
+        return ok
+
+    def drain(self):
+        """Stops scheduling cycles; the one in progress finishes first."""
+        if not self._drain.is_set():
+            logging.info("🟡 Drain requested")
+            self.state = "draining"
+            self._drain.set()
+
+    def close(self):
+        if self.components is not None:
+            wallet, bot = self.components[1], self.components[3]
+            trading.shutdown(wallet, bot)
+        self.state = "stopped"
+        self.server.shutdown()
+        logging.info(f"🛑 Daemon stopped after {self.cycles} cycles ({self.failures} failed)")
+
+    # === Health ===
+    def health(self):
+        """(healthy, details): unhealthy when cycles keep failing or the loop has stopped beating."""
+        with self._lock:
+            heartbeat_age = time.monotonic() - self.heartbeat
+            healthy = (self.state in ("starting", "running", "draining")
+                       and self.consecutive_failures < MAX_FAILURES
+                       and heartbeat_age < CYCLE_TIMEOUT)
+            return healthy, {
+                "state": self.state,
+                "healthy": healthy,
+                "uptime_s": round(time.time() - self.started, 1),
+                "cycles": self.cycles,
+                "failures": self.failures,
+                "consecutive_failures": self.consecutive_failures,
+                "last_cycle": self.last_cycle,
+                "next_cycle_in_s": round(max(0.0, self.next_cycle_at - time.time()), 1) if self.next_cycle_at else None,
+                "heartbeat_age_s": round(heartbeat_age, 1),
+            }
+
+    def stats(self):
+        wallet = self.components[1] if self.components else None
+        return {
+            "wallet_balance": wallet.wallet_balance if wallet else None,
+            "session_balance": wallet.session_balance if wallet else None,
+            "oanda": client_stats(),
+            "rate_limits": rate_limit_stats(),
+            "retries": retry_stats(),
+        }
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    def log_message(self, fmt, *args):
+        logging.debug(f"health: {fmt % args}")
+
+    def _send(self, status, payload):
+        data = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        daemon = self.server.owner
+        if self.path == "/health":
+            healthy, details = daemon.health()
+            self._send(200 if healthy else 503, details)
+        elif self.path == "/stats":
+            self._send(200, daemon.stats())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        daemon = self.server.owner
+        if self.path == "/drain":
+            daemon.drain()
+            self._send(202, {"state": daemon.state})
+        else:
+            self._send(404, {"error": "not found"})
+
+
+def main():
+    """Runs until drained; returns the process exit code."""
+    daemon = TradingDaemon()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: daemon.drain())
+    try:
+        if not daemon.start():
+            return EXIT_NO_CAPITAL
+        daemon.run()
+        return 0
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    setup_logging(LOG_FILE, stream=sys.stdout)
+    sys.exit(main())
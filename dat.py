@@ -1,10 +1,11 @@
-import oandapyV20
 import oandapyV20.endpoints.instruments as instruments
 import pandas as pd
 from datetime import datetime, timedelta
+from config import OANDA_API_KEY
+from utils.oanda_client import get_client, client_stats
 
-# Initialize the OANDA API client
-client = oandapyV20.API(access_token="bf360920d5432b7f61bd21f12b447aa6-7326b27f0f16ffc655f5b6008326ca0a")
+# Shared OANDA API client (one keep-alive pool for every chunk request)
+client = get_client(OANDA_API_KEY)
 
 # Parameters
 instrument = "EUR_USD"
@@ -80,3 +81,4 @@ if not historical_data.empty:
     print(f"Historical data saved to {output_file}")
 else:
     print("No data fetched.")
+print(f"OANDA request stats: {client_stats()}")
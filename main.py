@@ -10,130 +10,182 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
 from agents.strategy import StrategyAnalyzer
 from agents.data_fetcher import DataFetcher
 from agents.trade_executor import EnhancedTradingBot, WalletManager
-from agents.lstm_model import LSTMModel
+from agents.order_pipeline import execute_orders
+from agents.account_cache import AccountCache
+from agents.inference_server import InferenceClient
+from agents.model_registry import ModelRegistry
+from utils.log_setup import setup_logging
+from utils.oanda_client import client_stats, close_clients
+from utils.rate_limiter import rate_limit_stats
+from utils.retry import retry_stats
 from config import (
     OANDA_API_KEY,
     OANDA_ACCOUNT_ID,
     TELEGRAM_BOT_TOKEN,
     TELEGRAM_CHAT_ID,
     USE_BACKTEST,
+    HISTORICAL_DATA_FILE,
 )
 
 # === Configuration ===
-HISTORICAL_DATA_FILE = "data/historical_data.csv"
 MODEL_PATH = "models/lstm_model.keras"
+NUMPY_WEIGHTS_PATH = "models/lstm_model_weights.npz"
 SESSION_CAPITAL = 1000
 LOOK_BACK = 50
 LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, "sapera_main.log")
 
-# === Logging Setup (Safe for Windows console) ===
-os.makedirs(LOG_DIR, exist_ok=True)
-
+# === Logging (Safe for Windows console; configured in the entry point) ===
 def safe_log(msg):
     try:
         logging.info(msg.encode("ascii", "ignore").decode())
     except Exception:
         logging.info("Logging failed")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding="utf-8"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
 # === Load Historical Data ===
+_historical = {}  # (path, mtime) -> DataFrame, so long-lived runs read the file once
+
 def load_historical_data():
     try:
-        df = pd.read_csv(HISTORICAL_DATA_FILE)
-        if df.empty:
-            raise ValueError("Historical dataset is empty.")
-        return df
+        key = (HISTORICAL_DATA_FILE, os.path.getmtime(HISTORICAL_DATA_FILE))
+        if key not in _historical:
+            df = pd.read_csv(HISTORICAL_DATA_FILE)
+            if df.empty:
+                raise ValueError("Historical dataset is empty.")
+            _historical.clear()
+            _historical[key] = df
+        return _historical[key].copy()
     except Exception as e:
-        logging.error(f"[FATAL] Could not load historical data: {e}")
-        sys.exit(1)
+        raise RuntimeError(f"Could not load historical data: {e}")
 
 # === Initialize Core Modules ===
 def initialize():
     notifier = WalletManager.TelegramNotifier(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
     wallet = WalletManager(wallet_file="wallet.json")
     strategy = StrategyAnalyzer()
-    bot = EnhancedTradingBot(wallet_manager=wallet, notifier=notifier)
+    bot = EnhancedTradingBot(wallet_manager=wallet, notifier=notifier, account_cache=start_account_cache())
     fetcher = DataFetcher(api_key=OANDA_API_KEY, account_id=OANDA_ACCOUNT_ID)
-    lstm = LSTMModel(model_path=MODEL_PATH, look_back=LOOK_BACK)
+    lstm = load_lstm()
     return notifier, wallet, strategy, bot, fetcher, lstm
 
-# === Main Execution ===
-def main():
-    notifier, wallet, strategy, bot, fetcher, lstm = initialize()
-
-    if not wallet.initialize_session(SESSION_CAPITAL):
-        notifier.send_message("Wallet has insufficient funds to start session.")
-        return
-
-    # === Load Data ===
+def start_account_cache():
+    """Live sessions keep balance and exposure in memory; backtests and offline runs go without."""
     if USE_BACKTEST:
-        safe_log("Loading historical data for backtesting...")
-        df = load_historical_data()
-    else:
-        safe_log("Fetching live market data...")
-        df = fetcher.fetch_live_data(instruments="EUR_USD,USD_JPY")
-        if df is None or df.empty or len(df) < LOOK_BACK:
-            fallback_msg = f"Live data invalid or too short (required: {LOOK_BACK}, got: {len(df)}). Falling back to historical."
-            logging.warning(fallback_msg)
-            notifier.send_message(fallback_msg)
+        return None
+    try:
+        return AccountCache().start()
+    except Exception as e:
+        logging.warning(f"Account cache unavailable, balance reads will use REST: {e}")
+        return None
+
+def load_lstm():
+    """
+    Prefer the warm inference service, then the TensorFlow-free NumPy runtime,
+    and only then load the Keras model in-process. The NumPy runtime runs the
+    active registry version's weights; the fixed NUMPY_WEIGHTS_PATH export is
+    only used while nothing has been published to the registry.
+    """
+    client = InferenceClient.connect()
+    if client is not None:
+        safe_log("Using LSTM inference server.")
+        return client
+    from agents.numpy_lstm import NumpyLSTM
+    registry = ModelRegistry()
+    version = registry.current_version()
+    if version is not None and os.path.exists(registry.weights_path(version)):
+        safe_log(f"Using NumPy LSTM runtime (model version {version}).")
+        return NumpyLSTM.from_registry(registry, version)
+    if version is None and os.path.exists(NUMPY_WEIGHTS_PATH):
+        safe_log("Using NumPy LSTM runtime.")
+        return NumpyLSTM(NUMPY_WEIGHTS_PATH)
+    from agents.lstm_model import LSTMModel
+    return LSTMModel(model_path=MODEL_PATH, look_back=LOOK_BACK, registry=registry)
+
+# === Trading Cycle ===
+def run_cycle(notifier, wallet, strategy, bot, fetcher, lstm):
+    """
+    One pass of fetch → indicators → LSTM → orders on already-initialized
+    components. Returns True if the cycle completed.
+    """
+    try:
+        # Long-lived runs pick up newly published model versions between cycles
+        if getattr(lstm, "registry", None) is not None:
+            try:
+                if lstm.refresh():
+                    safe_log(f"Switched to model version {lstm.version_id}")
+            except Exception as e:
+                logging.error(f"Model refresh failed, keeping version {lstm.version_id}: {e}")
+
+        # === Load Data ===
+        if USE_BACKTEST:
+            safe_log("Loading historical data for backtesting...")
             df = load_historical_data()
+        else:
+            safe_log("Fetching live market data...")
+            df = fetcher.fetch_live_data(instruments="EUR_USD,USD_JPY")
+            if df is None or df.empty or len(df) < LOOK_BACK:
+                fallback_msg = f"Live data invalid or too short (required: {LOOK_BACK}, got: {0 if df is None else len(df)}). Falling back to historical."
+                logging.warning(fallback_msg)
+                notifier.send_message(fallback_msg)
+                df = load_historical_data()
+
+        # Add volume column if missing
+        if "volume" not in df.columns:
+            df["volume"] = 1000
 
-    # Add volume column if missing
-    if "volume" not in df.columns:
-        df["volume"] = 1000
-
-    try:
         safe_log("Applying strategy indicators...")
         df = strategy.calculate_indicators(df)
         df = strategy.generate_signals(df)
 
         safe_log("Running LSTM price prediction...")
-        features = df[["open", "high", "low", "close", "volume"]].values
+        # One batched pass scores the window ending at every row, per instrument
+        predictions = lstm.predict_batch(df, all_windows=True)
 
-        if len(features) < LOOK_BACK:
-            msg = f"Not enough data for LSTM prediction. Required: {LOOK_BACK}, Found: {len(features)}"
+        if predictions.empty:
+            msg = f"Not enough data for LSTM prediction. Required: {LOOK_BACK} bars per instrument, Found: {len(df)} rows"
             logging.warning(msg)
             notifier.send_message(msg)
-            return
-
-        # ✅ Let the model handle reshaping internally
-        lstm_direction = lstm.predict(features)[-1]
-        lstm_label = ["Hold", "Buy", "Sell"][lstm_direction]
+            return True
 
-        safe_log(f"LSTM prediction: {lstm_label}")
+        df["lstm_label"] = predictions["label"]
+        safe_log(f"LSTM scored {len(predictions)} bars across {predictions['instrument'].nunique()} instruments")
         safe_log("Scanning strategy signals...")
 
+        orders = []
         for _, row in df.iterrows():
             signal = row.get("signal")
             if signal not in ["Buy", "Sell"]:
                 continue
 
+            # Rows without a full look-back window of their own instrument get no prediction
+            lstm_label = row["lstm_label"] if isinstance(row["lstm_label"], str) else "Hold"
             price = row["close"]
             matched = signal == lstm_label
 
             if matched:
-                bot.place_order(
+                orders.append(dict(
                     instrument=row.get("instrument", "EUR_USD"),
                     signal=signal,
                     price=price,
                     atr=row.get("ATR", 0.001),
-                    capital=SESSION_CAPITAL,
+                    capital=wallet.session_balance,
                     lstm_prediction=lstm_label,
                     correct_prediction=True,
-                )
+                ))
             else:
                 safe_log(f"Trade Rejected → {row.get('instrument', 'EUR_USD')} | Signal: {signal} | LSTM: {lstm_label}")
 
+        # Orders for different instruments go out concurrently; alerts and logging trail behind
+        if orders:
+            safe_log(f"Submitting {len(orders)} orders...")
+            _, order_stats = execute_orders(bot, orders)
+            safe_log(f"Order pipeline stats: {order_stats}")
+
         notifier.send_message("Trading session completed successfully.")
+        safe_log(f"OANDA request stats: {client_stats()}")
+        safe_log(f"OANDA rate limit waits: {rate_limit_stats()}")
+        safe_log(f"Retries and circuits: {retry_stats()}")
+        return True
 
     except Exception as e:
         logging.error(f"Fatal runtime error: {e}")
@@ -141,9 +193,33 @@ def main():
             notifier.send_message(f"Session failed: {e}")
         except Exception:
             logging.warning("Telegram notification failed.")
+        return False
+
+def shutdown(wallet, bot):
+    """Ends the session: capital back to the wallet, caches stopped, journal flushed, connections closed."""
+    wallet.close_session()
+    if bot.account_cache is not None:
+        bot.account_cache.stop()
+    bot.journal.flush()
+    close_clients()
+
+# === Main Execution ===
+def main():
+    """A single cycle; daemon.py keeps the same components warm across cycles."""
+    notifier, wallet, strategy, bot, fetcher, lstm = initialize()
+
+    try:
+        # Inside the try so the account cache threads stop even without a session
+        if not wallet.initialize_session(SESSION_CAPITAL):
+            notifier.send_message("Wallet has insufficient funds to start session.")
+            return
+        run_cycle(notifier, wallet, strategy, bot, fetcher, lstm)
+    finally:
+        shutdown(wallet, bot)
 
 # === Start Script ===
 if __name__ == "__main__":
+    setup_logging(LOG_FILE, stream=sys.stdout)
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,70 @@
+# scripts/import_profile.py
+"""
+Import-time profile of SAPERA modules, built on `python -X importtime`.
+Each module is imported in a fresh interpreter; the report shows its total
+import time and the packages that cost the most.
+
+    python scripts/import_profile.py
+    python scripts/import_profile.py main agents.strategy --top 15
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_MODULES = [
+    "main",
+    "agents.strategy",
+    "agents.data_fetcher",
+    "agents.trade_executor",
+    "agents.performance_tracker",
+    "agents.inference_server",
+    "track_trade_outcomes",
+    "backtester",
+]
+HEAVY_PACKAGES = ["tensorflow", "keras", "sklearn", "talib", "telegram", "oandapyV20", "streamlit"]
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def profile(module, python=sys.executable):
+    """Returns (total µs, {top-level package: self µs}, error or None) for importing `module`."""
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    packages = defaultdict(int)
+    total = 0
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = int(match[1]), int(match[2]), match[3], match[4]
+        packages[name.split(".")[0]] += self_us
+        if name == module:
+            total = cumulative_us
+    error = proc.stderr.strip().splitlines()[-1] if proc.returncode else None
+    return total, dict(packages), error
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-module import-time profile.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=8, help="packages listed per module")
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        total, packages, error = profile(module)
+        heavy = [p for p in HEAVY_PACKAGES if p in packages]
+        print(f"\n{module}: {total / 1000:.1f} ms" + (f"  (heavy: {', '.join(heavy)})" if heavy else ""))
+        if error:
+            print(f"  import failed: {error}")
+        for name, self_us in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {name:<28}{self_us / 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# scripts/refresh_model.py
+
+import os
+import sys
+import logging
+import argparse
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from agents.lstm_model import LSTMModel, FINE_TUNE_EPOCHS, REPLAY_RATIO, SCALER_POLICIES
+from agents.model_registry import ModelRegistry
+from config import HISTORICAL_DATA_FILE
+
+# Configuration
+HISTORICAL_DATA_PATH = HISTORICAL_DATA_FILE  # the same bars main.py trades on
+
+
+def refresh(data_path=HISTORICAL_DATA_PATH, epochs=FINE_TUNE_EPOCHS, replay_ratio=REPLAY_RATIO, scaler_policy="fixed"):
+    """Fine-tunes the active model version on bars since its cutoff and publishes it if validation holds."""
+    df = pd.read_csv(data_path)
+    if "time" not in df.columns:
+        raise ValueError(f"{data_path} needs a time column to find bars after the training cutoff.")
+    registry = ModelRegistry()
+    if registry.current_version() is None:
+        raise RuntimeError("No model version in the registry yet; run a full training first.")
+    lstm = LSTMModel(registry=registry)
+    version = lstm.fine_tune(df, epochs=epochs, replay_ratio=replay_ratio, scaler_policy=scaler_policy)
+    if version:
+        logging.info(f"Model refreshed: {lstm.metadata['fine_tune']['parent']} -> {version}")
+    else:
+        logging.info(f"Model unchanged at version {registry.current_version()}")
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daily incremental LSTM refresh.")
+    parser.add_argument("--data", default=HISTORICAL_DATA_PATH)
+    parser.add_argument("--epochs", type=int, default=FINE_TUNE_EPOCHS)
+    parser.add_argument("--replay-ratio", type=float, default=REPLAY_RATIO)
+    parser.add_argument("--scaler-policy", choices=SCALER_POLICIES, default="fixed")
+    args = parser.parse_args()
+    refresh(args.data, args.epochs, args.replay_ratio, args.scaler_policy)
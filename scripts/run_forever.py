@@ -1,47 +1,140 @@
 # scripts/run_forever.py
 
 import os
+import sys
 import time
+import socket
 import subprocess
 import logging
-from datetime import datetime
+import urllib.error
+import urllib.request
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import INFERENCE_HOST, INFERENCE_PORT, DAEMON_HOST, DAEMON_PORT
+from utils.log_setup import setup_logging
 
 # Configuration
-INTERVAL_MINUTES = 5  # How often to run main.py
-MAIN_SCRIPT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'main.py'))
+DAEMON_SCRIPT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'daemon.py'))
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PYTHON_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'venv310', 'Scripts', 'python.exe'))
+INFERENCE_MODULE = "agents.inference_server"
+INFERENCE_STARTUP_TIMEOUT = 120  # seconds to wait for TensorFlow and the model to load
+DAEMON_URL = f"http://{DAEMON_HOST}:{DAEMON_PORT}"
+CHECK_INTERVAL = 15  # seconds between health checks
+STARTUP_GRACE = 300  # seconds the daemon may take to initialize before an unreachable /health counts
+UNHEALTHY_LIMIT = 3  # failed health checks in a row before the daemon is restarted
+DRAIN_TIMEOUT = 120  # seconds a drained daemon gets to finish its cycle before it is terminated
+RESTART_BACKOFF = (5, 300)  # (base, cap) seconds between restarts after failures
+EXIT_NO_CAPITAL = 2  # daemon.py exit code when the wallet cannot fund a session
 
 # Logging
-os.makedirs("logs", exist_ok=True)
 LOG_FILE = "logs/run_forever.log"
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
-def run_main():
-    PYTHON_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'venv310', 'Scripts', 'python.exe'))
+
+inference_process = None
+
+
+def ensure_inference_server():
+    """Start the warm LSTM inference service once and restart it if it has exited."""
+    global inference_process
+    if inference_process is not None and inference_process.poll() is None:
+        return
+    if inference_process is not None:
+        logging.warning(f"⚠️ Inference server exited with code {inference_process.returncode}. Restarting.")
+    inference_process = subprocess.Popen([PYTHON_PATH, "-m", INFERENCE_MODULE], cwd=PROJECT_ROOT)
+    logging.info(f"🧠 Inference server started (pid {inference_process.pid})")
+
+    deadline = time.time() + INFERENCE_STARTUP_TIMEOUT
+    while time.time() < deadline and inference_process.poll() is None:
+        try:
+            socket.create_connection((INFERENCE_HOST, INFERENCE_PORT), timeout=1).close()
+            logging.info("🧠 Inference server ready.")
+            return
+        except OSError:
+            time.sleep(0.5)
+    logging.warning("⚠️ Inference server not ready; the daemon will load the model itself.")
+
+
+def check_health():
+    """True if the daemon reports healthy, False if it reports unhealthy, None if unreachable."""
     try:
-        logging.info("🟢 Running main.py")
-        result = subprocess.run([PYTHON_PATH, MAIN_SCRIPT_PATH], capture_output=True, text=True)
-        logging.info(f"✅ main.py completed with return code {result.returncode}")
-        if result.stdout:
-            logging.info("STDOUT:\n" + result.stdout.strip())
-        if result.stderr:
-            logging.warning("STDERR:\n" + result.stderr.strip())
-    except Exception as e:
-        logging.error(f"❌ Failed to run main.py: {e}")
+        with urllib.request.urlopen(DAEMON_URL + "/health", timeout=5) as response:
+            return response.status == 200
+    except urllib.error.HTTPError as e:
+        details = e.read().decode("utf-8", "replace")
+        logging.warning(f"⚠️ Daemon unhealthy ({e.code}): {details}")
+        return False
+    except (urllib.error.URLError, OSError):
+        return None
+
+
+def stop_daemon(process):
+    """Asks the daemon to drain (finish its cycle, release capital) and terminates it if it does not."""
+    try:
+        urllib.request.urlopen(urllib.request.Request(DAEMON_URL + "/drain", method="POST"), timeout=5).close()
+    except (urllib.error.URLError, OSError):
+        process.terminate()
+    try:
+        return process.wait(DRAIN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        logging.error(f"❌ Daemon did not drain within {DRAIN_TIMEOUT}s; killing it.")
+        process.kill()
+        return process.wait()
+
+
+def supervise(process):
+    """Waits for the daemon to exit or stop answering healthy; returns its exit code."""
+    started, failed_checks = time.time(), 0
+    while process.poll() is None:
+        time.sleep(CHECK_INTERVAL)
+        ensure_inference_server()
+        if process.poll() is not None:
+            break
+        healthy = check_health()
+        if healthy:
+            failed_checks = 0
+            continue
+        if healthy is None and time.time() - started < STARTUP_GRACE:
+            continue
+        failed_checks += 1
+        if failed_checks >= UNHEALTHY_LIMIT:
+            logging.error(f"❌ Daemon failed {failed_checks} health checks; restarting it.")
+            stop_daemon(process)
+            return 1
+    return process.returncode
 
 
 def main_loop():
-    logging.info("🔁 Starting SAPERA 2.0 auto-run loop.")
+    logging.info("🔁 Starting SAPERA 2.0 watchdog.")
+    restarts = 0
     while True:
-        run_main()
-        logging.info(f"⏳ Waiting {INTERVAL_MINUTES} minutes until next run...")
-        time.sleep(INTERVAL_MINUTES * 60)
+        ensure_inference_server()
+        process = subprocess.Popen([PYTHON_PATH, DAEMON_SCRIPT_PATH], cwd=PROJECT_ROOT)
+        logging.info(f"🟢 Trading daemon started (pid {process.pid})")
+        try:
+            started = time.time()
+            code = supervise(process)
+        except KeyboardInterrupt:
+            logging.info("🛑 Draining trading daemon...")
+            code = stop_daemon(process)
+            logging.info(f"✅ Trading daemon exited with code {code}")
+            raise
+        if code == 0:
+            logging.info("✅ Trading daemon drained and exited; watchdog stopping.")
+            return
+        restarts = 0 if time.time() - started > RESTART_BACKOFF[1] else restarts + 1
+        delay = min(RESTART_BACKOFF[1], RESTART_BACKOFF[0] * 2 ** (restarts - 1))
+        if code == EXIT_NO_CAPITAL:
+            logging.warning(f"⚠️ Wallet could not fund a session; retrying in {delay}s.")
+        else:
+            logging.warning(f"⚠️ Trading daemon exited with code {code}; restarting in {delay}s.")
+        time.sleep(delay)
 
 if __name__ == "__main__":
+    setup_logging(LOG_FILE, console=False)
     try:
         main_loop()
     except KeyboardInterrupt:
-        logging.info("🛑 Auto-run loop terminated manually.")
+        logging.info("🛑 Watchdog terminated manually.")
+    finally:
+        if inference_process is not None and inference_process.poll() is None:
+            inference_process.terminate()
@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# Modules import each other from the project root (from utils..., from agents...)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,45 @@
+# tests/test_backtester.py
+
+import numpy as np
+import pytest
+
+pytest.importorskip("talib")
+
+import backtester
+from benchmarks.synthetic import synthetic_ohlcv
+
+BARS = 4000
+# Looser than the defaults so a random walk trades often enough to compare
+CONFIG = {**backtester.Backtester.default_config(), "rsi_overbought": 55, "rsi_oversold": 45, "adx_threshold": 15}
+
+
+@pytest.fixture(scope="module")
+def data_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("backtest") / "bars.csv"
+    synthetic_ohlcv(BARS, seed=7).to_csv(path, index=False)
+    return str(path)
+
+
+def _run(data_path, chunk_size=None):
+    wallet = backtester.WalletManager(total_balance=10000)
+    wallet.allocate_balance(5000)
+    tester = backtester.Backtester(data_path=data_path, wallet_manager=wallet, config=CONFIG)
+    return tester, tester.run(chunk_size=chunk_size)
+
+
+@pytest.fixture(scope="module")
+def in_memory(data_path):
+    return _run(data_path)
+
+
+# 5 and 27 are shorter than the ADX warm-up (2 * 14 - 1 bars)
+@pytest.mark.parametrize("chunk_size", [9, 27, 333, 1000, BARS * 2])
+def test_streaming_matches_in_memory(data_path, in_memory, chunk_size):
+    expected_tester, expected = in_memory
+    tester, metrics = _run(data_path, chunk_size)
+    assert expected["Total Trades"] > 20
+    assert [t["type"] for t in tester.trades] == [t["type"] for t in expected_tester.trades]
+    assert metrics["Total Trades"] == expected["Total Trades"]
+    assert metrics["Final Balance"] == pytest.approx(expected["Final Balance"], rel=1e-12)
+    np.testing.assert_array_equal(tester.equity_curve.position, expected_tester.equity_curve.position)
+    np.testing.assert_allclose(tester.equity_curve.equity, expected_tester.equity_curve.equity, rtol=1e-12)
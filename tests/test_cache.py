@@ -0,0 +1,52 @@
+# tests/test_cache.py
+
+import time
+
+import numpy as np
+
+from utils.cache import TTLCache, array_digest
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(max_size=10, ttl=0.05)
+    cache.put("a", 1)
+    time.sleep(0.06)
+    assert cache.get("a", "gone") == "gone"
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_get_or_compute_scores_only_misses_in_one_call():
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.put("b", "B")
+    calls = []
+
+    def compute(missing):
+        calls.append(list(missing))
+        return [f"computed {i}" for i in missing]
+
+    assert cache.get_or_compute(["a", "b", "c"], compute) == ["computed 0", "B", "computed 2"]
+    assert calls == [[0, 2]]
+    assert cache.get_or_compute(["c", "a"], compute) == ["computed 2", "computed 0"]
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 3
+
+
+def test_array_digest_follows_content_not_identity():
+    window = np.arange(10.0).reshape(5, 2)
+    assert array_digest(window) == array_digest(window.copy())
+    assert array_digest(window) == array_digest(window.astype(np.float32))
+    changed = window.copy()
+    changed[-1, -1] += 1e-9
+    assert array_digest(window) != array_digest(changed)
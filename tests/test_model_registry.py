@@ -0,0 +1,110 @@
+# tests/test_model_registry.py
+
+import os
+import threading
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+from agents.model_registry import ModelRegistry, MODEL_FILE, SCALER_FILE, WEIGHTS_FILE, META_FILE, STAGING_DIR
+
+
+class FakeModel:
+    """Stands in for a Keras model: save() writes a file, and there are no LSTM layers to export."""
+    input_shape = (None, 12, 5)
+    layers = []
+
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def save(self, path):
+        if self.fail:
+            raise OSError("disk full")
+        with open(path, "w") as f:
+            f.write("model")
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path / "registry"))
+
+
+@pytest.fixture
+def scaler():
+    return MinMaxScaler().fit(np.random.default_rng(0).random((10, 5)))
+
+
+def test_publish_writes_a_complete_version_and_activates_it(registry, scaler):
+    version = registry.publish(FakeModel(), scaler, {"metrics": {"val_loss": 0.5}})
+    assert registry.current_version() == version
+    assert registry.versions() == [version]
+    for name in (MODEL_FILE, SCALER_FILE, WEIGHTS_FILE, META_FILE):
+        assert os.path.exists(os.path.join(registry.version_dir(version), name))
+    assert registry.metadata()["version"] == version
+    assert registry.metadata()["metrics"] == {"val_loss": 0.5}
+    assert os.listdir(os.path.join(registry.root, STAGING_DIR)) == []
+    assert sorted(os.listdir(registry.root)) == sorted(["CURRENT", STAGING_DIR, version])
+
+
+def test_activate_rolls_back_and_rejects_unknown_versions(registry, scaler):
+    first = registry.publish(FakeModel(), scaler, {})
+    second = registry.publish(FakeModel(), scaler, {})
+    assert registry.current_version() == second
+    registry.activate(first)
+    assert registry.current_version() == first
+    with pytest.raises(ValueError):
+        registry.activate("20000101T000000000000-000000")
+    assert registry.current_version() == first
+
+
+def test_publish_without_activation_keeps_the_current_version(registry, scaler):
+    first = registry.publish(FakeModel(), scaler, {})
+    candidate = registry.publish(FakeModel(), scaler, {}, activate=False)
+    assert registry.current_version() == first
+    assert registry.versions() == sorted([first, candidate])
+
+
+def test_failed_publish_leaves_no_trace(registry, scaler):
+    first = registry.publish(FakeModel(), scaler, {})
+    with pytest.raises(OSError):
+        registry.publish(FakeModel(fail=True), scaler, {})
+    assert registry.current_version() == first
+    assert registry.versions() == [first]
+    assert os.listdir(os.path.join(registry.root, STAGING_DIR)) == []
+
+
+def test_staged_version_is_invisible_until_committed(registry):
+    version, path = registry.stage()
+    assert registry.versions() == []
+    with pytest.raises(ValueError):
+        registry.activate(version)
+    registry.commit(version, path, {})
+    assert registry.current_version() == version
+
+
+def test_readers_never_see_a_partial_pointer(registry, scaler):
+    versions = [registry.publish(FakeModel(), scaler, {}) for _ in range(3)]
+    stop = threading.Event()
+    seen = []
+
+    def read():
+        while not stop.is_set():
+            seen.append(registry.current_version())
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for i in range(300):
+        registry.activate(versions[i % 3])
+    stop.set()
+    reader.join()
+    assert seen and set(seen) <= set(versions)
+    assert not [name for name in os.listdir(registry.root) if name.endswith(".tmp")]
+
+
+def test_prune_keeps_the_active_version(registry, scaler):
+    versions = [registry.publish(FakeModel(), scaler, {}) for _ in range(4)]
+    registry.activate(versions[0])
+    removed = registry.prune(keep=2)
+    assert removed == versions[1:2]
+    assert registry.versions() == [versions[0], *versions[2:]]
@@ -0,0 +1,166 @@
+# tests/test_numpy_lstm.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.model_registry import ModelRegistry, WEIGHTS_FILE
+from agents.numpy_lstm import NumpyLSTM, StreamingLSTM, export_weights, PARITY_ATOL, INT8_PARITY_ATOL, FEATURES
+
+LOOK_BACK = 12
+
+
+def _arrays(units=6, layers=2, seed=0, dense_bias=None):
+    """Random weights in the export format, for tests that do not need Keras."""
+    rng = np.random.default_rng(seed)
+    arrays = {
+        "look_back": np.array(LOOK_BACK),
+        "lstm_layers": np.array(layers),
+        "scaler_scale": np.full(len(FEATURES), 0.5, dtype=np.float32),
+        "scaler_min": np.full(len(FEATURES), -0.5, dtype=np.float32),
+    }
+    inputs = len(FEATURES)
+    for i in range(layers):
+        arrays[f"lstm{i}_kernel"] = rng.normal(0, 0.5, (inputs, 4 * units)).astype(np.float32)
+        arrays[f"lstm{i}_recurrent_kernel"] = rng.normal(0, 0.5, (units, 4 * units)).astype(np.float32)
+        arrays[f"lstm{i}_bias"] = rng.normal(0, 0.1, 4 * units).astype(np.float32)
+        inputs = units
+    arrays["dense_kernel"] = rng.normal(0, 1.0, (units, 3)).astype(np.float32)
+    arrays["dense_bias"] = np.zeros(3, dtype=np.float32) if dense_bias is None else np.array(dense_bias, np.float32)
+    return arrays
+
+
+def _bars(count, seed=0):
+    return 1.0 + np.random.default_rng(seed).random((count, len(FEATURES)))
+
+
+def _publish(registry, arrays):
+    version, path = registry.stage()
+    np.savez(f"{path}/{WEIGHTS_FILE}", **arrays)
+    return registry.commit(version, path, {"feature_config": {"look_back": LOOK_BACK}})
+
+
+# === Keras parity ===
+@pytest.fixture(scope="module")
+def keras_model(tmp_path_factory):
+    pytest.importorskip("tensorflow")
+    from agents.lstm_model import LSTMModel
+
+    path = str(tmp_path_factory.mktemp("model") / "lstm_model.keras")
+    lstm = LSTMModel(model_path=path, look_back=LOOK_BACK, units=8)
+    lstm.scaler.fit(_bars(100, seed=1) * 2)
+    lstm.save_model()
+    lstm.save_scaler()
+    return lstm
+
+
+@pytest.mark.parametrize("quantize, atol", [(False, PARITY_ATOL), (True, INT8_PARITY_ATOL)])
+def test_forward_matches_keras(keras_model, quantize, atol):
+    engine = NumpyLSTM(export_weights(keras_model.model_path, quantize=quantize))
+    assert engine.look_back == LOOK_BACK
+    X = np.random.default_rng(0).random((64, LOOK_BACK, len(FEATURES)), dtype=np.float32)
+    expected = keras_model.model.predict(X, verbose=0)
+    actual = engine.forward(X)
+    assert actual.shape == expected.shape == (64, 3)
+    np.testing.assert_allclose(actual, expected, atol=atol, rtol=0)
+
+
+def test_scaling_matches_keras_scaler(keras_model):
+    engine = NumpyLSTM(export_weights(keras_model.model_path))
+    bars = _bars(20, seed=2) * 2
+    np.testing.assert_allclose(engine.scale(bars), keras_model.scaler.transform(bars), atol=1e-6)
+
+
+# === Prediction cache ===
+def test_predictions_are_cached_per_window():
+    engine = NumpyLSTM(arrays=_arrays())
+    bars = _bars(LOOK_BACK + 5)
+    first = engine.predict(bars, "EUR_USD", "t1")
+    assert engine.predict(bars, "EUR_USD", "t1") == first
+    assert engine.cache.stats()["hits"] == 1
+    engine.predict(bars, "EUR_USD", "t2")  # another bar end is another window
+    engine.predict(bars[:-1], "EUR_USD", "t1")  # so is other content under the same timestamp
+    assert engine.cache.stats()["misses"] == 3
+
+    df = pd.DataFrame(bars, columns=FEATURES)
+    expected = engine.predict_batch(df, all_windows=True)
+    assert engine.predict_batch(df, all_windows=True).equals(expected)
+    assert engine.cache.stats()["hits"] == 1 + len(expected)
+
+
+def test_new_model_version_invalidates_cached_predictions(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    hold = _publish(registry, _arrays(dense_bias=[100.0, 0.0, 0.0]))
+    engine = NumpyLSTM.from_registry(registry)
+    bars = _bars(LOOK_BACK)
+    assert engine.predict(bars, "EUR_USD", "t1").tolist() == [0]
+    assert not engine.refresh()
+
+    _publish(registry, _arrays(dense_bias=[0.0, 0.0, 100.0]))
+    assert engine.refresh()
+    assert len(engine.cache) == 0
+    assert engine.predict(bars, "EUR_USD", "t1").tolist() == [2]
+
+    registry.activate(hold)  # rollback
+    assert engine.refresh()
+    assert engine.version_id == hold
+    assert engine.predict(bars, "EUR_USD", "t1").tolist() == [0]
+
+
+
+# === Streaming ===
+def _window_prediction(engine, history):
+    """Class index of a zero-state forward pass over all of `history`."""
+    return int(np.argmax(engine.forward(engine.scale(history)[None]), axis=1)[0])
+
+
+def test_streaming_warms_up_then_predicts():
+    engine = NumpyLSTM(arrays=_arrays())
+    stream = StreamingLSTM(engine)
+    bars = _bars(LOOK_BACK)
+    assert [stream.update("EUR_USD", bar) for bar in bars[:-1]] == [None] * (LOOK_BACK - 1)
+    assert stream.update("EUR_USD", bars[-1]) == _window_prediction(engine, bars)
+
+
+def test_carried_state_equals_a_forward_pass_over_every_bar_since_priming():
+    engine = NumpyLSTM(arrays=_arrays())
+    stream = StreamingLSTM(engine, resync_every=1000)
+    bars = _bars(LOOK_BACK + 20, seed=3)
+    stream.prime("EUR_USD", bars[:LOOK_BACK])
+    carried = [stream.update("EUR_USD", bar) for bar in bars[LOOK_BACK:]]
+    full = [_window_prediction(engine, bars[:end]) for end in range(LOOK_BACK + 1, len(bars) + 1)]
+    windowed = [_window_prediction(engine, bars[end - LOOK_BACK:end]) for end in range(LOOK_BACK + 1, len(bars) + 1)]
+    assert carried == full
+    assert carried != windowed  # the carried state remembers bars older than the window
+    assert stream.stats() == {"instruments": 1, "steps": 20, "resyncs": 1}
+
+
+def test_resync_rebuilds_state_from_the_latest_window():
+    engine = NumpyLSTM(arrays=_arrays())
+    stream = StreamingLSTM(engine, resync_every=3)
+    bars = _bars(LOOK_BACK + 8, seed=4)
+    stream.prime("EUR_USD", bars[:LOOK_BACK])
+    # Updates 1-3 carry state and the 4th resyncs: twice over 8 bars, plus the priming pass
+    for step, end in enumerate(range(LOOK_BACK + 1, len(bars) + 1), start=1):
+        prediction = stream.update("EUR_USD", bars[end - 1])
+        if step % 4 == 0:
+            assert prediction == _window_prediction(engine, bars[end - LOOK_BACK:end])
+    assert stream.stats() == {"instruments": 1, "steps": 6, "resyncs": 3}
+
+
+def test_repeated_bar_is_not_stepped_twice():
+    stream = StreamingLSTM(NumpyLSTM(arrays=_arrays()))
+    bars = _bars(LOOK_BACK + 1, seed=5)
+    stream.prime("EUR_USD", bars[:LOOK_BACK])
+    first = stream.update("EUR_USD", bars[-1], timestamp="t1")
+    assert stream.update("EUR_USD", bars[-1], timestamp="t1") == first
+    assert stream.stats()["steps"] == 1
+
+
+def test_instruments_stream_independently():
+    engine = NumpyLSTM(arrays=_arrays())
+    together, apart = StreamingLSTM(engine), StreamingLSTM(engine)
+    eur, jpy = _bars(LOOK_BACK + 4, seed=6), _bars(LOOK_BACK + 4, seed=7)
+    for i in range(len(eur)):
+        batch = together.update_batch({"EUR_USD": eur[i], "USD_JPY": jpy[i]})
+        assert batch == {"EUR_USD": apart.update("EUR_USD", eur[i]), "USD_JPY": apart.update("USD_JPY", jpy[i])}
@@ -0,0 +1,106 @@
+# tests/test_order_pipeline.py
+
+import time
+import threading
+
+from agents.order_pipeline import execute_orders
+
+
+class OrderRejected(Exception):
+    """A 4xx OANDA error: retrying cannot help."""
+    code = 400
+
+
+class FakeBot:
+    """
+    The EnhancedTradingBot surface the pipeline uses. submit_order blocks for
+    `latency` seconds and records submission order and concurrency; `failures`
+    maps client IDs to errors raised on their first attempts.
+    """
+    def __init__(self, latency=0.01, failures=None):
+        self.latency = latency
+        self.failures = failures or {}
+        self.submitted = []
+        self.fills = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def prepare_order(self, instrument, signal, seq=None, **_):
+        if signal == "Hold":
+            return None
+        return {"client_trade_id": f"{instrument}-{seq}", "instrument": instrument}
+
+    def submit_order(self, ticket):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.submitted.append(ticket["client_trade_id"])
+        try:
+            time.sleep(self.latency)
+            errors = self.failures.get(ticket["client_trade_id"])
+            if errors:
+                raise errors.pop(0)
+            return {"orderFillTransaction": {"id": ticket["client_trade_id"]}}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def record_fill(self, ticket):
+        self.fills.append(ticket["client_trade_id"])
+
+
+def _orders(instruments, per_instrument):
+    # Interleaved, as a cycle emits them
+    return [dict(instrument=i, signal="Buy", seq=n) for n in range(per_instrument) for i in instruments]
+
+
+def test_orders_keep_their_order_per_instrument():
+    bot = FakeBot()
+    instruments = ["EUR_USD", "USD_JPY", "GBP_USD"]
+    results, stats = execute_orders(bot, _orders(instruments, 8), max_in_flight=3)
+    assert [r["client_trade_id"] for r in results] == [f"{i}-{n}" for n in range(8) for i in instruments]
+    assert all(r["status"] == "filled" and r["attempts"] == 1 for r in results)
+    for instrument in instruments:
+        assert [c for c in bot.submitted if c.startswith(instrument)] == [f"{instrument}-{n}" for n in range(8)]
+    assert sorted(bot.fills) == sorted(bot.submitted)
+    assert stats["filled"] == 24 and stats["instruments"] == 3
+
+
+def test_in_flight_requests_are_bounded():
+    bot = FakeBot(latency=0.02)
+    execute_orders(bot, _orders([f"I{n}" for n in range(6)], 3), max_in_flight=2)
+    assert bot.max_in_flight == 2
+    assert len(bot.submitted) == 18
+
+
+def test_instruments_are_submitted_concurrently():
+    bot = FakeBot(latency=0.05)
+    start = time.perf_counter()
+    execute_orders(bot, _orders([f"I{n}" for n in range(4)], 2), max_in_flight=4)
+    assert time.perf_counter() - start < 0.05 * 8 / 2
+    assert bot.max_in_flight == 4
+
+
+def test_retryable_errors_are_retried_and_rejections_are_not():
+    bot = FakeBot(failures={"EUR_USD-0": [ConnectionError("reset")], "USD_JPY-0": [OrderRejected("bad units")]})
+    results, stats = execute_orders(bot, _orders(["EUR_USD", "USD_JPY"], 1), base_delay=0.001)
+    assert (results[0]["status"], results[0]["attempts"]) == ("filled", 2)
+    assert (results[1]["status"], results[1]["attempts"]) == ("failed", 1)
+    assert stats["retries"] == 1 and stats["failed"] == 1
+
+
+def test_backoff_does_not_hold_an_in_flight_slot():
+    # One slot: while EUR_USD backs off for ~0.3 s, USD_JPY must still go out
+    bot = FakeBot(latency=0.001, failures={"EUR_USD-0": [ConnectionError("reset")]})
+    orders = [dict(instrument="EUR_USD", signal="Buy", seq=0), dict(instrument="USD_JPY", signal="Buy", seq=0)]
+    results, _ = execute_orders(bot, orders, max_in_flight=1, base_delay=0.3, max_delay=0.3)
+    assert bot.submitted.index("USD_JPY-0") < bot.submitted.index("EUR_USD-0", 1)
+    assert results[1]["queued_ms"] < 100
+
+
+def test_orders_without_a_trade_are_skipped():
+    bot = FakeBot()
+    results, stats = execute_orders(bot, [dict(instrument="EUR_USD", signal="Hold")])
+    assert results[0]["status"] == "skipped"
+    assert bot.submitted == [] and stats["skipped"] == 1
@@ -0,0 +1,116 @@
+# tests/test_rate_limiter.py
+
+import time
+import types
+import multiprocessing
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import RateLimiter, HIGH
+
+# Slow enough refills that a wait is measurable, fast enough to keep the tests short
+BUCKETS = {"global": (20.0, 10.0), "orders": (20.0, 5.0), "pricing": (2.0, 8.0)}
+INSTANT = 0.005  # seconds; an acquire below this did not wait for a refill
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return str(tmp_path / "ratelimit")
+
+
+@pytest.fixture
+def limiter(state_file):
+    limiter = RateLimiter(path=state_file, buckets=BUCKETS, reserve=3)
+    yield limiter
+    limiter.close()
+
+
+def _acquire(state_file, name, count):
+    limiter = RateLimiter(path=state_file, buckets=BUCKETS, reserve=3)
+    for _ in range(count):
+        limiter.acquire(name)
+    limiter.close()
+
+
+def test_burst_passes_then_requests_wait_for_refill(limiter):
+    assert all(limiter.acquire("orders") < INSTANT for _ in range(5))
+    waited = limiter.acquire("orders")
+    assert 0.03 < waited < 0.2  # one token at 20/s
+    waits = limiter.stats()["waits"]["orders"]
+    assert (waits["requests"], waits["waited"]) == (6, 1)
+
+
+def test_low_priority_leaves_the_reserve_to_orders(limiter):
+    # Polling (low priority by default) may use 10 - 3 global tokens without waiting
+    assert all(limiter.acquire("pricing") < INSTANT for _ in range(7))
+    # Orders (high priority by default) still go out at once from the reserve
+    assert all(limiter.acquire("orders") < INSTANT for _ in range(3))
+    # Global is empty: polling now waits for 1 + 3 reserved tokens, an order for 1
+    assert limiter.acquire("pricing") > 0.15
+    assert limiter.acquire("orders", priority=HIGH) < 0.1
+
+
+def test_instances_share_one_budget(state_file, limiter):
+    other = RateLimiter(path=state_file, buckets=BUCKETS, reserve=3)
+    try:
+        for _ in range(5):
+            other.acquire("orders")
+        assert limiter.levels()["orders"] < 1
+        assert limiter.acquire("orders") > 0.02
+    finally:
+        other.close()
+
+
+def test_processes_share_one_budget(state_file, limiter):
+    child = multiprocessing.Process(target=_acquire, args=(state_file, "pricing", 6))
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    assert limiter.levels()["pricing"] < 3
+    assert limiter.levels()["global"] < 10
+
+
+def test_changed_buckets_reset_the_shared_state(state_file, limiter):
+    limiter.acquire("orders")
+    resized = RateLimiter(path=state_file, buckets={**BUCKETS, "transactions": (10.0, 10.0)})
+    try:
+        assert resized.levels()["orders"] == 5.0
+    finally:
+        resized.close()
+
+
+def test_state_written_before_a_reboot_counts_as_a_full_bucket(state_file, monkeypatch):
+    # The monotonic clock restarts at boot, so state from before it looks like it is from the future
+    before_reboot = types.SimpleNamespace(monotonic=lambda: time.monotonic() + 3600, sleep=time.sleep)
+    monkeypatch.setattr(rate_limiter, "time", before_reboot)
+    _acquire(state_file, "orders", 5)
+    monkeypatch.undo()
+
+    limiter = RateLimiter(path=state_file, buckets=BUCKETS, reserve=3)
+    try:
+        assert limiter.levels()["orders"] == 5.0
+        assert limiter.acquire("orders") < INSTANT
+    finally:
+        limiter.close()
+
+
+def test_bucket_for_endpoint_modules():
+    def endpoint(module):
+        return type("Endpoint", (), {"__module__": f"oandapyV20.endpoints.{module}"})()
+
+    assert RateLimiter.bucket_for(endpoint("orders")) == "orders"
+    assert RateLimiter.bucket_for(endpoint("positions")) == "orders"
+    assert RateLimiter.bucket_for(endpoint("instruments")) == "pricing"
+    assert RateLimiter.bucket_for(endpoint("accounts")) == "transactions"
+    assert RateLimiter.bucket_for(endpoint("forexlabs")) == "transactions"
+
+
+def test_wait_histogram(limiter):
+    for _ in range(6):
+        limiter.acquire("orders")
+    waits = limiter.stats()["waits"]["orders"]
+    assert waits["requests"] == 6
+    assert waits["histogram"]["0ms"] == 5
+    assert waits["histogram"]["<=100ms"] == 1
+    assert 30 < waits["max_wait_ms"] <= 100
@@ -0,0 +1,139 @@
+# tests/test_retry.py
+
+import time
+import asyncio
+
+import pytest
+
+from utils.retry import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, retry, metrics, CLOSED, OPEN, HALF_OPEN,
+)
+
+
+class Flaky:
+    """Fails `failures` times with `error`, then returns "ok"."""
+    def __init__(self, failures, error=ConnectionError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error(f"failure {self.calls}")
+        return "ok"
+
+
+def _trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_threshold_and_sheds_calls():
+    breaker = CircuitBreaker("test.open", failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # consecutive failures only
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as raised:
+        breaker.before_call()
+    assert 0 < raised.value.retry_after <= 60
+    assert metrics.snapshot()["test.open"]["circuit_opened"] == 1
+    assert metrics.snapshot()["test.open"]["short_circuited"] == 1
+
+
+def test_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker("test.close", failure_threshold=2, reset_timeout=0.05)
+    _trip(breaker)
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_half_open_probe_reopens_on_failure():
+    breaker = CircuitBreaker("test.reopen", failure_threshold=2, reset_timeout=0.05)
+    _trip(breaker)
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_policy_retries_until_success():
+    fn = Flaky(2)
+    retries = []
+    policy = RetryPolicy("test.success", attempts=3, base=0.001, cap=0.001)
+    assert policy.run(fn, on_retry=lambda attempt, error, delay: retries.append(attempt)) == "ok"
+    assert fn.calls == 3
+    assert retries == [1, 2]
+    counts = metrics.snapshot()["test.success"]
+    assert (counts["calls"], counts["attempts"], counts["retries"], counts["successes"]) == (1, 3, 2, 1)
+
+
+def test_policy_gives_up_after_attempts():
+    fn = Flaky(5)
+    with pytest.raises(ConnectionError):
+        RetryPolicy("test.exhausted", attempts=3, base=0.001, cap=0.001).run(fn)
+    assert fn.calls == 3
+
+
+def test_policy_raises_non_retryable_errors_at_once():
+    fn = Flaky(1, error=ValueError)
+    policy = RetryPolicy("test.fatal", attempts=5, base=0.001, retryable=lambda e: not isinstance(e, ValueError))
+    with pytest.raises(ValueError):
+        policy.run(fn)
+    assert fn.calls == 1
+
+
+def test_open_circuit_is_not_retried():
+    def shed():
+        raise CircuitOpenError("x", 1.0)
+    with pytest.raises(CircuitOpenError):
+        RetryPolicy("test.shed", attempts=5, base=0.001).run(shed)
+    assert metrics.snapshot()["test.shed"]["attempts"] == 1
+
+
+def test_deadline_stops_retries():
+    fn = Flaky(10)
+    policy = RetryPolicy("test.deadline", attempts=10, base=0.05, cap=0.05, factor=1, deadline=0.12)
+    start = time.monotonic()
+    with pytest.raises(ConnectionError):
+        policy.run(fn)
+    assert time.monotonic() - start < 0.2
+    assert fn.calls < 10
+    assert metrics.snapshot()["test.deadline"]["deadline_exceeded"] == 1
+
+
+def test_policy_needs_an_attempt():
+    with pytest.raises(ValueError):
+        RetryPolicy("test.zero", attempts=0)
+
+
+def test_async_policy():
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) < 2:
+            raise ConnectionError("once")
+        return "ok"
+
+    assert asyncio.run(RetryPolicy("test.async", attempts=3, base=0.001).arun(fn)) == "ok"
+    assert len(calls) == 2
+
+
+def test_retry_falls_back_to_on_fail():
+    assert retry(Flaky(5), retries=2, delay=0.001, on_fail=lambda: "fallback") == "fallback"
+    assert retry(Flaky(1), retries=2, delay=0.001) == "ok"
@@ -0,0 +1,99 @@
+# tests/test_telegram_queue.py
+
+import time
+import asyncio
+import threading
+
+from utils.telegram_queue import TelegramQueue
+
+
+class RetryAfter(Exception):
+    """Shaped like telegram.error.RetryAfter: throttled, try again in `retry_after` seconds."""
+    def __init__(self, seconds):
+        super().__init__(f"Flood control exceeded. Retry in {seconds} seconds")
+        self.retry_after = seconds
+
+
+class FakeBot:
+    """Async stand-in for telegram.Bot; `errors` are raised by the first send attempts."""
+    def __init__(self, latency=0.0, errors=None):
+        self.latency = latency
+        self.errors = list(errors or [])
+        self.sent = []
+        self.attempts = []
+        self.release = threading.Event()
+        self.release.set()
+        self.sending = threading.Event()
+
+    async def send_message(self, chat_id, text):
+        self.attempts.append(time.monotonic())
+        self.sending.set()
+        while not self.release.is_set():
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(self.latency)
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(text)
+
+
+def _queue(bot, **kwargs):
+    return TelegramQueue("token", "chat", bot=bot, **{"window": 0.05, "min_interval": 0.0, **kwargs})
+
+
+def test_send_does_not_wait_for_telegram():
+    bot = FakeBot(latency=0.5)
+    queue = _queue(bot)
+    start = time.perf_counter()
+    for i in range(50):
+        queue.send(f"alert {i}")
+    assert time.perf_counter() - start < 0.05
+    queue.close()
+    assert queue.stats()["queued"] == 50
+
+
+def test_burst_goes_out_as_one_digest():
+    bot = FakeBot()
+    queue = _queue(bot, window=0.2)
+    for i in range(5):
+        queue.send(f"alert {i}")
+    queue.close()
+    assert len(bot.sent) == 1
+    assert bot.sent[0].startswith("📬 5 updates")
+    assert all(f"alert {i}" in bot.sent[0] for i in range(5))
+    assert queue.stats() == {"queued": 5, "dropped": 0, "sent": 1, "digests": 1, "failed": 0, "pending": 0}
+
+
+def test_overflow_drops_the_oldest_and_says_so():
+    bot = FakeBot()
+    bot.release.clear()
+    queue = _queue(bot, queue_size=3)
+    queue.send("first")
+    assert bot.sending.wait(2)  # the worker is now stuck delivering "first"
+    for i in range(10):
+        queue.send(f"alert {i}")
+    time.sleep(0.05)
+    bot.release.set()
+    queue.close()
+    assert bot.sent[0] == "first"
+    assert bot.sent[1].startswith("📬 3 updates (7 older dropped)")
+    assert "alert 6" not in bot.sent[1] and all(f"alert {i}" in bot.sent[1] for i in (7, 8, 9))
+    assert queue.stats()["dropped"] == 7
+
+
+def test_retry_after_pauses_delivery_without_failing():
+    bot = FakeBot(errors=[RetryAfter(0.2)])
+    queue = _queue(bot)
+    queue.send("alert")
+    queue.close()
+    assert bot.sent == ["alert"]
+    assert bot.attempts[1] - bot.attempts[0] >= 0.2
+    assert (queue.stats()["sent"], queue.stats()["failed"]) == (1, 0)
+
+
+def test_other_errors_count_as_failures():
+    bot = FakeBot(errors=[ConnectionError("down")] * 3)
+    queue = _queue(bot)
+    queue.send("alert")
+    queue.close()
+    assert bot.sent == [] and len(bot.attempts) == 3
+    assert (queue.stats()["sent"], queue.stats()["failed"]) == (0, 1)
@@ -0,0 +1,152 @@
+# tests/test_trade_journal.py
+
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+from utils.trade_journal import TradeJournal
+
+
+def _entry(client_trade_id, instrument="EUR_USD", profit=0.0, time="2025-01-02T10:00:00"):
+    return {
+        "time": time, "client_trade_id": client_trade_id, "instrument": instrument, "signal": "Buy",
+        "price": 1.05, "stop_loss": 1.04, "take_profit": 1.07, "trade_size": 1000,
+        "lstm_prediction": "Buy", "correct_prediction": True, "profit": profit, "duration": 0,
+    }
+
+
+def _outcome(client_trade_id, trade_id, profit, minutes=30):
+    return {
+        "client_trade_id": client_trade_id, "trade_id": trade_id, "instrument": "EUR_USD", "profit": profit,
+        "open_time": "2025-01-02T10:00:00Z", "close_time": f"2025-01-02T10:{minutes:02d}:00Z",
+    }
+
+
+def _append_rows(path, prefix, count):
+    journal = TradeJournal(path)
+    for i in range(count):
+        journal.append(_entry(f"{prefix}-{i}"))
+    journal.close()
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = TradeJournal(str(tmp_path / "journal.db"))
+    yield journal
+    journal.close()
+
+
+def test_appended_rows_are_loaded_in_order(journal):
+    for i in range(5):
+        journal.append(_entry(f"c{i}", profit=float(i)))
+    assert journal.flush(timeout=5)
+    df = journal.load()
+    assert list(df["client_trade_id"]) == [f"c{i}" for i in range(5)]
+    assert list(df["cumulative_profit"]) == [0.0, 1.0, 3.0, 6.0, 10.0]
+    assert df["correct_prediction"].dtype == bool
+    assert len(journal) == 5
+    assert list(journal.load(limit=2)["client_trade_id"]) == ["c3", "c4"]
+
+
+def test_outcomes_close_the_oldest_open_row_for_their_client_id(journal):
+    journal.append(_entry("dup"))
+    journal.append(_entry("dup"))
+    journal.append(_entry("other"))
+    journal.flush(timeout=5)
+
+    matched = journal.apply_outcomes([
+        _outcome("dup", "T1", 12.345, minutes=30),
+        _outcome("missing", "T9", 1.0),
+        {"client_trade_id": None, "trade_id": "T0", "profit": 5.0},
+    ])
+    assert len(matched) == 1
+    df = journal.load(columns=["client_trade_id", "profit", "duration"], status="closed")
+    assert list(df["client_trade_id"]) == ["dup"]
+    assert df["profit"].iloc[0] == 12.35
+    assert df["duration"].iloc[0] == 30.0
+    first_closed = df.index[0]
+
+    journal.apply_outcomes([_outcome("dup", "T2", -3.0)])
+    closed = journal.load(columns=["client_trade_id", "profit"], status="closed")
+    assert len(closed) == 2
+    assert closed.index[0] == first_closed
+    assert list(journal.load(columns=["client_trade_id"], status="open")["client_trade_id"]) == ["other"]
+
+    summary = journal.summary()
+    assert summary["total_trades"] == 3
+    assert summary["open_trades"] == 1
+    assert summary["winning_trades"] == 1
+    assert summary["net_profit"] == pytest.approx(9.35)
+
+
+def test_outcomes_match_client_ids_exactly(journal):
+    journal.append(_entry("abc"))
+    journal.append(_entry("abc-1"))
+    journal.append(_entry("ABC"))
+    journal.flush(timeout=5)
+    # A manual trade on the same instrument and size, and a close with no client ID, match nothing
+    matched = journal.apply_outcomes([
+        _outcome("manual-7", "T7", 50.0),
+        {"client_trade_id": None, "trade_id": "T8", "instrument": "EUR_USD", "profit": 60.0},
+        _outcome("abc-1", "T1", 4.0),
+    ])
+    df = journal.load(columns=["client_trade_id", "profit", "broker_trade_id"])
+    assert [o["trade_id"] for o in matched.values()] == ["T1"]
+    assert df.set_index("client_trade_id")["profit"].to_dict() == {"abc": 0.0, "abc-1": 4.0, "ABC": 0.0}
+    assert df.set_index("client_trade_id")["broker_trade_id"].to_dict()["abc-1"] == "T1"
+
+
+def test_many_outcomes_land_on_their_own_rows(journal):
+    ids = [f"c{i}" for i in range(500)]
+    for client_id in ids:
+        journal.append(_entry(client_id))
+    journal.flush(timeout=5)
+    outcomes = [_outcome(client_id, f"T{i}", float(i)) for i, client_id in enumerate(ids)]
+    matched = journal.apply_outcomes(outcomes[::-1])
+    assert len(matched) == 500
+    df = journal.load(columns=["client_trade_id", "profit"])
+    assert df["profit"].tolist() == [float(i) for i in range(500)]
+    assert journal.summary()["open_trades"] == 0
+
+
+def test_legacy_csv_is_imported_once(tmp_path):
+    legacy = tmp_path / "trade_log.csv"
+    pd.DataFrame([_entry("a", profit=2.0), _entry("b")]).to_csv(legacy, index=False)
+    path = str(tmp_path / "journal.db")
+    TradeJournal(path).close()
+    journal = TradeJournal(path)
+    df = journal.load()
+    assert list(df["client_trade_id"]) == ["a", "b"]
+    assert journal.summary()["open_trades"] == 1
+    journal.close()
+
+
+def test_blank_legacy_cells_do_not_block_the_import(tmp_path):
+    legacy = tmp_path / "trade_log.csv"
+    rows = [_entry("a", profit=2.0), _entry("b")]
+    rows[1].update(profit=None, duration=None, correct_prediction=None)
+    pd.DataFrame(rows).to_csv(legacy, index=False)
+    journal = TradeJournal(str(tmp_path / "journal.db"))
+    df = journal.load()
+    assert df["profit"].tolist() == [2.0, 0.0]
+    assert df["duration"].tolist() == [0.0, 0.0]
+    assert journal.summary()["open_trades"] == 1
+    journal.close()
+
+
+def test_processes_append_to_one_journal(tmp_path):
+    path = str(tmp_path / "journal.db")
+    TradeJournal(path).close()
+    writers = [multiprocessing.Process(target=_append_rows, args=(path, f"p{n}", 200)) for n in range(3)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+        assert writer.exitcode == 0
+
+    journal = TradeJournal(path)
+    df = journal.load(columns=["client_trade_id"])
+    assert len(df) == 600
+    assert df["client_trade_id"].is_unique
+    journal.close()
@@ -0,0 +1,126 @@
+# tests/test_transaction_sync.py
+
+import pytest
+
+pytest.importorskip("oandapyV20")
+
+from agents import trade_tracker
+from utils.transaction_sync import TransactionSync
+
+
+class FakeOanda:
+    """Serves TransactionsSinceID from an in-memory history, `page_size` transactions at a time."""
+    def __init__(self, page_size=2):
+        self.page_size = page_size
+        self.history = []
+        self.since = []
+
+    def add(self, **tx):
+        tx["id"] = str(len(self.history) + 1)
+        tx.setdefault("time", f"2025-01-02T10:{len(self.history):02d}:00Z")
+        self.history.append(tx)
+        return tx["id"]
+
+    def open(self, trade_id, client_id, units=1000):
+        return self.add(type="ORDER_FILL", instrument="EUR_USD", clientOrderID=client_id,
+                        tradeOpened={"tradeID": trade_id, "units": str(units)})
+
+    def close(self, trade_id, pl):
+        return self.add(type="ORDER_FILL", instrument="EUR_USD",
+                        tradesClosed=[{"tradeID": trade_id, "units": "-1000", "realizedPL": str(pl)}])
+
+    def request(self, endpoint):
+        since = int(endpoint.params["id"])
+        self.since.append(since)
+        page = [tx for tx in self.history if int(tx["id"]) > since][:self.page_size]
+        return {"transactions": page, "lastTransactionID": str(len(self.history))}
+
+
+@pytest.fixture
+def oanda():
+    return FakeOanda()
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "sync_state.json")
+
+
+def test_fetch_pages_from_the_last_processed_id(oanda, state_path):
+    for i in range(5):
+        oanda.add(type="DAILY_FINANCING")
+    sync = TransactionSync(oanda, "acct", state_path)
+    fetched, last = sync.fetch()
+    assert [tx["id"] for tx in fetched] == ["1", "2", "3", "4", "5"]
+    assert last == "5"
+    assert oanda.since == [0, 2, 4]
+
+    sync.poll()
+    sync.commit()
+    oanda.since.clear()
+    assert sync.poll() == []
+    assert oanda.since == [5]  # a quiet cycle is one request
+
+
+def test_closes_are_matched_to_the_fill_that_opened_them(oanda, state_path):
+    oanda.open("T1", "client-1")
+    oanda.add(type="ORDER_FILL", instrument="EUR_USD", tradeReduced={"tradeID": "T1", "realizedPL": "2.5"})
+    oanda.add(type="DAILY_FINANCING")
+    oanda.close("T1", 7.5)
+    oanda.close("T0", -1.0)  # opened before the synced history began
+    outcomes = TransactionSync(oanda, "acct", state_path).poll()
+    assert outcomes == [
+        {"trade_id": "T1", "client_trade_id": "client-1", "instrument": "EUR_USD", "units": 1000, "profit": 10.0,
+         "open_time": "2025-01-02T10:00:00Z", "close_time": "2025-01-02T10:03:00Z"},
+        {"trade_id": "T0", "client_trade_id": None, "instrument": "EUR_USD", "units": 1000, "profit": -1.0,
+         "open_time": None, "close_time": "2025-01-02T10:04:00Z"},
+    ]
+
+
+def test_nothing_is_persisted_until_commit(oanda, state_path):
+    oanda.open("T1", "client-1")
+    oanda.close("T1", 3.0)
+    assert len(TransactionSync(oanda, "acct", state_path).poll()) == 1
+    # Not committed: a restarted sync sees the same close again
+    sync = TransactionSync(oanda, "acct", state_path)
+    assert [o["trade_id"] for o in sync.poll()] == ["T1"]
+    sync.commit()
+    assert TransactionSync(oanda, "acct", state_path).last_transaction_id == "2"
+    assert TransactionSync(oanda, "acct", state_path).poll() == []
+
+
+def test_open_trades_survive_a_restart_between_open_and_close(oanda, state_path):
+    oanda.open("T1", "client-1")
+    sync = TransactionSync(oanda, "acct", state_path)
+    assert sync.poll() == []
+    sync.commit()
+    oanda.close("T1", 4.0)
+    outcomes = TransactionSync(oanda, "acct", state_path).poll()
+    assert [(o["client_trade_id"], o["profit"]) for o in outcomes] == [("client-1", 4.0)]
+
+
+def test_tracker_commits_only_after_the_journal_applied_outcomes(oanda, state_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(trade_tracker, "get_client", lambda key: oanda)
+    tracker = trade_tracker.TradeOutcomeTracker(str(tmp_path / "journal.db"), state_path)
+    tracker.journal.append({
+        "time": "2025-01-02T10:00:00", "client_trade_id": "client-1", "instrument": "EUR_USD", "signal": "Buy",
+        "price": 1.05, "stop_loss": 1.04, "take_profit": 1.07, "trade_size": 1000,
+        "lstm_prediction": "Buy", "correct_prediction": True, "profit": 0.0, "duration": 0,
+    })
+    tracker.journal.flush(timeout=5)
+    oanda.open("T1", "client-1")
+    oanda.close("T1", 6.0)
+
+    def unavailable(outcomes):
+        raise RuntimeError("database is locked")
+
+    apply_outcomes = tracker.journal.apply_outcomes
+    monkeypatch.setattr(tracker.journal, "apply_outcomes", unavailable)
+    tracker.update_trade_log()
+    assert TransactionSync(oanda, "acct", state_path).last_transaction_id == "0"
+
+    monkeypatch.setattr(tracker.journal, "apply_outcomes", apply_outcomes)
+    tracker.update_trade_log()
+    assert TransactionSync(oanda, "acct", state_path).last_transaction_id == "2"
+    assert tracker.journal.load()["profit"].tolist() == [6.0]
+    tracker.journal.close()
@@ -0,0 +1,131 @@
+# tests/test_wallet_ledger.py
+
+import os
+import json
+import multiprocessing
+
+import pytest
+
+from utils.wallet_ledger import WalletLedger, current_balance, ledger_path
+
+
+@pytest.fixture
+def wallet_file(tmp_path):
+    return str(tmp_path / "wallet.json")
+
+
+def _open(wallet_file, **kwargs):
+    return WalletLedger(wallet_file, commit_interval=0.001, **kwargs)
+
+
+def _crash_after_events(wallet_file, allocations):
+    """Child process: allocate and exit without close(), as if killed."""
+    ledger = _open(wallet_file)
+    for amount in allocations:
+        ledger.allocate(amount)
+    os._exit(0)
+
+
+def _allocate_and_release(wallet_file, rounds):
+    ledger = _open(wallet_file)
+    for _ in range(rounds):
+        if ledger.allocate(10):
+            ledger.release(10, pnl=1.0)
+    ledger.close()
+
+
+def test_first_run_opens_with_initial_balance(wallet_file):
+    ledger = _open(wallet_file, initial_balance=500)
+    assert ledger.balance == 500
+    ledger.close()
+    assert json.load(open(wallet_file))["wallet_balance"] == 500
+
+
+def test_first_run_migrates_legacy_wallet_json(wallet_file):
+    with open(wallet_file, "w") as f:
+        json.dump({"wallet_balance": 1234.5}, f)
+    ledger = _open(wallet_file, initial_balance=500)
+    assert ledger.balance == 1234.5
+    ledger.close()
+
+
+def test_allocate_release_and_adjust(wallet_file):
+    ledger = _open(wallet_file, initial_balance=1000)
+    assert ledger.allocate(400)
+    assert ledger.balance == 600
+    assert not ledger.allocate(601)
+    assert not ledger.allocate(0)
+    assert ledger.release(400, pnl=-25.5) == 974.5
+    assert ledger.adjust(0.5) == 975.0
+    assert [e["type"] for e in ledger.history()] == ["open", "allocate", "release", "pnl"]
+    ledger.close()
+
+
+def test_repeated_float_events_do_not_drift(wallet_file):
+    ledger = _open(wallet_file, initial_balance=0.3)
+    for _ in range(1000):
+        ledger.adjust(0.1)
+        ledger.adjust(-0.1)
+    assert ledger.allocate(0.3)
+    ledger.close()
+
+
+def test_reopen_replays_events_after_snapshot(wallet_file):
+    ledger = _open(wallet_file, initial_balance=1000, snapshot_every=3)
+    for _ in range(5):
+        ledger.allocate(10)
+    ledger.flush()
+    expected = ledger.balance
+    ledger.close()
+    reopened = _open(wallet_file)
+    assert reopened.balance == expected == 950
+    assert reopened.seq == 6
+    reopened.close()
+
+
+def test_recovers_after_crash_and_drops_torn_event(wallet_file):
+    _open(wallet_file, initial_balance=1000).close()
+    child = multiprocessing.Process(target=_crash_after_events, args=(wallet_file, [100, 50]))
+    child.start()
+    child.join()
+    with open(ledger_path(wallet_file), "ab") as f:
+        f.write(b'deadbeef {"seq":99,"bal')  # a write cut short by the crash
+    assert current_balance(wallet_file) == 850
+
+    ledger = _open(wallet_file)
+    assert ledger.balance == 850
+    assert ledger.allocate(50)
+    ledger.close()
+    assert [e["seq"] for e in ledger.history()] == [1, 2, 3, 4]
+    assert current_balance(wallet_file) == 800
+
+
+def test_corruption_before_the_last_event_is_an_error(wallet_file):
+    ledger = _open(wallet_file, initial_balance=1000)
+    ledger.allocate(10)
+    ledger.allocate(10)
+    ledger.close()
+    path = ledger_path(wallet_file)
+    lines = open(path, "rb").read().splitlines(keepends=True)
+    lines[1] = lines[1].replace(b'"allocate"', b'"allocatX"')
+    with open(path, "wb") as f:
+        f.writelines(lines)
+    os.remove(wallet_file)  # force a full replay
+    with pytest.raises(RuntimeError, match="Corrupt wallet ledger"):
+        _open(wallet_file)
+
+
+def test_processes_sharing_a_wallet_stay_exact(wallet_file):
+    _open(wallet_file, initial_balance=1000).close()
+    workers = [multiprocessing.Process(target=_allocate_and_release, args=(wallet_file, 50)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    ledger = _open(wallet_file)
+    assert ledger.balance == pytest.approx(1000 + 4 * 50 * 1.0)
+    events = ledger.history()
+    assert [e["seq"] for e in events] == list(range(1, len(events) + 1))
+    ledger.close()
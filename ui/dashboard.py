@@ -1,15 +1,22 @@
 # ui/dashboard.py
 
 import os
-import json
+import sys
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.metrics import max_drawdown
+from utils.trade_journal import TradeJournal
+from utils.wallet_ledger import current_balance
+
 # Paths
 WALLET_FILE = "wallet.json"
-TRADE_LOG = "logs/trade_log.csv"
+TRADE_JOURNAL = "logs/trade_journal.db"
 RESULTS_DIR = "results"
+TABLE_ROWS = 1000  # newest trades shown in the table; metrics cover the whole journal
+INITIAL_CAPITAL = 1000.0  # session capital the drawdown is measured against (main.SESSION_CAPITAL)
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
 # Page setup
@@ -21,11 +28,9 @@ st.title("📊 SAPERA 2.0 Trading Bot Dashboard")
 # =========================
 st.header("💼 Wallet Balance")
 
-if os.path.exists(WALLET_FILE):
-    with open(WALLET_FILE, "r") as f:
-        wallet_data = json.load(f)
-        balance = wallet_data.get("wallet_balance", 0.0)
-        st.metric("Available Wallet Balance (USD)", f"${balance:,.2f}")
+balance = current_balance(WALLET_FILE)
+if balance is not None:
+    st.metric("Available Wallet Balance (USD)", f"${balance:,.2f}")
 else:
     st.warning("wallet.json not found.")
 
@@ -34,8 +39,9 @@ else:
 # =========================
 st.header("📜 Trade Log")
 
-if os.path.exists(TRADE_LOG):
-    trades_df = pd.read_csv(TRADE_LOG)
+journal = TradeJournal(TRADE_JOURNAL) if os.path.exists(TRADE_JOURNAL) else None
+if journal is not None:
+    trades_df = journal.load(limit=TABLE_ROWS)
 
     # Format time column
     if "time" in trades_df.columns:
@@ -43,26 +49,26 @@ if os.path.exists(TRADE_LOG):
 
     st.dataframe(trades_df.sort_values("time", ascending=False), use_container_width=True)
 else:
-    st.warning("Trade log not found.")
+    st.warning("Trade journal not found.")
 
 # =========================
 # Section: Performance Metrics
 # =========================
 st.header("📈 Performance Summary")
 
-if os.path.exists(TRADE_LOG) and not trades_df.empty:
-    total = len(trades_df)
-    wins = len(trades_df[trades_df["profit"] > 0])
-    losses = len(trades_df[trades_df["profit"] <= 0])
+if journal is not None and not trades_df.empty:
+    # Counts and totals are aggregated by SQLite; only the profit column is loaded for the drawdown
+    summary = journal.summary()
+    total = summary["total_trades"]
+    wins = summary["winning_trades"]
+    losses = summary["losing_trades"]
     win_rate = (wins / total * 100) if total else 0
-    net_profit = trades_df["profit"].sum()
-    avg_duration = trades_df["duration"].mean() if "duration" in trades_df.columns else 0
+    net_profit = summary["net_profit"]
+    avg_duration = summary["average_duration"]
 
-    # Drawdown
-    trades_df["cumulative_profit"] = trades_df["profit"].cumsum()
-    equity_curve = trades_df["cumulative_profit"]
-    peak = equity_curve.cummax()
-    drawdown = ((equity_curve - peak) / peak).min() * 100 if not equity_curve.empty else 0
+    # Drawdown of the account equity, as in PerformanceTracker.calculate_drawdown
+    cumulative_profit = journal.load(columns=["profit"])["cumulative_profit"]
+    drawdown = max_drawdown(INITIAL_CAPITAL + cumulative_profit.to_numpy(dtype=float))[0] * 100
 
     # Metrics Display
     col1, col2, col3 = st.columns(3)
@@ -78,7 +84,7 @@ if os.path.exists(TRADE_LOG) and not trades_df.empty:
     if st.button("📥 Export Session Report"):
         now = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{RESULTS_DIR}/session_report_{now}.csv"
-        trades_df.to_csv(filename, index=False)
+        journal.load().to_csv(filename, index=False)
         st.success(f"Report saved to: {filename}")
 else:
     st.info("No trades to calculate performance yet.")
@@ -0,0 +1,106 @@
+# utils/cache.py
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def array_digest(array):
+    """Content hash of an array (as float64), for cache keys over windows of bars."""
+    return hashlib.blake2b(np.ascontiguousarray(array, dtype=np.float64).tobytes(), digest_size=16).digest()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+    Keeps hit/miss/eviction counters for monitoring.
+    """
+    def __init__(self, max_size=1024, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires, value = entry
+            if expires < now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, keys, compute):
+        """
+        Values for `keys`, looked up under one lock acquisition. The misses are
+        computed together by compute(miss_indices), which returns their values
+        in order, and stored.
+        """
+        now = time.monotonic()
+        values, missing = [], []
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._data.get(key)
+                if entry is not None and entry[0] >= now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    values.append(entry[1])
+                    continue
+                if entry is not None:
+                    del self._data[key]
+                    self.expirations += 1
+                self.misses += 1
+                values.append(None)
+                missing.append(i)
+        if missing:
+            computed = compute(missing)
+            with self._lock:
+                for i, value in zip(missing, computed):
+                    values[i] = value
+                    self._store(keys[i], value)
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,60 @@
+# utils/file_lock.py
+
+import os
+import threading
+
+try:
+    import fcntl
+
+    def _lock_file(fd):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_file(fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """
+    Exclusive lock held on `path` (created if missing), shared by the threads
+    of this process and by every other process using the same path.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            if self._fd is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            _lock_file(self._fd)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            _unlock_file(self._fd)
+        finally:
+            self._thread_lock.release()
+
+    def close(self):
+        with self._thread_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,31 @@
+# utils/lazy.py
+
+import importlib
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported on first attribute access, so
+    importing a file that needs TA-Lib, python-telegram-bot or oandapyV20 costs
+    nothing until one of them is actually used.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Returns `name` as a LazyModule (dotted submodules are fine, e.g. 'oandapyV20.endpoints.orders')."""
+    return LazyModule(name)
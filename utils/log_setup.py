@@ -0,0 +1,21 @@
+# utils/log_setup.py
+
+import os
+import logging
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+def setup_logging(log_file=None, console=True, level=logging.INFO, stream=None):
+    """
+    Configures root logging for an entry point (file and/or console). Modules
+    only log; the script that starts the process decides where it goes.
+    Like logging.basicConfig, the first call wins.
+    """
+    handlers = []
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    if console:
+        handlers.append(logging.StreamHandler(stream))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
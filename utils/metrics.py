@@ -0,0 +1,123 @@
+# utils/metrics.py
+
+import numpy as np
+import pandas as pd
+
+BARS_PER_YEAR = 252 * 24 * 60  # M1 bars
+
+
+class EquityCurve:
+    """
+    Preallocated per-bar equity and position buffer.
+    Grows by doubling when a run outlives its capacity hint.
+    """
+    def __init__(self, capacity=1024):
+        self._equity = np.empty(max(int(capacity), 1), dtype=np.float64)
+        self._position = np.empty(max(int(capacity), 1), dtype=np.int8)
+        self.size = 0
+
+    def reserve(self, capacity):
+        if capacity > len(self._equity):
+            self._equity = np.resize(self._equity, capacity)
+            self._position = np.resize(self._position, capacity)
+
+    def extend(self, equity, position):
+        end = self.size + len(equity)
+        if end > len(self._equity):
+            self.reserve(max(end, 2 * len(self._equity)))
+        self._equity[self.size:end] = equity
+        self._position[self.size:end] = position
+        self.size = end
+
+    @property
+    def equity(self):
+        return self._equity[:self.size]
+
+    @property
+    def position(self):
+        return self._position[:self.size]
+
+
+def max_drawdown(equity):
+    """
+    Returns (max_drawdown, max_duration): the deepest fractional drawdown (<= 0)
+    and the longest stretch of bars spent below a previous peak.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.size == 0:
+        return 0.0, 0
+    peak = np.maximum.accumulate(equity)
+    max_dd = float((equity / peak).min() - 1.0) if peak[0] > 0 else 0.0
+    peaks = np.flatnonzero(equity >= peak)
+    max_duration = int(np.diff(peaks, append=equity.size).max()) - 1
+    return max_dd, max_duration
+
+
+def risk_metrics(equity, position=None, bars_per_year=BARS_PER_YEAR):
+    """
+    Sharpe, Sortino, Calmar, max drawdown/duration, exposure and turnover
+    from a per-bar equity curve, computed with vectorized array passes.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    metrics = {
+        "Sharpe": 0.0,
+        "Sortino": 0.0,
+        "Calmar": 0.0,
+        "Max Drawdown (%)": 0.0,
+        "Max Drawdown Duration (bars)": 0,
+        "Exposure (%)": 0.0,
+        "Turnover": 0.0,
+    }
+    if equity.size < 2 or equity[0] <= 0:
+        return metrics
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(equity) / equity[:-1]
+    mean = returns.mean()
+    std = returns.std()
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    scale = np.sqrt(bars_per_year)
+
+    max_dd, max_dd_duration = max_drawdown(equity)
+    years = returns.size / bars_per_year
+    growth = equity[-1] / equity[0]
+    cagr = growth ** (1.0 / years) - 1.0 if growth > 0 else -1.0
+
+    metrics["Sharpe"] = float(mean / std * scale) if std > 0 else 0.0
+    metrics["Sortino"] = float(mean / downside * scale) if downside > 0 else 0.0
+    metrics["Calmar"] = float(cagr / abs(max_dd)) if max_dd < 0 else 0.0
+    metrics["Max Drawdown (%)"] = max_dd * 100
+    metrics["Max Drawdown Duration (bars)"] = max_dd_duration
+
+    if position is not None and len(position):
+        position = np.asarray(position)
+        metrics["Exposure (%)"] = float(np.count_nonzero(position)) / position.size * 100
+        changes = np.abs(np.diff(position, prepend=0)).sum()
+        metrics["Turnover"] = float(changes) / position.size
+    return metrics
+
+
+def rolling_risk_metrics(equity, window, position=None, bars_per_year=BARS_PER_YEAR):
+    """
+    Rolling-window Sharpe, Sortino, volatility, drawdown and exposure.
+    Each column is one O(n) rolling pass; returns a DataFrame aligned to the bars.
+    """
+    equity = pd.Series(np.asarray(equity, dtype=np.float64))
+    returns = equity.pct_change().replace([np.inf, -np.inf], np.nan).fillna(0.0)
+    scale = np.sqrt(bars_per_year)
+
+    mean = returns.rolling(window).mean()
+    std = returns.rolling(window).std(ddof=0)
+    downside = (returns.clip(upper=0.0) ** 2).rolling(window).mean() ** 0.5
+    peak = equity.rolling(window, min_periods=1).max()
+
+    result = pd.DataFrame({
+        "equity": equity,
+        "sharpe": (mean / std * scale).where(std > 0),
+        "sortino": (mean / downside * scale).where(downside > 0),
+        "volatility": std * scale,
+        "drawdown": (equity / peak - 1.0).where(peak > 0),
+    })
+    if position is not None:
+        result["exposure"] = (pd.Series(np.asarray(position)) != 0).rolling(window).mean()
+    return result
@@ -0,0 +1,200 @@
+# utils/oanda_client.py
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+import numpy as np
+
+from utils.lazy import lazy_import
+from utils.rate_limiter import get_limiter
+from utils.retry import get_breaker, CircuitOpenError
+
+oandapyV20 = lazy_import("oandapyV20")
+
+POOL_SIZE = 10  # keep-alive connections kept per host
+MAX_CONCURRENCY = 8  # in-flight requests per host
+TIMEOUT = (3.05, 10)  # (connect, read) seconds
+LATENCY_WINDOW = 1000  # recent requests per endpoint kept for percentiles
+LOCAL_URL_ENV = "SAPERA_OANDA_URL"  # e.g. http://127.0.0.1:8090 to use benchmarks/oanda_standin.py
+
+
+class EndpointStats:
+    """
+    Thread-safe request count, error and latency counters per endpoint.
+    Streams are only counted as opened: their connection stays open while
+    they are iterated, so a latency figure would mean nothing.
+    """
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._streams = {}
+
+    def record_stream(self, endpoint):
+        with self._lock:
+            self._streams[endpoint] = self._streams.get(endpoint, 0) + 1
+
+    def record(self, endpoint, seconds, error=None):
+        with self._lock:
+            entry = self._endpoints.setdefault(endpoint, {
+                "requests": 0, "errors": 0, "by_code": {}, "total": 0.0, "max": 0.0,
+                "recent": deque(maxlen=self.window),
+            })
+            entry["requests"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            entry["recent"].append(seconds)
+            if error is not None:
+                entry["errors"] += 1
+                entry["by_code"][error] = entry["by_code"].get(error, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for endpoint, e in self._endpoints.items():
+                recent = np.array(e["recent"]) * 1000
+                result[endpoint] = {
+                    "requests": e["requests"],
+                    "errors": e["errors"],
+                    "errors_by_code": dict(e["by_code"]),
+                    "mean_ms": round(e["total"] / e["requests"] * 1000, 2),
+                    "p50_ms": round(float(np.percentile(recent, 50)), 2),
+                    "p95_ms": round(float(np.percentile(recent, 95)), 2),
+                    "max_ms": round(e["max"] * 1000, 2),
+                }
+            for endpoint, opened in self._streams.items():
+                result[endpoint] = {"streams_opened": opened}
+            return result
+
+
+class PooledAPI:
+    """
+    Drop-in for oandapyV20.API (`request`, `client`, `close`) built on one
+    keep-alive connection pool, so repeated calls reuse the TLS session.
+    In-flight requests are bounded per host, REST calls draw from the host-wide
+    rate limiter, and every request is timed and counted by endpoint class.
+    Each endpoint family (orders, pricing, accounts, ...) has a circuit breaker:
+    while the broker keeps failing, calls raise CircuitOpenError immediately.
+    Use get_client() rather than constructing it.
+    """
+    def __init__(self, access_token, environment="practice", pool_size=POOL_SIZE,
+                 max_concurrency=MAX_CONCURRENCY, timeout=TIMEOUT, limiter=None):
+        import requests
+
+        self._api = oandapyV20.API(access_token=access_token, environment=environment,
+                                   request_params={"timeout": timeout})
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, pool_block=True)
+        self._api.client.mount("https://", adapter)
+        self._api.client.mount("http://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.environment = environment
+        self.limiter = limiter
+        self.stats = EndpointStats()
+
+    @property
+    def client(self):
+        """The underlying requests.Session."""
+        return self._api.client
+
+    def request(self, endpoint):
+        name = f"{endpoint.method} {type(endpoint).__name__}"
+        if getattr(endpoint, "STREAM", False):
+            # Streams hold their connection while iterated; they are counted, not throttled
+            self.stats.record_stream(name)
+            return self._api.request(endpoint)
+
+        breaker = get_breaker(f"{self.environment}:{type(endpoint).__module__.rsplit('.', 1)[-1]}")
+        breaker.before_call()
+        if self.limiter is not None:
+            self.limiter.acquire(self.limiter.bucket_for(endpoint))
+        with self._slots:
+            start = time.perf_counter()
+            try:
+                response = self._api.request(endpoint)
+            except Exception as e:
+                self.stats.record(name, time.perf_counter() - start, getattr(e, "code", type(e).__name__))
+                # Only outages count against the circuit; a rejected request means the endpoint is up
+                if is_retryable(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                raise
+            self.stats.record(name, time.perf_counter() - start)
+            breaker.record_success()
+            return response
+
+    def close(self):
+        """
+        No-op: the pool is shared by every agent in the process, so one caller
+        closing "its" client must not break the others. close_clients() closes
+        all of them at shutdown.
+        """
+
+    def _close(self):
+        self._api.close()
+
+
+def is_retryable(error):
+    """
+    Whether a failed request is worth repeating: throttling (429), server errors
+    and transport failures are; other 4xx responses will fail the same way again,
+    and an open circuit sheds the call until the breaker probes again.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    code = getattr(error, "code", None)
+    try:
+        code = int(code)
+    except (TypeError, ValueError):
+        return True
+    return code == 429 or code >= 500
+
+
+def register_environment(name, api_url, stream_url=None):
+    """Adds a trading environment (base URLs without /v3) that oandapyV20.API can be built for."""
+    from oandapyV20.oandapyV20 import TRADING_ENVIRONMENTS
+
+    TRADING_ENVIRONMENTS[name] = {"api": api_url.rstrip("/"), "stream": (stream_url or api_url).rstrip("/")}
+
+
+def default_environment():
+    """'practice', or 'local' when SAPERA_OANDA_URL points every client at a stand-in server."""
+    url = os.environ.get(LOCAL_URL_ENV)
+    if url:
+        register_environment("local", url)
+        return "local"
+    return "practice"
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(access_token, environment=None):
+    """The process-wide PooledAPI for this token and environment, created on first use."""
+    environment = environment or default_environment()
+    key = (access_token, environment)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = PooledAPI(access_token, environment, limiter=get_limiter())
+            logging.info(f"OANDA client pool created ({environment}, {POOL_SIZE} connections, {MAX_CONCURRENCY} in flight)")
+        return client
+
+
+def close_clients():
+    """Closes every shared client; get_client() builds fresh ones afterwards."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client._close()
+
+
+def client_stats():
+    """Per-endpoint latency and error counters across all shared clients."""
+    with _clients_lock:
+        clients = list(_clients.items())
+    return {environment: client.stats.snapshot() for (_, environment), client in clients}
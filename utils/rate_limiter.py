@@ -0,0 +1,187 @@
+# utils/rate_limiter.py
+
+import os
+import mmap
+import time
+import struct
+import logging
+import tempfile
+import threading
+
+from utils.file_lock import FileLock
+
+# OANDA allows ~120 REST requests/s per host. Everything on this machine shares
+# the "global" bucket, and each endpoint family also has its own, so that
+# background polling cannot starve order traffic.
+BUCKETS = {  # name: (tokens per second, burst)
+    "global": (100.0, 100.0),
+    "orders": (20.0, 20.0),
+    "pricing": (30.0, 30.0),
+    "transactions": (10.0, 10.0),
+}
+PRIORITY_RESERVE = 20  # global tokens that only high-priority requests may use
+HIGH, LOW = 0, 1
+STATE_FILE = os.path.join(tempfile.gettempdir(), "sapera_oanda_ratelimit")
+WAIT_BINS_MS = (1, 5, 10, 50, 100, 250, 500, 1000)  # histogram upper edges
+
+# Endpoint module → bucket; orders, trades and positions all change exposure
+ENDPOINT_BUCKETS = {
+    "orders": "orders",
+    "trades": "orders",
+    "positions": "orders",
+    "pricing": "pricing",
+    "instruments": "pricing",
+    "transactions": "transactions",
+    "accounts": "transactions",
+}
+
+_MAGIC = b"SAPRL001"
+_HEADER = struct.Struct("8sI")
+_SLOT = struct.Struct("dd")  # tokens, last refill (time.monotonic, system-wide; restarts at boot)
+
+
+class WaitHistogram:
+    """Counts of how long acquire() blocked, in WAIT_BINS_MS buckets."""
+    def __init__(self, bins=WAIT_BINS_MS):
+        self.bins = bins
+        self.counts = [0] * (len(bins) + 2)  # no wait, each edge, overflow
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        if seconds <= 0:
+            index = 0
+        else:
+            index = next((i + 1 for i, edge in enumerate(self.bins) if ms <= edge), len(self.bins) + 1)
+        self.counts[index] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self):
+        labels = ["0ms"] + [f"<={edge}ms" for edge in self.bins] + [f">{self.bins[-1]}ms"]
+        n = sum(self.counts)
+        return {
+            "requests": n,
+            "waited": n - self.counts[0],
+            "mean_wait_ms": round(self.total / n * 1000, 3) if n else 0.0,
+            "max_wait_ms": round(self.max * 1000, 3),
+            "histogram": dict(zip(labels, self.counts)),
+        }
+
+
+class RateLimiter:
+    """
+    Token buckets shared by every process on the host. Bucket state lives in a
+    small memory-mapped file guarded by an OS file lock, so the fetcher, the
+    executor, the trackers and dat.py draw from the same budget.
+
+    A request takes one token from its own bucket and one from "global".
+    Low-priority requests leave PRIORITY_RESERVE global tokens untouched, so
+    orders still go out immediately while polling is being throttled.
+    """
+    def __init__(self, path=STATE_FILE, buckets=BUCKETS, reserve=PRIORITY_RESERVE):
+        self.path = path
+        self.buckets = dict(buckets)
+        self.names = sorted(self.buckets)
+        self.reserve = reserve
+        self._file_lock = FileLock(path + ".lock")
+        self._waits = {name: WaitHistogram() for name in self.names if name != "global"}
+        self._stats_lock = threading.Lock()
+
+        size = _HEADER.size + _SLOT.size * len(self.names)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._file_lock:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+            magic, count = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC or count != len(self.names):
+                self._reset()
+
+    def _reset(self):
+        now = time.monotonic()
+        _HEADER.pack_into(self._map, 0, _MAGIC, len(self.names))
+        for i, name in enumerate(self.names):
+            _SLOT.pack_into(self._map, _HEADER.size + i * _SLOT.size, self.buckets[name][1], now)
+
+    def _level(self, name, now):
+        """Refilled token count of `name` (caller holds the lock)."""
+        offset = _HEADER.size + self.names.index(name) * _SLOT.size
+        tokens, updated = _SLOT.unpack_from(self._map, offset)
+        rate, burst = self.buckets[name]
+        if updated > now:
+            # Written before a reboot (the file outlives it on Windows); the monotonic
+            # clock restarted, so the slot would otherwise never refill
+            return burst, offset
+        return min(burst, tokens + (now - updated) * rate), offset
+
+    def _try_take(self, name, priority):
+        """Takes a token from `name` and "global" if both allow it; otherwise returns seconds to wait."""
+        with self._file_lock:
+            now = time.monotonic()
+            tokens, offset = self._level(name, now)
+            g_tokens, g_offset = self._level("global", now)
+            g_needed = 1.0 + (self.reserve if priority == LOW else 0.0)
+            if tokens >= 1.0 and g_tokens >= g_needed:
+                _SLOT.pack_into(self._map, offset, tokens - 1.0, now)
+                _SLOT.pack_into(self._map, g_offset, g_tokens - 1.0, now)
+                return 0.0
+            return max(
+                (1.0 - tokens) / self.buckets[name][0],
+                (g_needed - g_tokens) / self.buckets["global"][0],
+            )
+
+    def acquire(self, name, priority=None):
+        """Blocks until a request in bucket `name` may be sent; returns the seconds waited."""
+        if priority is None:
+            priority = HIGH if name == "orders" else LOW
+        start = time.monotonic()
+        while True:
+            wait = self._try_take(name, priority)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        waited = time.monotonic() - start
+        with self._stats_lock:
+            self._waits[name].record(waited if waited > 1e-4 else 0.0)
+        return waited
+
+    @staticmethod
+    def bucket_for(endpoint):
+        """Bucket for an oandapyV20 endpoint instance, by its endpoint module."""
+        return ENDPOINT_BUCKETS.get(type(endpoint).__module__.rsplit(".", 1)[-1], "transactions")
+
+    def levels(self):
+        with self._file_lock:
+            now = time.monotonic()
+            return {name: round(self._level(name, now)[0], 2) for name in self.names}
+
+    def stats(self):
+        """Wait-time histograms for this process, plus the shared token levels."""
+        with self._stats_lock:
+            waits = {name: h.snapshot() for name, h in self._waits.items()}
+        return {"waits": waits, "tokens": self.levels()}
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+        self._file_lock.close()
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """The process-wide RateLimiter, attached to the host-wide state file on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+            logging.info(f"OANDA rate limiter attached ({STATE_FILE})")
+        return _limiter
+
+
+def rate_limit_stats():
+    return _limiter.stats() if _limiter is not None else {}
@@ -1,7 +1,18 @@
 # utils/retry.py
 
 import time
+import random
+import asyncio
 import logging
+import threading
+
+# Circuit breaker defaults: open after this many consecutive failures, probe again after the timeout
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 15.0
+HALF_OPEN_PROBES = 1
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
 
 def retry(operation, retries=3, delay=5, backoff=2, on_fail=None):
     """
@@ -17,15 +28,219 @@ def retry(operation, retries=3, delay=5, backoff=2, on_fail=None):
     Returns:
         Result of operation or fallback value if specified.
     """
-    for attempt in range(1, retries + 1):
-        try:
-            return operation()
-        except Exception as e:
-            logging.warning(f"[Retry {attempt}] {operation.__name__ if hasattr(operation, '__name__') else 'task'} failed: {e}")
-            if attempt == retries:
-                logging.error("Max retries reached.")
-                if on_fail:
-                    return on_fail()
-                raise
-            time.sleep(delay)
-            delay *= backoff
+    name = operation.__name__ if hasattr(operation, "__name__") else "task"
+    policy = RetryPolicy(name, attempts=retries, base=delay, cap=delay * backoff ** max(retries - 1, 0), factor=backoff)
+    try:
+        return policy.run(operation)
+    except Exception:
+        logging.error("Max retries reached.")
+        if on_fail:
+            return on_fail()
+        raise
+
+
+def backoff_delay(attempt, base=0.5, cap=8.0, factor=2):
+    """Full-jitter exponential backoff: a random delay in [0, min(cap, base * factor**attempt)] seconds."""
+    return random.uniform(0, min(cap, base * factor ** attempt))
+
+
+# ==========================
+# METRICS
+# ==========================
+class RetryMetrics:
+    """Per-name counters for retried calls and circuit breakers."""
+    FIELDS = ("calls", "attempts", "retries", "successes", "failures", "deadline_exceeded",
+              "short_circuited", "circuit_opened")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def incr(self, name, field, n=1):
+        with self._lock:
+            counts = self._counts.setdefault(name, dict.fromkeys(self.FIELDS, 0))
+            counts[field] += n
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+
+metrics = RetryMetrics()
+
+
+# ==========================
+# CIRCUIT BREAKER
+# ==========================
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open."""
+    def __init__(self, name, retry_after):
+        super().__init__(f"circuit '{name}' is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed: calls pass and consecutive failures are counted. After
+    `failure_threshold` of them the circuit opens and calls fail at once with
+    CircuitOpenError. After `reset_timeout` it goes half-open and lets
+    `half_open_probes` calls through: a success closes it, a failure opens it
+    again.
+    """
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT,
+                 half_open_probes=HALF_OPEN_PROBES):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """Raises CircuitOpenError unless a call may go out now."""
+        with self._lock:
+            if self._state == OPEN:
+                waited = time.monotonic() - self._opened_at
+                if waited < self.reset_timeout:
+                    metrics.incr(self.name, "short_circuited")
+                    raise CircuitOpenError(self.name, self.reset_timeout - waited)
+                self._state, self._probes = HALF_OPEN, 0
+                logging.info(f"Circuit '{self.name}' half-open, probing")
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    metrics.incr(self.name, "short_circuited")
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probes += 1
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logging.info(f"Circuit '{self.name}' closed")
+            self._state, self._failures = CLOSED, 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._state, self._opened_at = OPEN, time.monotonic()
+                metrics.incr(self.name, "circuit_opened")
+                logging.warning(f"Circuit '{self.name}' opened after {self._failures} failures")
+
+    def snapshot(self):
+        return {"state": self.state, "consecutive_failures": self._failures}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, **kwargs):
+    """The process-wide CircuitBreaker for `name`, created with `kwargs` on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **kwargs)
+        return breaker
+
+
+def retry_stats():
+    """Retry counters by call name, plus the state of every circuit breaker."""
+    with _breakers_lock:
+        breakers = {name: b.snapshot() for name, b in _breakers.items()}
+    return {"calls": metrics.snapshot(), "circuits": breakers}
+
+
+# ==========================
+# RETRY POLICY
+# ==========================
+def _default_retryable(error):
+    return not isinstance(error, CircuitOpenError)
+
+
+class RetryPolicy:
+    """
+    Retries a call with full-jitter exponential backoff.
+
+    `deadline` bounds the whole call in seconds: no retry is started if its
+    backoff would end past it, so a failing dependency costs at most that long.
+    Attempts themselves are not interrupted (an order that is already on the
+    wire must be allowed to finish); their own timeouts bound them. Errors for
+    which `retryable(error)` is false are raised at once. run() is for blocking
+    callables and arun() for coroutine functions; both count attempts under
+    `name` in retry_stats().
+    """
+    def __init__(self, name, attempts=3, base=0.5, cap=8.0, factor=2, deadline=None, retryable=None):
+        if attempts < 1:
+            raise ValueError(f"RetryPolicy '{name}' needs at least one attempt, got {attempts}")
+        self.name = name
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.factor = factor
+        self.deadline = deadline
+        self.retryable = retryable or _default_retryable
+
+    def _next_delay(self, attempt, error, deadline):
+        """Backoff before the next attempt, or None if the error should be raised."""
+        if not self.retryable(error):
+            metrics.incr(self.name, "failures")
+            return None
+        if attempt + 1 >= self.attempts:
+            metrics.incr(self.name, "failures")
+            return None
+        delay = backoff_delay(attempt, self.base, self.cap, self.factor)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            metrics.incr(self.name, "deadline_exceeded")
+            return None
+        metrics.incr(self.name, "retries")
+        logging.warning(f"[Retry {attempt + 1}] {self.name} failed: {error}; retrying in {delay:.2f}s")
+        return delay
+
+    def run(self, fn, on_retry=None):
+        """Calls fn() until it succeeds; `on_retry(attempt, error, delay)` runs before each backoff."""
+        deadline = time.monotonic() + self.deadline if self.deadline else None
+        metrics.incr(self.name, "calls")
+        for attempt in range(self.attempts):
+            metrics.incr(self.name, "attempts")
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._next_delay(attempt, e, deadline)
+                if delay is None:
+                    raise
+                if on_retry:
+                    on_retry(attempt + 1, e, delay)
+                time.sleep(delay)
+            else:
+                metrics.incr(self.name, "successes")
+                return result
+
+    async def arun(self, fn, on_retry=None):
+        """Awaits fn() until it succeeds, backing off with asyncio.sleep."""
+        deadline = time.monotonic() + self.deadline if self.deadline else None
+        metrics.incr(self.name, "calls")
+        for attempt in range(self.attempts):
+            metrics.incr(self.name, "attempts")
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._next_delay(attempt, e, deadline)
+                if delay is None:
+                    raise
+                if on_retry:
+                    on_retry(attempt + 1, e, delay)
+                await asyncio.sleep(delay)
+            else:
+                metrics.incr(self.name, "successes")
+                return result
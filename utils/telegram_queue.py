@@ -0,0 +1,185 @@
+# utils/telegram_queue.py
+
+import os
+import time
+import atexit
+import asyncio
+import logging
+import threading
+
+from utils.lazy import lazy_import
+from utils.retry import backoff_delay
+
+telegram = lazy_import("telegram")
+
+QUEUE_SIZE = 500  # pending messages; the oldest are dropped beyond this
+COALESCE_WINDOW = 1.0  # seconds a burst may gather into one digest
+MIN_INTERVAL = 1.0  # Telegram allows about one message per second per chat
+MAX_LENGTH = 4096  # Telegram's limit per message
+SEND_ATTEMPTS = 3
+CLOSE_TIMEOUT = 5.0  # seconds close() waits for pending messages
+LOCAL_URL_ENV = "SAPERA_TELEGRAM_URL"  # e.g. http://127.0.0.1:8091 to use benchmarks/telegram_stub.py
+
+_STOP = object()
+
+
+class TelegramQueue:
+    """
+    Delivers chat messages from a background thread running one persistent
+    event loop (and so one Bot and HTTP connection pool), fed by a bounded queue.
+
+    send() only hands the message to that loop, so callers on the trading
+    path never wait for Telegram. Messages arriving within COALESCE_WINDOW of
+    each other go out as one digest. Sends are paced to MIN_INTERVAL per chat,
+    and a RetryAfter from Telegram pauses delivery for as long as it asks.
+    When the queue is full, the oldest messages are dropped and the next
+    digest says how many.
+    """
+    def __init__(self, token, chat_id, bot=None, base_url=None, queue_size=QUEUE_SIZE,
+                 window=COALESCE_WINDOW, min_interval=MIN_INTERVAL):
+        self.chat_id = chat_id
+        self.queue_size = queue_size
+        self.window = window
+        self.min_interval = min_interval
+        base_url = base_url or os.environ.get(LOCAL_URL_ENV)
+        if bot is None:
+            kwargs = {"base_url": base_url.rstrip("/") + "/bot"} if base_url else {}
+            bot = telegram.Bot(token=token, **kwargs)
+        self.bot = bot
+        self.counts = {"queued": 0, "dropped": 0, "sent": 0, "digests": 0, "failed": 0}
+        self._dropped = 0  # since the last delivery
+        self._next_send = 0.0
+        self._loop = asyncio.new_event_loop()
+        self._queue = asyncio.Queue()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="telegram", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._run(), self._loop)
+        atexit.register(self.close)
+
+    # === Producer side (any thread) ===
+    def send(self, message):
+        """Queues a message and returns immediately."""
+        if self._done.is_set():
+            logging.warning(f"Telegram queue closed, message dropped: {message}")
+            return
+        self._loop.call_soon_threadsafe(self._enqueue, str(message))
+
+    def _enqueue(self, message):
+        if message is not _STOP and self._queue.qsize() >= self.queue_size:
+            self._queue.get_nowait()
+            self._dropped += 1
+            self.counts["dropped"] += 1
+        self._queue.put_nowait(message)
+        if message is not _STOP:
+            self.counts["queued"] += 1
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Delivers what is queued (for up to `timeout` seconds) and stops the worker."""
+        if self._done.is_set() or not self._thread.is_alive():
+            return
+        self._loop.call_soon_threadsafe(self._enqueue, _STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logging.warning(f"Telegram queue still busy after {timeout}s; {self._queue.qsize()} messages not sent")
+        self._done.set()
+
+    def stats(self):
+        return dict(self.counts, pending=self._queue.qsize())
+
+    # === Worker (event loop thread) ===
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _run(self):
+        if hasattr(self.bot, "initialize"):
+            try:
+                await self.bot.initialize()
+            except Exception as e:
+                logging.error(f"Telegram bot initialization failed: {e}")
+        stop = False
+        while not stop:
+            batch = [await self._queue.get()]
+            if batch[0] is not _STOP:
+                await asyncio.sleep(self.window)  # let the rest of a burst arrive
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if _STOP in batch:
+                stop = True
+                batch = [m for m in batch if m is not _STOP]
+            if batch:
+                await self._deliver(batch)
+        if hasattr(self.bot, "shutdown"):
+            try:
+                await self.bot.shutdown()
+            except Exception as e:
+                logging.debug(f"Telegram bot shutdown failed: {e}")
+        self._loop.stop()
+
+    async def _deliver(self, messages):
+        dropped, self._dropped = self._dropped, 0
+        if len(messages) > 1 or dropped:
+            self.counts["digests"] += 1
+        for text in digest(messages, dropped):
+            if await self._send(text):
+                self.counts["sent"] += 1
+            else:
+                self.counts["failed"] += 1
+
+    async def _send(self, text):
+        failures = 0
+        while True:
+            wait = self._next_send - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                await self.bot.send_message(chat_id=self.chat_id, text=text)
+                self._next_send = time.monotonic() + self.min_interval
+                logging.info(f"Telegram alert sent: {text[:80]}")
+                return True
+            except Exception as e:
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after is not None:
+                    # Throttling is not a failure; newer python-telegram-bot releases report a timedelta
+                    seconds = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+                    self._next_send = time.monotonic() + seconds
+                    logging.warning(f"Telegram rate limit hit; pausing {seconds:.1f}s")
+                    continue
+                failures += 1
+                logging.error(f"Telegram failed (attempt {failures}): {e}")
+                if failures >= SEND_ATTEMPTS:
+                    return False
+                await asyncio.sleep(backoff_delay(failures - 1))
+
+
+def digest(messages, dropped=0):
+    """Texts to send for a burst: the message itself, or a digest split to fit MAX_LENGTH."""
+    if len(messages) == 1 and not dropped:
+        return [messages[0][:MAX_LENGTH]]
+    header = f"📬 {len(messages)} updates"
+    if dropped:
+        header += f" ({dropped} older dropped)"
+    parts, current = [], header
+    for message in messages:
+        message = message[:MAX_LENGTH - len(header) - 20]  # room for the "(cont.)" header
+        if len(current) + 2 + len(message) > MAX_LENGTH:
+            parts.append(current)
+            current = header + " (cont.)"
+        current += "\n\n" + message
+    parts.append(current)
+    return parts
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_telegram_queue(token, chat_id):
+    """The process-wide TelegramQueue for this bot token and chat, started on first use."""
+    key = (token, chat_id)
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = _queues[key] = TelegramQueue(token, chat_id)
+        return queue
@@ -0,0 +1,272 @@
+# utils/trade_journal.py
+
+import os
+import time
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+
+JOURNAL_FILE = "logs/trade_journal.db"
+LEGACY_CSV = "trade_log.csv"  # next to the journal; imported once into an empty journal
+BATCH_SIZE = 256  # rows per write transaction
+FLUSH_INTERVAL = 0.1  # seconds a queued row may wait for its batch
+BUSY_TIMEOUT_MS = 30_000
+
+COLUMNS = [
+    "time", "client_trade_id", "instrument", "signal", "price", "stop_loss", "take_profit",
+    "trade_size", "lstm_prediction", "correct_prediction", "profit", "duration",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id                 INTEGER PRIMARY KEY,
+    time               TEXT NOT NULL,
+    client_trade_id    TEXT,
+    broker_trade_id    TEXT,
+    instrument         TEXT,
+    signal             TEXT,
+    price              REAL,
+    stop_loss          REAL,
+    take_profit        REAL,
+    trade_size         INTEGER,
+    lstm_prediction    NUMERIC,  -- a price forecast or a direction label
+    correct_prediction INTEGER,
+    profit             REAL NOT NULL DEFAULT 0,
+    duration           REAL NOT NULL DEFAULT 0,
+    status             TEXT NOT NULL DEFAULT 'open',
+    closed_time        TEXT
+);
+CREATE INDEX IF NOT EXISTS trades_open_client ON trades (client_trade_id) WHERE status = 'open';
+CREATE INDEX IF NOT EXISTS trades_broker ON trades (broker_trade_id);
+CREATE INDEX IF NOT EXISTS trades_instrument_time ON trades (instrument, time);
+CREATE INDEX IF NOT EXISTS trades_time ON trades (time);
+"""
+
+
+class TradeJournal:
+    """
+    Trade log in SQLite (WAL mode), shared by the executor, the outcome
+    trackers, PerformanceTracker and the dashboard.
+
+    Writers append through a background thread that commits queued rows in
+    batches, so log_trade never waits on disk. Outcome updates are single
+    indexed UPDATEs. Readers get a consistent snapshot while writers in other
+    processes carry on. cumulative_profit is derived on read, so closing a trade
+    never rewrites later rows.
+    """
+    def __init__(self, path=JOURNAL_FILE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 legacy_csv=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        legacy_csv = legacy_csv or os.path.join(directory, LEGACY_CSV)
+        if os.path.exists(legacy_csv):
+            self._import_legacy(legacy_csv)
+
+    # === Connections ===
+    def _conn(self):
+        """One connection per thread (sqlite3 connections are not shared across threads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def _import_legacy(self, csv_path):
+        import pandas as pd
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")  # only one process imports
+        try:
+            if conn.execute("SELECT EXISTS (SELECT 1 FROM trades)").fetchone()[0]:
+                conn.execute("COMMIT")
+                return
+            df = pd.read_csv(csv_path)
+            rows = [_row(entry) for entry in df.to_dict("records")]
+            conn.executemany(_INSERT, rows)
+            conn.execute("COMMIT")
+            logging.info(f"Imported {len(rows)} trades from {csv_path} into {self.path}")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # === Writes ===
+    def append(self, entry):
+        """Queues one trade (a log_trade entry dict); it is committed within flush_interval."""
+        self._ensure_writer()
+        self._queue.put(_row(entry))
+
+    def flush(self, timeout=None):
+        """Blocks until everything queued so far is committed."""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self._writer is not None:
+            self.flush()
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run_writer, name="trade-journal", daemon=True)
+                    self._writer.start()
+                    atexit.register(self.close)
+
+    def _run_writer(self):
+        stop = False
+        while not stop:
+            batch, waiters = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()) if batch else 0)
+                except queue.Empty:
+                    break
+            if batch:
+                conn = self._conn()
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.executemany(_INSERT, batch)
+                    conn.execute("COMMIT")
+                except Exception as e:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    logging.error(f"Trade journal write of {len(batch)} rows failed: {e}")
+            for event in waiters:
+                event.set()
+
+    def apply_outcomes(self, outcomes):
+        """
+        Records profit, duration and close time for closed trades (dicts from
+        TransactionSync.poll), matched exactly by client trade ID to the oldest
+        open row. Returns {row id: outcome}.
+        """
+        import pandas as pd
+
+        outcomes = [o for o in outcomes if o.get("client_trade_id")]
+        if not outcomes:
+            return {}
+        # Durations parsed in one vectorized call; per-row parsing dominated large syncs
+        opened_at = pd.to_datetime([o.get("open_time") for o in outcomes], utc=True, errors="coerce")
+        closed_at = pd.to_datetime([o.get("close_time") for o in outcomes], utc=True, errors="coerce")
+        minutes = ((closed_at - opened_at).total_seconds() / 60).fillna(0.0)
+
+        conn = self._conn()
+        matched = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for outcome, duration in zip(outcomes, minutes):
+                found = conn.execute(
+                    "SELECT id FROM trades WHERE client_trade_id = ? AND status = 'open' ORDER BY id LIMIT 1",
+                    (outcome["client_trade_id"],),
+                ).fetchone()
+                if found is None:
+                    logging.debug(f"No open journal row for trade {outcome['trade_id']} ({outcome['instrument']})")
+                    continue
+                conn.execute(
+                    "UPDATE trades SET profit = ?, duration = ?, status = 'closed', closed_time = ?, broker_trade_id = ? "
+                    "WHERE id = ?",
+                    (round(outcome["profit"], 2), round(float(duration), 2), outcome.get("close_time"),
+                     outcome["trade_id"], found[0]),
+                )
+                matched[found[0]] = outcome
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return matched
+
+    # === Reads ===
+    def load(self, columns=None, status=None, limit=None):
+        """
+        Trades as a DataFrame in log order (newest `limit` rows if given), with
+        cumulative_profit derived when profit is loaded. One snapshot per call.
+        """
+        import pandas as pd
+
+        cols = ", ".join(["id"] + [c for c in (columns or COLUMNS) if c != "id"])
+        where = "WHERE status = ?" if status else ""
+        params = (status,) if status else ()
+        if limit:
+            query = f"SELECT * FROM (SELECT {cols} FROM trades {where} ORDER BY id DESC LIMIT {int(limit)}) ORDER BY id"
+        else:
+            query = f"SELECT {cols} FROM trades {where} ORDER BY id"
+        df = pd.read_sql_query(query, self._conn(), params=params, index_col="id")
+        if "profit" in df.columns:
+            df["cumulative_profit"] = df["profit"].cumsum()
+        if "correct_prediction" in df.columns:
+            df["correct_prediction"] = df["correct_prediction"].astype(bool)
+        return df
+
+    def summary(self):
+        """Headline counts and totals computed inside SQLite, without loading rows."""
+        row = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(profit > 0), 0), COALESCE(SUM(profit <= 0), 0), "
+            "COALESCE(SUM(profit), 0), COALESCE(AVG(duration), 0), COALESCE(SUM(status = 'open'), 0) FROM trades"
+        ).fetchone()
+        total, wins, losses, net, avg_duration, open_trades = row
+        return {
+            "total_trades": total,
+            "winning_trades": wins,
+            "losing_trades": losses,
+            "net_profit": net,
+            "average_duration": avg_duration,
+            "open_trades": open_trades,
+        }
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+
+_INSERT = (
+    f"INSERT INTO trades ({', '.join(COLUMNS)}, status) "
+    f"VALUES ({', '.join('?' * len(COLUMNS))}, ?)"
+)
+
+
+def _row(entry):
+    """INSERT parameters for a log_trade entry or a legacy CSV record."""
+    values = []
+    for column in COLUMNS:
+        value = entry.get(column)
+        if value is not None and hasattr(value, "item"):
+            value = value.item()  # numpy scalars from pandas
+        if value != value:
+            value = None  # blank legacy CSV cell (NaN from pandas)
+        if column == "correct_prediction" and value is not None:
+            value = int(bool(value))
+        if column in ("profit", "duration") and value is None:
+            value = 0.0
+        values.append(value)
+    values.append("closed" if values[COLUMNS.index("profit")] else "open")
+    return values
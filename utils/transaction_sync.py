@@ -0,0 +1,113 @@
+# utils/transaction_sync.py
+
+import os
+import copy
+import json
+import logging
+
+from utils.lazy import lazy_import
+
+transactions = lazy_import("oandapyV20.endpoints.transactions")
+
+
+class TransactionSync:
+    """
+    Incremental reader of an account's transaction history.
+
+    Each poll asks TransactionsSinceID for transactions after the last
+    processed ID (persisted in `state_path`), so a quiet cycle costs one small
+    request. Fills that open a trade are remembered (broker trade ID → client
+    order ID, size, open time, realized P&L from partial closes) until the
+    trade closes, so closes can be matched to trade-log rows exactly.
+    """
+    def __init__(self, client, account_id, state_path):
+        self.client = client
+        self.account_id = account_id
+        self.state_path = state_path
+        self.state = self._load()
+        self._pending = None
+
+    def _load(self):
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"last_transaction_id": "0", "open_trades": {}}
+
+    @property
+    def last_transaction_id(self):
+        return self.state["last_transaction_id"]
+
+    def fetch(self):
+        """Every transaction after the last processed ID, following pages; returns (transactions, last ID)."""
+        since, fetched = self.last_transaction_id, []
+        while True:
+            r = transactions.TransactionsSinceID(self.account_id, params={"id": since})
+            res = self.client.request(r)
+            page = res.get("transactions", [])
+            fetched.extend(page)
+            last = res.get("lastTransactionID", since)
+            if not page or int(page[-1]["id"]) >= int(last):
+                return fetched, last
+            since = page[-1]["id"]
+
+    def poll(self):
+        """
+        Closed-trade outcomes since the last commit: dicts with trade_id,
+        client_trade_id, instrument, units, profit, open_time and close_time.
+        Call commit() once they have been applied.
+        """
+        fetched, last = self.fetch()
+        state = copy.deepcopy(self.state)
+        open_trades = state["open_trades"]
+        outcomes = []
+        for tx in fetched:
+            if tx.get("type") != "ORDER_FILL":
+                continue
+            opened = tx.get("tradeOpened")
+            if opened:
+                open_trades[opened["tradeID"]] = {
+                    "client_trade_id": tx.get("clientOrderID") or (opened.get("clientExtensions") or {}).get("id"),
+                    "instrument": tx.get("instrument"),
+                    "units": abs(int(float(opened["units"]))),
+                    "open_time": tx.get("time"),
+                    "realized": 0.0,
+                }
+            reduced = tx.get("tradeReduced")
+            if reduced and reduced["tradeID"] in open_trades:
+                open_trades[reduced["tradeID"]]["realized"] += float(reduced.get("realizedPL", 0))
+            for closed in tx.get("tradesClosed", []):
+                info = open_trades.pop(closed["tradeID"], None) or {
+                    # Opened before this tracker's history began
+                    "client_trade_id": None,
+                    "instrument": tx.get("instrument"),
+                    "units": abs(int(float(closed.get("units", 0)))),
+                    "open_time": None,
+                    "realized": 0.0,
+                }
+                outcomes.append({
+                    "trade_id": closed["tradeID"],
+                    "client_trade_id": info["client_trade_id"],
+                    "instrument": info["instrument"],
+                    "units": info["units"],
+                    "profit": info["realized"] + float(closed.get("realizedPL", 0)),
+                    "open_time": info["open_time"],
+                    "close_time": tx.get("time"),
+                })
+        state["last_transaction_id"] = last
+        self._pending = state
+        if fetched:
+            logging.info(f"Synced {len(fetched)} transactions up to {last}: {len(outcomes)} trades closed")
+        return outcomes
+
+    def commit(self):
+        """Persists the state reached by the last poll()."""
+        if self._pending is None or self._pending == self.state:
+            self._pending = None
+            return
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._pending, f)
+        os.replace(tmp, self.state_path)
+        self.state, self._pending = self._pending, None
@@ -0,0 +1,245 @@
+# utils/wallet_ledger.py
+
+import os
+import json
+import time
+import zlib
+import atexit
+import logging
+import threading
+from datetime import datetime
+
+from utils.file_lock import FileLock
+
+SNAPSHOT_EVERY = 100  # events appended by this process between snapshots
+GROUP_COMMIT_INTERVAL = 0.05  # seconds writes may wait to share one fsync
+PLACES = 6  # balances are rounded so repeated float sums do not drift
+
+
+def ledger_path(wallet_file):
+    """wallet.json → wallet.ledger"""
+    return os.path.splitext(wallet_file)[0] + ".ledger"
+
+
+class WalletLedger:
+    """
+    Wallet balance kept as an append-only ledger of balance events, next to a
+    snapshot in `wallet_file` (still {"wallet_balance": ...}, plus the ledger
+    position it covers).
+
+    Every event is one checksummed line holding the balance after it, so
+    recovery is the snapshot plus the lines written since, and a line torn by
+    a crash is detected and cut off. Processes sharing the wallet serialize on
+    a lock file and replay each other's events before appending, so two
+    sessions can never both allocate the same funds. Events reach the OS
+    immediately (surviving a process crash); fsyncs are group-committed by a
+    background thread, and flush() waits for one.
+    """
+    def __init__(self, wallet_file="wallet.json", initial_balance=1000.0,
+                 snapshot_every=SNAPSHOT_EVERY, commit_interval=GROUP_COMMIT_INTERVAL):
+        self.wallet_file = wallet_file
+        self.path = ledger_path(wallet_file)
+        self.snapshot_every = snapshot_every
+        self.commit_interval = commit_interval
+        self.lock = FileLock(wallet_file + ".lock")
+        self.balance = 0.0
+        self.seq = 0
+        self.offset = 0  # ledger bytes replayed so far
+        self._since_snapshot = 0
+        self._written = 0  # events appended by this process
+        self._synced = 0  # ... of which known to be on disk
+        self._cond = threading.Condition()
+        self._closed = False
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0), 0o600)
+        with self.lock:
+            snapshot = _read_snapshot(wallet_file)
+            if snapshot is not None and "ledger_offset" in snapshot:
+                self.balance = float(snapshot["wallet_balance"])
+                self.seq = snapshot["ledger_seq"]
+                self.offset = snapshot["ledger_offset"]
+            self._catch_up()
+            if self.seq == 0:
+                # First run: start from the legacy wallet.json balance if there is one
+                opening = float(snapshot["wallet_balance"]) if snapshot is not None else float(initial_balance)
+                self._append("open", opening, opening)
+                self._snapshot()
+        self._syncer = threading.Thread(target=self._run_syncer, name="wallet-ledger", daemon=True)
+        self._syncer.start()
+        atexit.register(self.close)
+
+    # === Replay ===
+    def _catch_up(self):
+        """Applies events appended since self.offset (by any process); caller holds the lock."""
+        size = os.fstat(self._fd).st_size
+        if size < self.offset:
+            logging.warning(f"Wallet ledger {self.path} is shorter than its snapshot; using the snapshot balance")
+            self.offset = size
+            return
+        if size == self.offset:
+            return
+        os.lseek(self._fd, self.offset, os.SEEK_SET)
+        data = os.read(self._fd, size - self.offset)
+        good = _parse(data, self._apply)
+        self.offset += good
+        rest = data[good:]
+        if rest:
+            # Writers hold the lock for the whole write, so a bad final line can only be
+            # the torn write of a crashed process; anything earlier is real corruption
+            if b"\n" in rest[:-1]:
+                raise RuntimeError(f"Corrupt wallet ledger event at byte {self.offset} of {self.path}")
+            logging.warning(f"Wallet ledger {self.path}: dropping {len(rest)} bytes of a torn event")
+            os.ftruncate(self._fd, self.offset)
+
+    def _apply(self, event):
+        self.seq = event["seq"]
+        self.balance = event["balance"]
+
+    def refresh(self):
+        """Picks up events written by other processes."""
+        with self.lock:
+            self._catch_up()
+        return self.balance
+
+    # === Events ===
+    def _append(self, kind, amount, balance, **fields):
+        """Writes one event (caller holds the lock and has caught up)."""
+        event = {"seq": self.seq + 1, "time": datetime.utcnow().isoformat(timespec="milliseconds"),
+                 "type": kind, "amount": float(amount), "balance": round(float(balance), PLACES), **fields}
+        os.write(self._fd, _encode(event))
+        self.offset = os.fstat(self._fd).st_size
+        self._apply(event)
+        self._since_snapshot += 1
+        with self._cond:
+            self._written += 1
+            self._cond.notify()
+        if self._since_snapshot >= self.snapshot_every:
+            self._snapshot()
+
+    def allocate(self, amount, **fields):
+        """Moves `amount` out of the wallet into a session; False if funds are short."""
+        with self.lock:
+            self._catch_up()
+            if amount <= 0 or amount > self.balance:
+                return False
+            self._append("allocate", -amount, self.balance - amount, **fields)
+            return True
+
+    def release(self, capital, pnl=0.0, **fields):
+        """Returns a session's capital plus its P&L to the wallet."""
+        with self.lock:
+            self._catch_up()
+            self._append("release", capital + pnl, self.balance + capital + pnl,
+                         capital=float(capital), pnl=float(pnl), **fields)
+        return self.balance
+
+    def adjust(self, amount, kind="pnl", **fields):
+        """Credits (or debits) `amount` without a session."""
+        with self.lock:
+            self._catch_up()
+            self._append(kind, amount, self.balance + amount, **fields)
+        return self.balance
+
+    # === Durability ===
+    def _snapshot(self):
+        """Rewrites wallet_file atomically to cover the ledger so far (caller holds the lock)."""
+        os.fsync(self._fd)  # never point a snapshot past what is on disk
+        tmp = self.wallet_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"wallet_balance": self.balance, "ledger_seq": self.seq, "ledger_offset": self.offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.wallet_file)
+        self._since_snapshot = 0
+
+    def _run_syncer(self):
+        while True:
+            with self._cond:
+                while self._synced == self._written and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            time.sleep(self.commit_interval)  # let more writes join this fsync
+            with self._cond:
+                target = self._written
+            os.fsync(self._fd)
+            with self._cond:
+                self._synced = max(self._synced, target)
+                self._cond.notify_all()
+
+    def flush(self):
+        """Blocks until every event this process appended is on disk."""
+        with self._cond:
+            target = self._written
+            while self._synced < target and not self._closed:
+                self._cond.wait()
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        with self.lock:
+            if self._since_snapshot:
+                self._snapshot()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._syncer.join()
+        os.close(self._fd)
+        self.lock.close()
+
+    def history(self):
+        """Every event in the ledger, oldest first."""
+        with open(self.path, "rb") as f:
+            events = []
+            _parse(f.read(), events.append)
+        return events
+
+
+def current_balance(wallet_file="wallet.json"):
+    """Balance as of the latest event, read without locking or writing (for dashboards)."""
+    snapshot = _read_snapshot(wallet_file)
+    if snapshot is None:
+        return None
+    state = {"balance": float(snapshot["wallet_balance"])}
+    try:
+        with open(ledger_path(wallet_file), "rb") as f:
+            f.seek(snapshot.get("ledger_offset", 0))
+            _parse(f.read(), lambda e: state.update(balance=e["balance"]))
+    except FileNotFoundError:
+        pass
+    return state["balance"]
+
+
+def _read_snapshot(wallet_file):
+    try:
+        with open(wallet_file, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _encode(event):
+    body = json.dumps(event, separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(body), body)
+
+
+def _parse(data, apply):
+    """Feeds each intact event in `data` to apply(); returns the bytes consumed."""
+    pos = 0
+    while True:
+        end = data.find(b"\n", pos)
+        if end < 0:
+            return pos
+        line = data[pos:end]
+        crc, _, body = line.partition(b" ")
+        try:
+            if int(crc, 16) != zlib.crc32(body):
+                return pos
+            apply(json.loads(body))
+        except ValueError:
+            return pos
+        pos = end + 1